@@ -0,0 +1,445 @@
+"""Asyncio ACME client API.
+
+This module provides `AsyncClient`, an :mod:`asyncio` counterpart of
+`acme.client.Client`, so that a single event loop can drive many
+concurrent orders against one CA.
+
+Blocking work, i.e. HTTP requests (through the pooled `requests.Session`
+of the underlying `acme.client.ClientNetwork`) and JWS signing, is
+off-loaded to a bounded executor, while ``Retry-After`` scheduling
+happens on the event loop.
+
+.. note:: This module requires Python 3.5 or newer.
+
+"""
+import asyncio
+import concurrent.futures
+import datetime
+import functools
+import logging
+
+import six
+from six.moves import http_client  # pylint: disable=import-error
+
+from acme import client
+from acme import errors
+from acme import jose
+from acme import messages
+from acme import ratelimit
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncClientNetwork(object):
+    """Asyncio client network.
+
+    Wraps a blocking `.ClientNetwork`, reusing its session, nonce pool
+    (including background refill), retry policy, JWS signing and
+    response checking. Nothing blocks the event loop: if the nonce pool
+    is empty, a fresh nonce is fetched in the executor, and retries
+    are delayed with `asyncio.sleep`.
+
+    :ivar .ClientNetwork net: Underlying (blocking) client network.
+    :ivar concurrent.futures.Executor executor: Executor used for
+        blocking calls. If not supplied in the constructor, a
+        `concurrent.futures.ThreadPoolExecutor` with ``max_workers``
+        threads is created and owned by the network.
+
+    """
+    MAX_WORKERS = client.ClientNetwork.POOL_MAXSIZE
+    """Default maximum number of concurrent blocking calls, matching the
+    connection pool size of `.ClientNetwork` sessions, so that workers
+    never wait for (or discard) pooled connections."""
+
+    def __init__(self, net, executor=None, max_workers=MAX_WORKERS):
+        self.net = net
+        self._owns_executor = executor is None
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers) if executor is None else executor
+
+    def close(self):
+        """Close the network, shutting down owned executor."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+        self.net.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run(self, func, *args, **kwargs):
+        return asyncio.get_event_loop().run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs))
+
+    async def head(self, url, **kwargs):
+        """Send HEAD request without checking the response."""
+        # pylint: disable=protected-access
+        return await self._run(self.net._send_request, 'HEAD', url, **kwargs)
+
+    async def get(self, url, content_type=client.ClientNetwork.JSON_CONTENT_TYPE,
+                  **kwargs):
+        """Send GET request and check response.
+
+        Transient server errors are retried according to the
+        ``retry_policy`` of the underlying network.
+
+        """
+        # pylint: disable=protected-access
+        endpoint = ratelimit.RateLimiter.endpoint_class('GET')
+        attempt = 1
+        response = await self._run(
+            self.net._get_once, endpoint, url, **kwargs)
+        delay = self.net._retry_delay('GET', attempt, response, endpoint)
+        while delay is not None:
+            await asyncio.sleep(delay)
+            attempt += 1
+            response = await self._run(
+                self.net._get_once, endpoint, url, **kwargs)
+            delay = self.net._retry_delay('GET', attempt, response, endpoint)
+        return self.net._check_response(response, content_type=content_type)
+
+    async def post(self, url, obj,
+                   content_type=client.ClientNetwork.JSON_CONTENT_TYPE,
+                   **kwargs):
+        """POST object wrapped in `.JWS` and check response.
+
+        Nonce acquisition (if the pool is empty), signing and sending
+        all happen in the executor. Requests are retried according to
+        the ``retry_policy`` of the underlying network.
+
+        """
+        # pylint: disable=protected-access
+        endpoint = ratelimit.RateLimiter.endpoint_class('POST', obj)
+        attempt = 1
+        response = await self._run(
+            self.net._post_once, endpoint, url, obj, **kwargs)
+        delay = self.net._retry_delay('POST', attempt, response, endpoint)
+        while delay is not None:
+            self.net._prepare_post_retry(response)
+            await asyncio.sleep(delay)
+            attempt += 1
+            response = await self._run(
+                self.net._post_once, endpoint, url, obj, **kwargs)
+            delay = self.net._retry_delay('POST', attempt, response, endpoint)
+        self.net._add_nonce(response)
+        return self.net._check_response(response, content_type=content_type)
+
+
+class AsyncClient(object):
+    """Asyncio ACME client.
+
+    All network-bound methods are coroutines; their parameters and
+    return values are the same as for the `acme.client.Client`
+    methods of the same name. Use `create` to construct a client from
+    a directory URI.
+
+    :ivar messages.Directory directory:
+    :ivar key: `.JWK` (private)
+    :ivar .AsyncClientNetwork net: Client network.
+
+    """
+    DER_CONTENT_TYPE = client.Client.DER_CONTENT_TYPE
+
+    def __init__(self, directory, key, alg=jose.RS256, verify_ssl=True,
+                 net=None):
+        """Initialize.
+
+        :param .messages.Directory directory: Directory Resource.
+
+        """
+        self.directory = directory
+        self.key = key
+        self.net = AsyncClientNetwork(client.ClientNetwork(
+            key, alg, verify_ssl, session=client.shared_session())) if (
+                net is None) else net
+
+    @classmethod
+    async def create(cls, directory, key, alg=jose.RS256, verify_ssl=True,
+                     net=None):
+        """Create new client.
+
+        :param directory: Directory Resource (`.messages.Directory`) or
+            URI from which the resource will be downloaded.
+
+        :rtype: `AsyncClient`
+
+        """
+        acme = cls(None, key, alg, verify_ssl, net)
+        if isinstance(directory, six.string_types):
+            directory = messages.Directory.from_json(
+                (await acme.net.get(directory)).json())
+        acme.directory = directory
+        return acme
+
+    async def register(self, new_reg=None):
+        """Register.
+
+        :param .NewRegistration new_reg:
+
+        :returns: Registration Resource.
+        :rtype: `.RegistrationResource`
+
+        :raises .UnexpectedUpdate:
+
+        """
+        new_reg = messages.NewRegistration() if new_reg is None else new_reg
+        assert isinstance(new_reg, messages.NewRegistration)
+
+        response = await self.net.post(self.directory[new_reg], new_reg)
+        assert response.status_code == http_client.CREATED
+
+        # pylint: disable=no-member,protected-access
+        regr = client.Client._regr_from_response(response)
+        if (regr.body.key != self.key.public_key() or
+                regr.body.contact != new_reg.contact):
+            raise errors.UnexpectedUpdate(regr)
+
+        return regr
+
+    async def update_registration(self, regr, update=None):
+        """Update registration.
+
+        :param messages.RegistrationResource regr: Registration Resource.
+        :param messages.Registration update: Updated body of the
+            resource. If not provided, body will be taken from `regr`.
+
+        :returns: Updated Registration Resource.
+        :rtype: `.RegistrationResource`
+
+        """
+        update = regr.body if update is None else update
+        response = await self.net.post(
+            regr.uri, messages.UpdateRegistration(**dict(update)))
+        # pylint: disable=protected-access
+        updated_regr = client.Client._regr_from_response(
+            response, uri=regr.uri, new_authzr_uri=regr.new_authzr_uri,
+            terms_of_service=regr.terms_of_service)
+        if updated_regr != regr:
+            raise errors.UnexpectedUpdate(regr)
+        return updated_regr
+
+    async def agree_to_tos(self, regr):
+        """Agree to the terms-of-service.
+
+        :param regr: Registration Resource.
+        :type regr: `.RegistrationResource`
+
+        :returns: Updated Registration Resource.
+        :rtype: `.RegistrationResource`
+
+        """
+        return await self.update_registration(
+            regr.update(body=regr.body.update(agreement=regr.terms_of_service)))
+
+    async def request_challenges(self, identifier, new_authzr_uri):
+        """Request challenges.
+
+        :param identifier: Identifier to be challenged.
+        :type identifier: `.messages.Identifier`
+
+        :param str new_authzr_uri: new-authorization URI
+
+        :returns: Authorization Resource.
+        :rtype: `.AuthorizationResource`
+
+        """
+        new_authz = messages.NewAuthorization(identifier=identifier)
+        response = await self.net.post(new_authzr_uri, new_authz)
+        assert response.status_code == http_client.CREATED
+        # pylint: disable=protected-access
+        return client.Client._authzr_from_response(response, identifier)
+
+    async def request_domain_challenges(self, domain, new_authz_uri):
+        """Request challenges for domain names.
+
+        :param str domain: Domain name to be challenged.
+        :param str new_authzr_uri: new-authorization URI
+
+        :returns: Authorization Resource.
+        :rtype: `.AuthorizationResource`
+
+        """
+        return await self.request_challenges(messages.Identifier(
+            typ=messages.IDENTIFIER_FQDN, value=domain), new_authz_uri)
+
+    async def answer_challenge(self, challb, response):
+        """Answer challenge.
+
+        :param challb: Challenge Resource body.
+        :type challb: `.ChallengeBody`
+
+        :param response: Corresponding Challenge response
+        :type response: `.challenges.ChallengeResponse`
+
+        :returns: Challenge Resource with updated body.
+        :rtype: `.ChallengeResource`
+
+        :raises .UnexpectedUpdate:
+
+        """
+        # pylint: disable=protected-access
+        return client.Client._challr_from_response(
+            await self.net.post(challb.uri, response), challb)
+
+    async def poll(self, authzr, lazy=False):
+        """Poll Authorization Resource for status.
+
+        :param authzr: Authorization Resource
+        :type authzr: `.AuthorizationResource`
+        :param bool lazy: If ``True``, body of the updated Authorization
+            Resource is `.LazyAuthorization`, c.f.
+            `acme.client.Client.poll`.
+
+        :returns: Updated Authorization Resource and HTTP response.
+
+        :rtype: (`.AuthorizationResource`, `requests.Response`)
+
+        """
+        response = await self.net.get(authzr.uri)
+        # pylint: disable=protected-access
+        updated_authzr = client.Client._authzr_from_response(
+            response, authzr.body.identifier, authzr.uri, authzr.new_cert_uri,
+            lazy=lazy)
+        return updated_authzr, response
+
+    async def request_issuance(self, csr, authzrs):
+        """Request issuance.
+
+        :param csr: CSR
+        :type csr: `OpenSSL.crypto.X509Req` wrapped in `.ComparableX509`
+
+        :param authzrs: `list` of `.AuthorizationResource`
+
+        :returns: Issued certificate
+        :rtype: `.messages.CertificateResource`
+
+        """
+        assert authzrs, "Authorizations list is empty"
+        logger.debug("Requesting issuance...")
+
+        content_type = self.DER_CONTENT_TYPE
+        response = await self.net.post(
+            authzrs[0].new_cert_uri, messages.CertificateRequest(csr=csr),
+            content_type=content_type, headers={'Accept': content_type})
+        # pylint: disable=protected-access
+        return client.Client._certr_from_response(response, authzrs)
+
+    async def poll_and_request_issuance(
+            self, csr, authzrs, mintime=5, max_attempts=10):
+        """Poll and request issuance.
+
+        All authorizations are polled concurrently, each one respecting
+        its own ``Retry-After`` HTTP header, and `request_issuance` is
+        called once all of them are valid. Polling stops as soon as
+        any authorization turns invalid.
+
+        :param .ComparableX509 csr: CSR (`OpenSSL.crypto.X509Req`
+            wrapped in `.ComparableX509`)
+        :param authzrs: `list` of `.AuthorizationResource`
+        :param int mintime: Minimum time before next attempt, used if
+            ``Retry-After`` is not present in the response.
+        :param int max_attempts: Maximum number of attempts (shared by
+            all authorizations) before `PollError` with non-empty
+            ``waiting`` is raised.
+
+        :returns: ``(cert, updated_authzrs)`` `tuple`, c.f.
+            `acme.client.Client.poll_and_request_issuance`.
+        :rtype: `tuple`
+
+        :raises PollError: in case of timeout or if some authorization
+            was marked by the CA as invalid
+
+        """
+        updated = dict((authzr, authzr) for authzr in authzrs)
+        waiting = []
+        attempts = [max_attempts]
+
+        async def _poll_until_done(authzr):
+            when = datetime.datetime.now()
+            while True:
+                delay = (when - datetime.datetime.now()).total_seconds()
+                if attempts[0] and delay > 0:
+                    logger.debug('Sleeping for %d seconds', delay)
+                    await asyncio.sleep(delay)
+                if not attempts[0]:
+                    waiting.append((when, authzr))
+                    return
+                attempts[0] -= 1
+                updated_authzr, response = await self.poll(
+                    updated[authzr], lazy=True)
+                updated[authzr] = updated_authzr
+                # pylint: disable=no-member
+                if updated_authzr.body.status in (
+                        messages.STATUS_VALID, messages.STATUS_INVALID):
+                    return updated_authzr.body.status
+                when = client.Client.retry_after(response, default=mintime)
+
+        pending = [asyncio.ensure_future(_poll_until_done(authzr))
+                   for authzr in authzrs]
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(task.result() == messages.STATUS_INVALID
+                       for task in done):
+                    raise errors.PollError([], updated)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if waiting:
+            raise errors.PollError(
+                sorted(waiting, key=lambda item: item[0]), updated)
+
+        updated_authzrs = tuple(updated[authzr] for authzr in authzrs)
+        return (await self.request_issuance(csr, updated_authzrs),
+                updated_authzrs)
+
+    async def _get_cert(self, uri):
+        content_type = self.DER_CONTENT_TYPE
+        response = await self.net.get(uri, headers={'Accept': content_type},
+                                      content_type=content_type)
+        # pylint: disable=protected-access
+        return response, client.Client._cert_from_response(response)
+
+    async def fetch_chain(self, certr, max_length=10):
+        """Fetch chain for certificate.
+
+        :param .CertificateResource certr: Certificate Resource
+        :param int max_length: Maximum allowed length of the chain.
+
+        :raises errors.Error: if recursion exceeds `max_length`
+
+        :returns: Certificate chain for the Certificate Resource.
+        :rtype: `list` of `OpenSSL.crypto.X509` wrapped in `.ComparableX509`
+
+        """
+        chain = []
+        uri = certr.cert_chain_uri
+        while uri is not None and len(chain) < max_length:
+            response, cert = await self._get_cert(uri)
+            uri = response.links.get('up', {}).get('url')
+            chain.append(cert)
+        if uri is not None:
+            raise errors.Error(
+                "Recursion limit reached. Didn't get {0}".format(uri))
+        return chain
+
+    async def revoke(self, cert):
+        """Revoke certificate.
+
+        :param .ComparableX509 cert: `OpenSSL.crypto.X509` wrapped in
+            `.ComparableX509`
+
+        :raises .ClientError: If revocation is unsuccessful.
+
+        """
+        response = await self.net.post(
+            self.directory[messages.Revocation],
+            messages.Revocation(certificate=cert), content_type=None)
+        if response.status_code != http_client.OK:
+            raise errors.ClientError(
+                'Successful revocation must return HTTP OK status')
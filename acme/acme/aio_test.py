@@ -0,0 +1,377 @@
+"""Tests for acme.aio."""
+import json
+import os
+import sys
+import threading
+import unittest
+
+from six.moves import BaseHTTPServer  # pylint: disable=import-error
+from six.moves import http_client  # pylint: disable=import-error
+from six.moves import socketserver  # pylint: disable=import-error
+
+import mock
+
+from acme import errors
+from acme import jose
+from acme import jws as acme_jws
+from acme import messages
+from acme import test_util
+
+try:
+    import asyncio
+except ImportError:  # pragma: no cover
+    asyncio = None
+
+
+CERT_DER = test_util.load_vector('cert.der')
+CSR = test_util.load_comparable_csr('csr.der')
+KEY = jose.JWKRSA.load(test_util.load_vector('rsa512_key.pem'))
+
+NO_AIO = sys.version_info < (3, 5)
+
+
+class StubACMEServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Minimal in-process ACME CA stand-in.
+
+    Authorizations become valid after `polls_until_valid` polls. Every
+    nonce is single use; reuse is recorded in `reused_nonces`.
+
+    """
+    daemon_threads = True
+    polls_until_valid = 2
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(
+            self, ('localhost', 0), StubACMERequestHandler)
+        self.url = 'http://localhost:{0}'.format(self.socket.getsockname()[1])
+        self.lock = threading.Lock()
+        self.nonces = set()
+        self.reused_nonces = []
+        self.authzs = {}
+        self.polls = {}
+
+
+class StubACMERequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Request handler for `StubACMEServer`."""
+    # pylint: disable=invalid-name,missing-docstring
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _new_nonce(self):
+        nonce = jose.b64encode(os.urandom(8)).decode()
+        with self.server.lock:
+            self.server.nonces.add(nonce)
+        return nonce
+
+    def _respond(self, status, body=b'', content_type='application/json',
+                 headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Replay-Nonce', self._new_nonce())
+        for name, value in (headers or []):
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _respond_json(self, status, jobj, headers=None):
+        self._respond(status, json.dumps(jobj).encode(), headers=headers)
+
+    def _link(self, path, rel):
+        return ('Link', '<{0}{1}>;rel="{2}"'.format(self.server.url, path, rel))
+
+    def do_HEAD(self):
+        self._respond(http_client.OK)
+
+    def do_GET(self):
+        url = self.server.url
+        if self.path == '/directory':
+            self._respond_json(http_client.OK, {
+                'new-reg': url + '/new-reg',
+                'new-authz': url + '/new-authz',
+                'new-cert': url + '/new-cert',
+                'revoke-cert': url + '/revoke-cert',
+            })
+        elif self.path.startswith('/authz/'):
+            with self.server.lock:
+                self.server.polls[self.path] += 1
+                authz = self.server.authzs[self.path]
+                if self.server.polls[self.path] >= self.server.polls_until_valid:
+                    authz['status'] = messages.STATUS_VALID.name
+            self._respond_json(http_client.OK, authz, headers=[
+                ('Retry-After', '0'), self._link('/new-cert', 'next')])
+        elif self.path == '/chain':
+            self._respond(http_client.OK, CERT_DER, 'application/pkix-cert')
+        else:
+            self._respond(http_client.NOT_FOUND)
+
+    def do_POST(self):
+        sig = acme_jws.JWS.json_loads(
+            self.rfile.read(int(self.headers['Content-Length'])))
+        header = sig.signature.combined
+        nonce = jose.b64encode(header.nonce).decode()
+        with self.server.lock:
+            if nonce in self.server.nonces:
+                self.server.nonces.remove(nonce)
+            else:
+                self.server.reused_nonces.append(nonce)
+        payload = json.loads(sig.payload.decode())
+
+        if self.path == '/new-reg':
+            payload.pop('resource')
+            payload['key'] = header.jwk.to_partial_json()
+            self._respond_json(http_client.CREATED, payload, headers=[
+                ('Location', self.server.url + '/reg/1'),
+                self._link('/new-authz', 'next')])
+        elif self.path == '/new-authz':
+            with self.server.lock:
+                path = '/authz/{0}'.format(len(self.server.authzs))
+                self.server.polls[path] = 0
+                self.server.authzs[path] = authz = {
+                    'identifier': payload['identifier'],
+                    'status': messages.STATUS_PENDING.name,
+                    'challenges': [{
+                        'type': 'http-01', 'uri': self.server.url + path + '/0',
+                        'token': jose.b64encode(b'x' * 16).decode(),
+                    }],
+                }
+            self._respond_json(http_client.CREATED, authz, headers=[
+                ('Location', self.server.url + path),
+                self._link('/new-cert', 'next')])
+        elif self.path.startswith('/authz/'):
+            chall = dict(self.server.authzs[self.path[:-2]]['challenges'][0])
+            chall['keyAuthorization'] = payload['keyAuthorization']
+            self._respond_json(http_client.ACCEPTED, chall, headers=[
+                self._link(self.path[:-2], 'up')])
+        elif self.path == '/new-cert':
+            self._respond(http_client.CREATED, CERT_DER,
+                          'application/pkix-cert', headers=[
+                              ('Location', self.server.url + '/cert/1'),
+                              self._link('/chain', 'up')])
+        elif self.path == '/revoke-cert':
+            self._respond(http_client.OK)
+        else:
+            self._respond(http_client.NOT_FOUND)
+
+
+@unittest.skipIf(NO_AIO, 'acme.aio requires Python 3.5+')
+class AsyncClientNetworkTest(unittest.TestCase):
+    """Tests for acme.aio.AsyncClientNetwork."""
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.response = mock.MagicMock(ok=True, status_code=http_client.OK)
+        self.response.headers = {}
+        self.response.links = {}
+
+        self.nonces = [jose.b64encode(b'Nonce3'), jose.b64encode(b'Nonce2'),
+                       jose.b64encode(b'Nonce')]
+
+        def send_request(*args, **kwargs):
+            # pylint: disable=unused-argument,missing-docstring
+            self.response.headers = {
+                'Replay-Nonce': self.nonces.pop().decode()}
+            return self.response
+
+        self.wrapped = mock.sentinel.wrapped
+        from acme.client import ClientNetwork
+        self.sync_net = ClientNetwork(key=None, alg=None)
+        self.sync_net._send_request = mock.MagicMock(side_effect=send_request)
+        self.sync_net._wrap_in_jws = mock.MagicMock(return_value=self.wrapped)
+        self.sync_net._check_response = mock.MagicMock(
+            side_effect=lambda response, content_type: response)
+
+        from acme.aio import AsyncClientNetwork
+        self.net = AsyncClientNetwork(self.sync_net, max_workers=2)
+
+    def tearDown(self):
+        self.net.close()
+        self.loop.close()
+
+    def test_get(self):
+        self.assertEqual(self.response, self.loop.run_until_complete(
+            self.net.get('url', content_type='foo', bar='baz')))
+        self.sync_net._send_request.assert_called_once_with(
+            'GET', 'url', bar='baz')
+        self.sync_net._check_response.assert_called_once_with(
+            self.response, content_type='foo')
+
+    def test_post(self):
+        self.loop.run_until_complete(self.net.post('uri', mock.sentinel.obj))
+        self.sync_net._wrap_in_jws.assert_called_once_with(
+            mock.sentinel.obj, b'Nonce')
+        self.sync_net._send_request.assert_called_with(
+            'POST', 'uri', data=self.wrapped)
+        # nonce from the POST response is reused, no HEAD needed
+        self.loop.run_until_complete(self.net.post('uri', mock.sentinel.obj))
+        self.sync_net._wrap_in_jws.assert_called_with(
+            mock.sentinel.obj, b'Nonce2')
+        self.assertEqual(3, self.sync_net._send_request.call_count)
+
+    def test_post_missing_nonce(self):
+        self.sync_net._send_request.side_effect = None
+        self.sync_net._send_request.return_value = self.response
+        self.assertRaises(
+            errors.MissingNonce, self.loop.run_until_complete,
+            self.net.post('uri', mock.sentinel.obj))
+
+    def test_post_bad_nonce_retry(self):
+        bad_nonce = mock.MagicMock(status_code=http_client.BAD_REQUEST)
+        bad_nonce.json.return_value = {
+            'type': 'urn:acme:error:badNonce', 'detail': 'foo'}
+        responses = [self.response, bad_nonce, self.response]
+
+        def send_request(*args, **kwargs):
+            # pylint: disable=unused-argument,missing-docstring
+            response = responses.pop(0)
+            response.headers = {'Replay-Nonce': self.nonces.pop().decode()}
+            return response
+        self.sync_net._send_request.side_effect = send_request
+
+        self.assertEqual(self.response, self.loop.run_until_complete(
+            self.net.post('uri', mock.sentinel.obj)))
+        self.assertEqual(2, self.sync_net._wrap_in_jws.call_count)
+        self.assertEqual(1, self.sync_net.nonces.bad_nonce_retries)
+
+    def test_get_retry(self):
+        error = mock.MagicMock(
+            status_code=http_client.SERVICE_UNAVAILABLE, headers={})
+        self.sync_net._send_request.side_effect = [error, self.response]
+        self.sync_net.retry_policy.backoff = 0
+        self.assertEqual(self.response, self.loop.run_until_complete(
+            self.net.get('url')))
+        self.assertEqual(2, self.sync_net._send_request.call_count)
+
+    def test_post_shares_nonce_pool(self):
+        self.sync_net.nonces.add(b'Pooled')
+        self.loop.run_until_complete(self.net.post('uri', mock.sentinel.obj))
+        self.sync_net._wrap_in_jws.assert_called_once_with(
+            mock.sentinel.obj, b'Pooled')
+        self.assertEqual(1, self.sync_net.nonces.hits)
+        self.assertEqual(1, len(self.sync_net.nonces))
+
+    def test_close(self):
+        executor = mock.MagicMock()
+        self.sync_net.close = mock.MagicMock()
+        from acme.aio import AsyncClientNetwork
+        with AsyncClientNetwork(self.sync_net, executor=executor):
+            pass
+        self.assertFalse(executor.shutdown.called)
+        self.sync_net.close.assert_called_once_with()
+
+
+@unittest.skipIf(NO_AIO, 'acme.aio requires Python 3.5+')
+class AsyncClientTest(unittest.TestCase):
+    """Tests for acme.aio.AsyncClient against a stub ACME server."""
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.server = StubACMEServer()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+        from acme.aio import AsyncClient
+        from acme.aio import AsyncClientNetwork
+        from acme.client import ClientNetwork
+        self.net = AsyncClientNetwork(ClientNetwork(KEY), max_workers=4)
+        self.client = self.loop.run_until_complete(AsyncClient.create(
+            self.server.url + '/directory', key=KEY, net=self.net))
+
+    def tearDown(self):
+        self.net.close()
+        asyncio.set_event_loop(None)
+        self.loop.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def _run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def _authorize(self, domains):
+        return self._run(asyncio.gather(*[
+            self.client.request_domain_challenges(
+                domain, self.client.directory.new_authz)
+            for domain in domains]))
+
+    def test_create(self):
+        self.assertEqual(self.server.url + '/new-reg',
+                         self.client.directory[messages.NewRegistration])
+
+    def test_register(self):
+        new_reg = messages.NewRegistration(contact=('mailto:foo@example.com',))
+        regr = self._run(self.client.register(new_reg))
+        self.assertEqual(self.server.url + '/reg/1', regr.uri)
+        self.assertEqual(self.server.url + '/new-authz', regr.new_authzr_uri)
+        self.assertEqual(KEY.public_key(), regr.body.key)
+
+    def test_issuance(self):
+        domains = ['{0}.example.com'.format(i) for i in range(10)]
+        authzrs = self._authorize(domains)
+        self.assertEqual(domains, [authzr.body.identifier.value
+                                   for authzr in authzrs])
+
+        challb = authzrs[0].body.challenges[0]
+        challr = self._run(self.client.answer_challenge(
+            challb, challb.chall.response(KEY)))
+        self.assertEqual(authzrs[0].uri, challr.authzr_uri)
+
+        certr, updated = self._run(self.client.poll_and_request_issuance(
+            CSR, authzrs, mintime=0, max_attempts=(
+                len(domains) * self.server.polls_until_valid)))
+        self.assertTrue(all(authzr.body.status == messages.STATUS_VALID
+                            for authzr in updated))
+        self.assertEqual(self.server.url + '/chain', certr.cert_chain_uri)
+
+        chain = self._run(self.client.fetch_chain(certr))
+        self.assertEqual([test_util.load_comparable_cert('cert.der')], chain)
+        self._run(self.client.revoke(certr.body))
+        self.assertEqual([], self.server.reused_nonces)
+
+    def test_poll_lazy(self):
+        authzr = self._authorize(['a.example.com'])[0]
+        updated, _ = self._run(self.client.poll(authzr, lazy=True))
+        self.assertTrue(isinstance(updated.body, messages.LazyAuthorization))
+        self.assertEqual(messages.STATUS_PENDING, updated.body.status)
+        updated, _ = self._run(self.client.poll(authzr))
+        self.assertFalse(isinstance(updated.body, messages.LazyAuthorization))
+
+    def test_poll_and_request_issuance_timeout(self):
+        authzrs = self._authorize(['a.example.com', 'b.example.com'])
+        try:
+            self._run(self.client.poll_and_request_issuance(
+                CSR, authzrs, mintime=0, max_attempts=3))
+        except errors.PollError as error:
+            self.assertTrue(error.timeout)
+        else:  # pragma: no cover
+            self.fail('PollError not raised')
+
+    def test_poll_and_request_issuance_invalid(self):
+        authzrs = self._authorize(['a.example.com', 'b.example.com'])
+        invalid = authzrs[0].body.update(status=messages.STATUS_INVALID)
+        self.server.authzs[authzrs[0].uri[len(self.server.url):]] = (
+            invalid.to_json())
+        try:
+            self._run(self.client.poll_and_request_issuance(
+                CSR, authzrs, mintime=60))
+        except errors.PollError as error:
+            self.assertFalse(error.timeout)
+            self.assertEqual(messages.STATUS_INVALID,
+                             error.updated[authzrs[0]].body.status)
+        else:  # pragma: no cover
+            self.fail('PollError not raised')
+
+    def test_revoke_bad_status_raises_error(self):
+        self.client.directory = messages.Directory({
+            messages.Revocation: self.server.url + '/revoke-foo'})
+        self.assertRaises(errors.ClientError, self._run,
+                          self.client.revoke(jose.ComparableX509(
+                              test_util.load_cert('cert.der'))))
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
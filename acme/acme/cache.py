@@ -0,0 +1,244 @@
+"""ACME resource cache."""
+import errno
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests import structures
+
+from acme import jose
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(object):
+    """Cached HTTP resource.
+
+    :ivar str key: Cache key (usually resource URI).
+    :ivar int status_code: HTTP status code of the cached response.
+    :ivar dict headers: Subset of response headers
+        (`ResourceCache.STORED_HEADERS`).
+    :ivar bytes content: Response body.
+    :ivar float validated: Time (as returned by `time.time`) when
+        the entry was last fetched or revalidated with the server.
+
+    """
+    __slots__ = ('key', 'status_code', 'headers', 'content', 'validated')
+
+    def __init__(self, key, status_code, headers, content, validated):
+        # pylint: disable=too-many-arguments
+        self.key = key
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.validated = validated
+
+    def to_json(self):
+        """Serialize to JSON (for on-disk storage)."""
+        return {
+            'key': self.key,
+            'status_code': self.status_code,
+            'headers': self.headers,
+            'content': jose.b64encode(self.content).decode(),
+            'validated': self.validated,
+        }
+
+    @classmethod
+    def from_json(cls, jobj):
+        """Deserialize from JSON."""
+        return cls(jobj['key'], jobj['status_code'], jobj['headers'],
+                   jose.b64decode(jobj['content']), jobj['validated'])
+
+    def to_response(self):
+        """Rebuild HTTP response from the cached data.
+
+        :rtype: `requests.Response`
+
+        """
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = structures.CaseInsensitiveDict(self.headers)
+        response.url = self.key
+        # pylint: disable=protected-access
+        response._content = self.content
+        response._content_consumed = True
+        return response
+
+
+class ResourceCache(object):
+    """In-memory and (optionally) on-disk cache of ACME resources.
+
+    Entries younger than `ttl` are used without contacting the server.
+    Older entries are revalidated using a conditional request (based
+    on ``ETag`` and ``Last-Modified`` headers); if the server answers
+    ``304 Not Modified``, the cached copy is reused. Entries that were
+    not (re)validated for `max_age` are evicted.
+
+    :ivar str path: Directory where entries are persisted, or ``None``
+        for a memory-only cache.
+    :ivar int ttl: Time (in seconds) for which entries are considered
+        fresh.
+    :ivar int max_age: Time (in seconds) after which entries are evicted.
+
+    """
+    STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link',
+                      'Location')
+    """Response headers persisted in the cache."""
+
+    def __init__(self, path=None, ttl=3600, max_age=7 * 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _filename(self, key):
+        return os.path.join(
+            self.path, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def _load(self, key):
+        try:
+            with open(self._filename(key)) as cache_file:
+                entry = CacheEntry.from_json(json.load(cache_file))
+        except (IOError, OSError, ValueError, KeyError, TypeError) as error:
+            if not isinstance(error, IOError) or error.errno != errno.ENOENT:
+                logger.debug('Ignoring unreadable cache entry for %s: %s',
+                             key, error)
+            return None
+        return entry if entry.key == key else None
+
+    def _save(self, entry):
+        tmp_path = None
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path, 0o700)
+            # write atomically, so that concurrent readers never see
+            # partially written entries
+            fd, tmp_path = tempfile.mkstemp(dir=self.path)
+            with os.fdopen(fd, 'w') as tmp_file:
+                json.dump(entry.to_json(), tmp_file)
+            os.rename(tmp_path, self._filename(entry.key))
+        except (IOError, OSError) as error:
+            logger.debug('Could not persist cache entry for %s: %s',
+                         entry.key, error)
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _expired(self, entry, now):
+        return now - entry.validated >= self.max_age
+
+    def lookup(self, key):
+        """Find cache entry.
+
+        :returns: Entry or ``None`` if not found (or evicted).
+        :rtype: `CacheEntry`
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self.path is not None:
+                entry = self._load(key)
+            if entry is None:
+                return None
+            if self._expired(entry, time.time()):
+                self._evict(key)
+                return None
+            self._entries[key] = entry
+            return entry
+
+    def is_fresh(self, entry):
+        """Can entry be used without revalidation?"""
+        return time.time() - entry.validated < self.ttl
+
+    @classmethod
+    def conditional_headers(cls, entry):
+        """HTTP headers for conditional revalidation of the entry.
+
+        :rtype: dict
+
+        """
+        headers = {}
+        if 'ETag' in entry.headers:
+            headers['If-None-Match'] = entry.headers['ETag']
+        if 'Last-Modified' in entry.headers:
+            headers['If-Modified-Since'] = entry.headers['Last-Modified']
+        return headers
+
+    def _put(self, entry):
+        with self._lock:
+            self._entries[entry.key] = entry
+            if self.path is not None:
+                self._save(entry)
+        return entry
+
+    def store(self, key, response):
+        """Store HTTP response.
+
+        :param requests.Response response: Response to be cached.
+
+        :rtype: `CacheEntry`
+
+        """
+        headers = dict((name, response.headers[name])
+                       for name in self.STORED_HEADERS
+                       if name in response.headers)
+        return self._put(CacheEntry(
+            key, response.status_code, headers, response.content,
+            time.time()))
+
+    def store_content(self, key, content):
+        """Store arbitrary content (e.g. serialized resource).
+
+        :param bytes content: Content to be cached.
+
+        :rtype: `CacheEntry`
+
+        """
+        return self._put(CacheEntry(key, None, {}, content, time.time()))
+
+    def revalidated(self, entry, response):
+        """Mark entry as revalidated by a ``304 Not Modified`` response.
+
+        :rtype: `CacheEntry`
+
+        """
+        headers = dict(entry.headers)
+        headers.update((name, response.headers[name])
+                       for name in ('ETag', 'Last-Modified')
+                       if name in response.headers)
+        return self._put(CacheEntry(
+            entry.key, entry.status_code, headers, entry.content,
+            time.time()))
+
+    def _evict(self, key):
+        self._entries.pop(key, None)
+        if self.path is not None:
+            try:
+                os.remove(self._filename(key))
+            except OSError:
+                pass
+
+    def invalidate(self, key):
+        """Remove entry from the cache."""
+        with self._lock:
+            self._evict(key)
+
+    def purge(self):
+        """Evict all expired entries (including the on-disk ones)."""
+        now = time.time()
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if self._expired(entry, now):
+                    self._evict(key)
+            if self.path is None or not os.path.isdir(self.path):
+                return
+            for name in os.listdir(self.path):
+                filename = os.path.join(self.path, name)
+                if now - os.path.getmtime(filename) >= self.max_age:
+                    os.remove(filename)
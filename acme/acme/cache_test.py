@@ -0,0 +1,157 @@
+"""Tests for acme.cache."""
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+from six.moves import http_client  # pylint: disable=import-error
+
+
+class CacheEntryTest(unittest.TestCase):
+    """Tests for acme.cache.CacheEntry."""
+
+    def setUp(self):
+        from acme.cache import CacheEntry
+        self.entry = CacheEntry(
+            'uri', http_client.OK, {'Link': '<http://up>;rel="up"'},
+            b'\x00foo', 123.0)
+
+    def test_json_round_trip(self):
+        from acme.cache import CacheEntry
+        entry = CacheEntry.from_json(self.entry.to_json())
+        for name in CacheEntry.__slots__:
+            self.assertEqual(getattr(self.entry, name), getattr(entry, name))
+
+    def test_to_response(self):
+        response = self.entry.to_response()
+        self.assertEqual(http_client.OK, response.status_code)
+        self.assertEqual(b'\x00foo', response.content)
+        self.assertEqual('http://up', response.links['up']['url'])
+        self.assertEqual(
+            '<http://up>;rel="up"', response.headers['link'])
+
+
+class ResourceCacheTest(unittest.TestCase):
+    """Tests for acme.cache.ResourceCache."""
+
+    def setUp(self):
+        from acme.cache import ResourceCache
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'cache')
+        self.cache = ResourceCache(self.path, ttl=10, max_age=100)
+        self.response = mock.MagicMock(
+            status_code=http_client.OK, content=b'foo', headers={
+                'ETag': '"bar"', 'Last-Modified': 'yesterday',
+                'Replay-Nonce': 'nonce'})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _fresh_cache(self):
+        from acme.cache import ResourceCache
+        return ResourceCache(self.path, ttl=10, max_age=100)
+
+    def test_lookup_missing(self):
+        self.assertTrue(self.cache.lookup('uri') is None)
+
+    def test_store_lookup(self):
+        self.cache.store('uri', self.response)
+        entry = self.cache.lookup('uri')
+        self.assertEqual(b'foo', entry.content)
+        self.assertEqual(
+            {'ETag': '"bar"', 'Last-Modified': 'yesterday'}, entry.headers)
+
+    def test_persisted(self):
+        self.cache.store('uri', self.response)
+        self.assertEqual(1, len(os.listdir(self.path)))
+        self.assertEqual(b'foo', self._fresh_cache().lookup('uri').content)
+
+    def test_persist_failure_ignored(self):
+        with open(self.path, 'w'):
+            pass  # file in place of the cache directory
+        self.cache.store('uri', self.response)
+        self.assertEqual(b'foo', self.cache.lookup('uri').content)
+
+    @mock.patch('acme.cache.os.rename')
+    def test_persist_failure_cleans_up(self, mock_rename):
+        mock_rename.side_effect = OSError
+        self.cache.store('uri', self.response)
+        self.assertEqual([], os.listdir(self.path))
+
+    def test_memory_only(self):
+        from acme.cache import ResourceCache
+        cache = ResourceCache()
+        cache.store('uri', self.response)
+        self.assertEqual(b'foo', cache.lookup('uri').content)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_corrupted_entry_ignored(self):
+        self.cache.store('uri', self.response)
+        for name in os.listdir(self.path):
+            with open(os.path.join(self.path, name), 'w') as cache_file:
+                cache_file.write('{')
+        self.assertTrue(self._fresh_cache().lookup('uri') is None)
+
+    @mock.patch('acme.cache.time')
+    def test_is_fresh(self, mock_time):
+        mock_time.time.return_value = 1000
+        entry = self.cache.store('uri', self.response)
+        self.assertTrue(self.cache.is_fresh(entry))
+        mock_time.time.return_value = 1010
+        self.assertFalse(self.cache.is_fresh(entry))
+
+    @mock.patch('acme.cache.time')
+    def test_lookup_evicts_expired(self, mock_time):
+        mock_time.time.return_value = 1000
+        self.cache.store('uri', self.response)
+        mock_time.time.return_value = 1100
+        self.assertTrue(self.cache.lookup('uri') is None)
+        self.assertEqual([], os.listdir(self.path))
+
+    def test_conditional_headers(self):
+        entry = self.cache.store('uri', self.response)
+        self.assertEqual(
+            {'If-None-Match': '"bar"', 'If-Modified-Since': 'yesterday'},
+            self.cache.conditional_headers(entry))
+
+    @mock.patch('acme.cache.time')
+    def test_revalidated(self, mock_time):
+        mock_time.time.return_value = 1000
+        entry = self.cache.store('uri', self.response)
+        mock_time.time.return_value = 1050
+        entry = self.cache.revalidated(
+            entry, mock.MagicMock(headers={'ETag': '"baz"'}))
+        self.assertEqual(1050, entry.validated)
+        self.assertEqual('"baz"', entry.headers['ETag'])
+        self.assertEqual(b'foo', self._fresh_cache().lookup('uri').content)
+
+    def test_store_content(self):
+        self.cache.store_content('key', b'content')
+        self.assertEqual(b'content', self._fresh_cache().lookup('key').content)
+
+    def test_invalidate(self):
+        self.cache.store('uri', self.response)
+        self.cache.invalidate('uri')
+        self.cache.invalidate('uri')
+        self.assertTrue(self.cache.lookup('uri') is None)
+        self.assertEqual([], os.listdir(self.path))
+
+    @mock.patch('acme.cache.time')
+    def test_purge(self, mock_time):
+        mock_time.time.return_value = os.path.getmtime(self.tmp_dir)
+        self.cache.store('uri', self.response)
+        self.cache.purge()
+        self.assertEqual(1, len(os.listdir(self.path)))
+        mock_time.time.return_value += 200
+        self.cache.purge()
+        self.assertEqual([], os.listdir(self.path))
+
+    def test_purge_no_path(self):
+        from acme.cache import ResourceCache
+        ResourceCache().purge()
+        self.cache.purge()
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
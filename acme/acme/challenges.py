@@ -166,7 +166,8 @@ class KeyAuthorizationChallenge(_TokenDVChallenge):
     def key_authorization(self, account_key):
         """Generate Key Authorization.
 
-        :param JWK account_key:
+        :param JWK account_key: Account key, or its
+            `acme.jws.SigningContext` (whose thumbprint is cached).
         :rtype unicode:
 
         """
@@ -1,7 +1,11 @@
 """ACME client API."""
+import collections
 import datetime
+import functools
 import heapq
 import logging
+import multiprocessing.pool
+import threading
 import time
 
 import six
@@ -9,6 +13,7 @@ from six.moves import http_client  # pylint: disable=import-error
 
 import OpenSSL
 import requests
+from requests import adapters
 import sys
 import werkzeug
 
@@ -16,6 +21,7 @@ from acme import errors
 from acme import jose
 from acme import jws
 from acme import messages
+from acme import ratelimit
 
 
 logger = logging.getLogger(__name__)
@@ -41,25 +47,31 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
     :ivar bool verify_ssl: Verify SSL certificates?
     :ivar .ClientNetwork net: Client network. Useful for testing. If not
         supplied, it will be initialized using `key`, `alg` and
-        `verify_ssl`.
+        `verify_ssl`, on top of the process-wide `shared_session`.
+    :ivar .ResourceCache cache: Cache for the Directory, issuer
+        certificate chains and Registration Resources, or ``None``.
 
     """
     DER_CONTENT_TYPE = 'application/pkix-cert'
+    REGISTRATION_CACHE_PREFIX = 'regr:'
 
     def __init__(self, directory, key, alg=jose.RS256, verify_ssl=True,
-                 net=None):
+                 net=None, cache=None):
         """Initialize.
 
         :param directory: Directory Resource (`.messages.Directory`) or
             URI from which the resource will be downloaded.
 
         """
+        # pylint: disable=too-many-arguments
         self.key = key
-        self.net = ClientNetwork(key, alg, verify_ssl) if net is None else net
+        self.net = ClientNetwork(key, alg, verify_ssl,
+                                 session=shared_session()) if net is None else net
+        self.cache = cache
 
         if isinstance(directory, six.string_types):
             self.directory = messages.Directory.from_json(
-                self.net.get(directory).json())
+                self.net.get(directory, cache=cache).json())
         else:
             self.directory = directory
 
@@ -107,8 +119,25 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
                 regr.body.contact != new_reg.contact):
             raise errors.UnexpectedUpdate(regr)
 
+        return self._cache_regr(regr)
+
+    def _cache_regr(self, regr):
+        if self.cache is not None and regr.uri is not None:
+            self.cache.store_content(self.REGISTRATION_CACHE_PREFIX + regr.uri,
+                                     regr.json_dumps().encode('utf-8'))
         return regr
 
+    def _cached_regr(self, uri):
+        entry = None if self.cache is None else self.cache.lookup(
+            self.REGISTRATION_CACHE_PREFIX + uri)
+        if entry is None or not self.cache.is_fresh(entry):
+            return None
+        try:
+            return messages.RegistrationResource.json_loads(entry.content)
+        except jose.DeserializationError as error:
+            logger.debug('Ignoring corrupted cached registration: %s', error)
+            return None
+
     def _send_recv_regr(self, regr, body):
         response = self.net.post(regr.uri, body)
 
@@ -118,9 +147,9 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
         # TODO: Boulder does not set Location or Link on update
         # (c.f. acme-spec #94)
 
-        return self._regr_from_response(
+        return self._cache_regr(self._regr_from_response(
             response, uri=regr.uri, new_authzr_uri=regr.new_authzr_uri,
-            terms_of_service=regr.terms_of_service)
+            terms_of_service=regr.terms_of_service))
 
     def update_registration(self, regr, update=None):
         """Update registration.
@@ -140,13 +169,22 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
             raise errors.UnexpectedUpdate(regr)
         return updated_regr
 
-    def query_registration(self, regr):
+    def query_registration(self, regr, use_cache=False):
         """Query server about registration.
 
+        By default the server is always queried, so that changes made by
+        other clients (e.g. agreement to new terms of service) are seen.
+
         :param messages.RegistrationResource: Existing Registration
             Resource.
+        :param bool use_cache: If `cache` holds a fresh copy of the
+            resource, return it instead of querying the server. Opt-in,
+            as the copy may be stale for up to the cache TTL.
 
         """
+        cached = self._cached_regr(regr.uri) if use_cache else None
+        if cached is not None:
+            return cached
         return self._send_recv_regr(regr, messages.UpdateRegistration())
 
     def agree_to_tos(self, regr):
@@ -164,17 +202,19 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
         return self.update_registration(
             regr.update(body=regr.body.update(agreement=regr.terms_of_service)))
 
-    def _authzr_from_response(self, response, identifier,
-                              uri=None, new_cert_uri=None):
-        # pylint: disable=no-self-use
+    @classmethod
+    def _authzr_from_response(cls, response, identifier,
+                              uri=None, new_cert_uri=None, lazy=False):
         if new_cert_uri is None:
             try:
                 new_cert_uri = response.links['next']['url']
             except KeyError:
                 raise errors.ClientError('"next" link missing')
 
+        body_cls = (messages.LazyAuthorization if lazy
+                    else messages.Authorization)
         authzr = messages.AuthorizationResource(
-            body=messages.Authorization.from_json(response.json()),
+            body=body_cls.from_json(response.json()),
             uri=response.headers.get('Location', uri),
             new_cert_uri=new_cert_uri)
         if authzr.body.identifier != identifier:
@@ -231,7 +271,11 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
         :raises .UnexpectedUpdate:
 
         """
-        response = self.net.post(challb.uri, response)
+        return self._challr_from_response(
+            self.net.post(challb.uri, response), challb)
+
+    @classmethod
+    def _challr_from_response(cls, response, challb):
         try:
             authzr_uri = response.links['up']['url']
         except KeyError:
@@ -269,11 +313,34 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
 
         return datetime.datetime.now() + datetime.timedelta(seconds=seconds)
 
-    def poll(self, authzr):
+    @classmethod
+    def retry_after_delay(cls, response, default=None):
+        """Compute delay based on response ``Retry-After`` header.
+
+        :param requests.Response response: Response from the server.
+        :param default: Returned if ``Retry-After`` header is not
+            present; also used (in seconds, or ``0`` if ``None``) when
+            the header is invalid.
+
+        :returns: Delay (in seconds) requested by the server.
+        :rtype: int
+
+        """
+        if 'Retry-After' not in response.headers:
+            return default
+        delta = (cls.retry_after(response, 0 if default is None else default)
+                 - datetime.datetime.now())
+        return max(0, delta.days * 24 * 3600 + delta.seconds)
+
+    def poll(self, authzr, lazy=False):
         """Poll Authorization Resource for status.
 
         :param authzr: Authorization Resource
         :type authzr: `.AuthorizationResource`
+        :param bool lazy: If ``True``, body of the updated Authorization
+            Resource is `.LazyAuthorization`, i.e. challenges are
+            deserialized only when accessed. Useful if only the status
+            is checked.
 
         :returns: Updated Authorization Resource and HTTP response.
 
@@ -282,7 +349,8 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
         """
         response = self.net.get(authzr.uri)
         updated_authzr = self._authzr_from_response(
-            response, authzr.body.identifier, authzr.uri, authzr.new_cert_uri)
+            response, authzr.body.identifier, authzr.uri, authzr.new_cert_uri,
+            lazy=lazy)
         # TODO: check and raise UnexpectedUpdate
         return updated_authzr, response
 
@@ -310,7 +378,10 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
             req,
             content_type=content_type,
             headers={'Accept': content_type})
+        return self._certr_from_response(response, authzrs)
 
+    @classmethod
+    def _certr_from_response(cls, response, authzrs):
         cert_chain_uri = response.links.get('up', {}).get('url')
 
         try:
@@ -320,16 +391,21 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
 
         return messages.CertificateResource(
             uri=uri, authzrs=authzrs, cert_chain_uri=cert_chain_uri,
-            body=jose.ComparableX509(OpenSSL.crypto.load_certificate(
-                OpenSSL.crypto.FILETYPE_ASN1, response.content)))
+            body=cls._cert_from_response(response))
+
+    @classmethod
+    def _cert_from_response(cls, response):
+        return jose.ComparableX509(OpenSSL.crypto.load_certificate(
+            OpenSSL.crypto.FILETYPE_ASN1, response.content))
 
     def poll_and_request_issuance(
-            self, csr, authzrs, mintime=5, max_attempts=10):
+            self, csr, authzrs, mintime=5, max_attempts=10, max_workers=1):
         """Poll and request issuance.
 
         This function polls all provided Authorization Resource URIs
         until all challenges are valid, respecting ``Retry-After`` HTTP
-        headers, and then calls `request_issuance`.
+        headers, and then calls `request_issuance`. Polling stops as
+        soon as any authorization is marked invalid.
 
         :param .ComparableX509 csr: CSR (`OpenSSL.crypto.X509Req`
             wrapped in `.ComparableX509`)
@@ -338,59 +414,88 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
             ``Retry-After`` is not present in the response.
         :param int max_attempts: Maximum number of attempts before
             `PollError` with non-empty ``waiting`` is raised.
+        :param int max_workers: Maximum number of authorizations polled
+            in parallel. If greater than 1, all authorizations that are
+            due (according to their ``Retry-After``) are polled
+            concurrently using a pool of worker threads.
 
         :returns: ``(cert, updated_authzrs)`` `tuple` where ``cert`` is
             the issued certificate (`.messages.CertificateResource`),
             and ``updated_authzrs`` is a `tuple` consisting of updated
             Authorization Resources (`.AuthorizationResource`) as
-            present in the responses from server, and in the same order
-            as the input ``authzrs``.
+            present in the responses from server (with
+            `.LazyAuthorization` bodies), and in the same order as the
+            input ``authzrs``.
         :rtype: `tuple`
 
         :raises PollError: in case of timeout or if some authorization
-            was marked by the CA as invalid
+            was marked by the CA as invalid (``waiting`` is empty then)
 
         """
         # priority queue with datetime (based on Retry-After) as key,
-        # and original Authorization Resource as value
-        waiting = [(datetime.datetime.now(), authzr) for authzr in authzrs]
+        # and original Authorization Resource as value; position in
+        # authzrs breaks ties, so that resources are never compared
+        waiting = [(datetime.datetime.now(), index, authzr)
+                   for index, authzr in enumerate(authzrs)]
         # mapping between original Authorization Resource and the most
         # recently updated one
         updated = dict((authzr, authzr) for authzr in authzrs)
 
-        while waiting and max_attempts:
-            max_attempts -= 1
-            # find the smallest Retry-After, and sleep if necessary
-            when, authzr = heapq.heappop(waiting)
-            now = datetime.datetime.now()
-            if when > now:
-                seconds = (when - now).seconds
-                logger.debug('Sleeping for %d seconds', seconds)
-                time.sleep(seconds)
-
-            # Note that we poll with the latest updated Authorization
-            # URI, which might have a different URI than initial one
-            updated_authzr, response = self.poll(updated[authzr])
-            updated[authzr] = updated_authzr
-
-            # pylint: disable=no-member
-            if updated_authzr.body.status not in (
-                    messages.STATUS_VALID, messages.STATUS_INVALID):
-                # push back to the priority queue, with updated retry_after
-                heapq.heappush(waiting, (self.retry_after(
-                    response, default=mintime), authzr))
-
-        if not max_attempts or any(authzr.body.status == messages.STATUS_INVALID
-                                   for authzr in six.itervalues(updated)):
-            raise errors.PollError(waiting, updated)
+        pool = (multiprocessing.pool.ThreadPool(max_workers)
+                if max_workers > 1 else None)
+        try:
+            while waiting and max_attempts:
+                # find the smallest Retry-After, and sleep if necessary
+                when = waiting[0][0]
+                now = datetime.datetime.now()
+                if when > now:
+                    seconds = (when - now).seconds
+                    logger.debug('Sleeping for %d seconds', seconds)
+                    time.sleep(seconds)
+
+                # take all Authorization Resources that are due now
+                due = [heapq.heappop(waiting)[1:]]
+                max_attempts -= 1
+                now = datetime.datetime.now()
+                while (waiting and max_attempts and len(due) < max_workers
+                       and waiting[0][0] <= now):
+                    due.append(heapq.heappop(waiting)[1:])
+                    max_attempts -= 1
+
+                # Note that we poll with the latest updated Authorization
+                # URI, which might have a different URI than initial one
+                polls = [updated[authzr] for _, authzr in due]
+                poll = functools.partial(self.poll, lazy=True)
+                results = (map(poll, polls) if pool is None
+                           else pool.map(poll, polls))
+
+                for (index, authzr), (updated_authzr, response) in zip(
+                        due, results):
+                    updated[authzr] = updated_authzr
+                    # pylint: disable=no-member
+                    if updated_authzr.body.status == messages.STATUS_INVALID:
+                        raise errors.PollError([], updated)
+                    elif updated_authzr.body.status != messages.STATUS_VALID:
+                        # push back to the priority queue, with updated
+                        # retry_after
+                        heapq.heappush(waiting, (self.retry_after(
+                            response, default=mintime), index, authzr))
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        if not max_attempts:
+            raise errors.PollError(
+                [(when, authzr) for when, _, authzr in waiting], updated)
 
         updated_authzrs = tuple(updated[authzr] for authzr in authzrs)
         return self.request_issuance(csr, updated_authzrs), updated_authzrs
 
-    def _get_cert(self, uri):
+    def _get_cert(self, uri, cache=None):
         """Returns certificate from URI.
 
         :param str uri: URI of certificate
+        :param .ResourceCache cache: Cache to be consulted, if any.
 
         :returns: tuple of the form
             (response, :class:`acme.jose.ComparableX509`)
@@ -399,9 +504,8 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
         """
         content_type = self.DER_CONTENT_TYPE  # TODO: make it a param
         response = self.net.get(uri, headers={'Accept': content_type},
-                                content_type=content_type)
-        return response, jose.ComparableX509(OpenSSL.crypto.load_certificate(
-            OpenSSL.crypto.FILETYPE_ASN1, response.content))
+                                content_type=content_type, cache=cache)
+        return response, self._cert_from_response(response)
 
     def check_cert(self, certr):
         """Check for new cert.
@@ -443,8 +547,8 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
         :param .CertificateResource certr: Certificate Resource
         :param int max_length: Maximum allowed length of the chain.
             Note that each element in the certificate requires new
-            ``HTTP GET`` request, and the length of the chain is
-            controlled by the ACME CA.
+            ``HTTP GET`` request (unless found in `cache`), and the
+            length of the chain is controlled by the ACME CA.
 
         :raises errors.Error: if recursion exceeds `max_length`
 
@@ -458,7 +562,7 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
         chain = []
         uri = certr.cert_chain_uri
         while uri is not None and len(chain) < max_length:
-            response, cert = self._get_cert(uri)
+            response, cert = self._get_cert(uri, cache=self.cache)
             uri = response.links.get('up', {}).get('url')
             chain.append(cert)
         if uri is not None:
@@ -466,6 +570,101 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
                 "Recursion limit reached. Didn't get {0}".format(uri))
         return chain
 
+    def request_issuance_many(self, issuance_requests, max_workers=4,
+                              min_interval=0, max_chain_length=10):
+        """Request issuance of many certificates.
+
+        Certificates are requested (`request_issuance`) by a pool of
+        worker threads, and their chains fetched (`fetch_chain`). As
+        all certificates issued by the same intermediate share the
+        chain, each chain is fetched only once, keyed by the ``up``
+        link of the certificate.
+
+        :param issuance_requests: Iterable of ``(csr, authzrs)`` tuples
+            (c.f. `request_issuance`). It is consumed lazily, i.e. no
+            more than `max_workers` requests are in flight at once.
+        :param int max_workers: Maximum number of concurrent requests.
+        :param float min_interval: Minimum time (in seconds) between
+            consecutive issuance requests sent to the CA.
+        :param int max_chain_length: Passed to `fetch_chain`.
+
+        :returns: Iterator over ``(certr, chain)`` tuples, in order of
+            completion, where ``certr`` is the issued certificate
+            (`.messages.CertificateResource`) and ``chain`` is its
+            chain (c.f. `fetch_chain`). If the chain cannot be fetched,
+            the issued certificate is still returned, with an empty
+            chain; the failure is logged and the chain is fetched again
+            for the next certificate sharing it.
+
+        :raises: Any error raised by `request_issuance` is re-raised by
+            the iterator; outstanding requests are abandoned then.
+
+        """
+        chains = {}
+        chain_locks = collections.defaultdict(threading.Lock)
+        chain_locks_lock = threading.Lock()
+        throttle_lock = threading.Lock()
+        next_request = [0]
+
+        def throttle():  # pylint: disable=missing-docstring
+            with throttle_lock:
+                delay = next_request[0] - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                next_request[0] = time.time() + min_interval
+
+        def chain_for(certr):  # pylint: disable=missing-docstring
+            uri = certr.cert_chain_uri
+            if uri is None:
+                return []
+            with chain_locks_lock:
+                lock = chain_locks[uri]
+            with lock:
+                if uri not in chains:
+                    chains[uri] = self.fetch_chain(certr, max_chain_length)
+            return chains[uri]
+
+        done = six.moves.queue.Queue()
+
+        def issue(csr, authzrs):  # pylint: disable=missing-docstring
+            try:
+                throttle()
+                certr = self.request_issuance(csr, authzrs)
+            except Exception:  # pylint: disable=broad-except
+                done.put((False, sys.exc_info()))
+                return
+            try:
+                chain = chain_for(certr)
+            except Exception as error:  # pylint: disable=broad-except
+                logger.warning('Failed to fetch chain of %s: %s',
+                               certr.uri, error)
+                chain = []
+            done.put((True, (certr, chain)))
+
+        pool = multiprocessing.pool.ThreadPool(max_workers)
+        try:
+            pending = 0
+            issuance_requests = iter(issuance_requests)
+            exhausted = False
+            while True:
+                while not exhausted and pending < max_workers:
+                    try:
+                        csr, authzrs = next(issuance_requests)
+                    except StopIteration:
+                        exhausted = True
+                    else:
+                        pool.apply_async(issue, (csr, authzrs))
+                        pending += 1
+                if not pending:
+                    break
+                success, result = done.get()
+                pending -= 1
+                if not success:
+                    six.reraise(*result)
+                yield result
+        finally:
+            pool.terminate()
+
     def revoke(self, cert):
         """Revoke certificate.
 
@@ -483,19 +682,410 @@ class Client(object):  # pylint: disable=too-many-instance-attributes
                 'Successful revocation must return HTTP OK status')
 
 
+_SHARED_SESSION = None
+_SHARED_SESSION_LOCK = threading.Lock()
+
+
+def shared_session():
+    """Get process-wide HTTP session.
+
+    The session (and its connection pool) is created on first use and
+    then reused by every caller, so that all `ClientNetwork` instances
+    in a process can share keep-alive connections to the CA.
+
+    :rtype: `requests.Session`
+
+    """
+    global _SHARED_SESSION  # pylint: disable=global-statement
+    with _SHARED_SESSION_LOCK:
+        if _SHARED_SESSION is None:
+            _SHARED_SESSION = ClientNetwork.new_session()
+        return _SHARED_SESSION
+
+
+class CachedResponse(object):
+    """HTTP response with cached JSON body.
+
+    Wraps `requests.Response`, proxying all its attributes, but decodes
+    the JSON body at most once, no matter how many times `json` is
+    called (e.g. by `ClientNetwork` when checking for errors, and then
+    by `Client` when deserializing the resource).
+
+    :ivar requests.Response response: Wrapped response.
+
+    """
+    __slots__ = ('response', '_jobj', '_error')
+    _NOT_DECODED = object()
+
+    def __init__(self, response):
+        self.response = response
+        self._jobj = self._NOT_DECODED
+        self._error = None
+
+    def json(self):
+        """Decode JSON body (once).
+
+        :raises ValueError: If body is not a valid JSON.
+
+        """
+        if self._jobj is self._NOT_DECODED:
+            try:
+                self._jobj = self.response.json()
+            except ValueError as error:
+                self._jobj = None
+                self._error = error
+        if self._error is not None:
+            raise self._error
+        return self._jobj
+
+    def __getattr__(self, name):
+        return getattr(self.response, name)
+
+    def __repr__(self):
+        return repr(self.response)
+
+
+class RetryPolicy(object):
+    """Retry policy for `ClientNetwork` requests.
+
+    Decides, based on the server response, whether (and after what
+    delay) a request should be sent again. ``POST`` requests are only
+    retried if the server rejected the nonce (``badNonce``) or
+    explicitly asked the client to come back later (``429 Too Many
+    Requests`` or ``503 Service Unavailable``), as otherwise the server
+    might have already acted upon them. Idempotent ``GET`` requests are
+    also retried on other transient server errors.
+
+    Delay is taken from the ``Retry-After`` response header (c.f.
+    `Client.retry_after_delay`) if present, and computed using
+    exponential backoff otherwise. Requests are never retried if the
+    server asks to wait longer than ``max_delay``. Note that
+    `ClientNetwork` doesn't sleep for the delay of a throttled request
+    (``429 Too Many Requests``) whose endpoint class is limited by its
+    `ClientNetwork.rate_limiter`, which already enforces the wait.
+
+    Subclasses can override `delay` to implement custom policies.
+
+    :ivar int max_attempts: Maximum total number of attempts per request
+        (including the first one).
+    :ivar int backoff: Delay (in seconds) before the first retry,
+        doubled for each subsequent one.
+    :ivar int max_delay: Maximum delay (in seconds) before a retry.
+    :ivar dict stats: Number of retries per reason (``badNonce`` or
+        HTTP status code), and number of requests that were given up
+        after exhausting ``max_attempts`` (``gave_up``).
+
+    """
+    IDEMPOTENT_RETRY_STATUS_CODES = frozenset([
+        429,  # Too Many Requests, missing in Python 2 httplib
+        http_client.INTERNAL_SERVER_ERROR,
+        http_client.BAD_GATEWAY,
+        http_client.SERVICE_UNAVAILABLE,
+        http_client.GATEWAY_TIMEOUT,
+    ])
+    """Status codes for which idempotent requests are retried."""
+
+    RETRY_STATUS_CODES = frozenset([
+        429,  # Too Many Requests, missing in Python 2 httplib
+        http_client.SERVICE_UNAVAILABLE,
+    ])
+    """Status codes for which non-idempotent requests are retried."""
+
+    IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD'])
+
+    def __init__(self, max_attempts=3, backoff=1, max_delay=60):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.stats = collections.defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _record(self, reason):
+        with self._lock:
+            self.stats[reason] += 1
+
+    @classmethod
+    def is_bad_nonce(cls, response):
+        """Is the response an ACME ``badNonce`` error?"""
+        if response.status_code != http_client.BAD_REQUEST:
+            return False
+        try:
+            jobj = response.json()
+        except ValueError:
+            return False
+        return (isinstance(jobj, dict) and
+                jobj.get('type') == ClientNetwork.BAD_NONCE_ERROR_TYPE)
+
+    def _reason(self, method, response):
+        if self.is_bad_nonce(response):
+            return 'badNonce'
+        status_codes = (self.IDEMPOTENT_RETRY_STATUS_CODES
+                        if method in self.IDEMPOTENT_METHODS
+                        else self.RETRY_STATUS_CODES)
+        if response.status_code in status_codes:
+            return response.status_code
+        return None
+
+    def delay(self, method, attempt, response):
+        """Compute delay before the next attempt.
+
+        :param str method: HTTP method of the request.
+        :param int attempt: Number of attempts made so far.
+        :param requests.Response response: Response to the last attempt.
+
+        :returns: Delay in seconds, or ``None`` if request should not
+            be retried.
+
+        """
+        reason = self._reason(method, response)
+        if reason is None:
+            return None
+        if attempt >= self.max_attempts:
+            self._record('gave_up')
+            return None
+
+        if reason == 'badNonce':
+            delay = 0  # fresh nonce is all that is needed
+        else:
+            backoff = min(self.backoff * 2 ** (attempt - 1), self.max_delay)
+            delay = Client.retry_after_delay(response, default=backoff)
+            if delay > self.max_delay:
+                logger.debug('Server asked to retry after %d seconds, '
+                             'giving up', delay)
+                self._record('gave_up')
+                return None
+
+        self._record(reason)
+        return delay
+
+
+class NoncePool(object):
+    """Thread-safe pool of replay nonces.
+
+    Nonces are handed out in FIFO order, so that the oldest (most
+    likely to expire) ones are used first. Nonces older than `max_age`
+    are considered stale and silently dropped.
+
+    :ivar int low_water: Pool size below which `needs_refill` is true.
+    :ivar max_age: Maximum nonce age (in seconds), or ``None`` if nonces
+        never expire.
+    :ivar int hits: Number of `pop` calls served from the pool.
+    :ivar int misses: Number of `pop` calls that found the pool empty.
+    :ivar int expired: Number of stale nonces dropped.
+    :ivar int bad_nonces: Number of ``badNonce`` errors reported by
+        the server.
+    :ivar int bad_nonce_retries: Number of requests retried after a
+        ``badNonce`` error.
+
+    """
+
+    def __init__(self, low_water=0, max_age=None):
+        self.low_water = low_water
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.bad_nonces = 0
+        self.bad_nonce_retries = 0
+        self._lock = threading.Lock()
+        self._nonces = collections.deque()
+
+    def __len__(self):
+        return len(self._nonces)
+
+    def add(self, nonce):
+        """Add fresh nonce to the pool."""
+        with self._lock:
+            self._nonces.append((time.time(), nonce))
+
+    def pop(self):
+        """Get a nonce from the pool.
+
+        :returns: Nonce, or ``None`` if the pool has no fresh nonces.
+        :rtype: bytes
+
+        """
+        with self._lock:
+            while self._nonces:
+                added, nonce = self._nonces.popleft()
+                if self.max_age is None or time.time() - added < self.max_age:
+                    self.hits += 1
+                    return nonce
+                self.expired += 1
+            self.misses += 1
+            return None
+
+    def needs_refill(self):
+        """Is the pool below its low-water mark?"""
+        return len(self._nonces) < self.low_water
+
+    def bad_nonce(self):
+        """Count a ``badNonce`` error reported by the server."""
+        with self._lock:
+            self.bad_nonces += 1
+
+    def bad_nonce_retry(self):
+        """Count a request retried after a ``badNonce`` error."""
+        with self._lock:
+            self.bad_nonce_retries += 1
+
+    def stats(self):
+        """Pool statistics.
+
+        :rtype: dict
+
+        """
+        with self._lock:
+            return dict(
+                size=len(self), hits=self.hits, misses=self.misses,
+                expired=self.expired, bad_nonces=self.bad_nonces,
+                bad_nonce_retries=self.bad_nonce_retries)
+
+
 class ClientNetwork(object):
-    """Client network."""
+    """Client network.
+
+    All requests are sent through a `requests.Session`, which keeps
+    connections to the server alive and pools them per host. Network
+    can be used as a context manager, in which case `close` is called
+    on exit.
+
+    :ivar requests.Session session: HTTP session. If not supplied in
+        the constructor, a new one is created (using ``pool_connections``,
+        ``pool_maxsize``, ``max_retries`` and ``http2``), and owned by
+        the network, i.e. it will be closed by `close`. Externally supplied sessions
+        (e.g. `shared_session`) are never closed by the network.
+    :ivar .RetryPolicy retry_policy: Policy used to retry failed
+        `get` and `post` requests.
+    :ivar .NoncePool nonces: Pool of replay nonces. If its size drops
+        below ``nonce_low_water``, it is refilled with ``HEAD``
+        requests in a background thread, so that subsequent ``POST``
+        requests don't pay for an extra round-trip. A ``POST`` that
+        finds the pool empty fetches its own nonce instead of waiting
+        for the refill.
+    :ivar .RateLimiter rate_limiter: Client-side rate limiter consulted
+        before each `get` and `post` request (if not ``None``). It learns
+        from requests throttled by the server (``429 Too Many Requests``
+        and ``Retry-After``), and owns the wait before they are retried.
+
+    """
     JSON_CONTENT_TYPE = 'application/json'
     JSON_ERROR_CONTENT_TYPE = 'application/problem+json'
     REPLAY_NONCE_HEADER = 'Replay-Nonce'
+    BAD_NONCE_ERROR_TYPE = 'urn:acme:error:badNonce'
+
+    POOL_CONNECTIONS = 10
+    """Default number of per-host connection pools to cache."""
+    POOL_MAXSIZE = 10
+    """Default maximum number of connections kept alive per host."""
+    NONCE_MAX_AGE = 300
+    """Default maximum age of pooled nonces, in seconds."""
 
     def __init__(self, key, alg=jose.RS256, verify_ssl=True,
-                 user_agent='acme-python'):
+                 user_agent='acme-python', session=None,
+                 pool_connections=POOL_CONNECTIONS,
+                 pool_maxsize=POOL_MAXSIZE, max_retries=0,
+                 nonce_low_water=0, nonce_max_age=NONCE_MAX_AGE,
+                 retry_policy=None, rate_limiter=None, http2=False):
+        # pylint: disable=too-many-arguments,too-many-locals
         self.key = key
         self.alg = alg
         self.verify_ssl = verify_ssl
-        self._nonces = set()
+        self.retry_policy = RetryPolicy() if retry_policy is None else (
+            retry_policy)
+        self.nonces = NoncePool(nonce_low_water, nonce_max_age)
+        self.rate_limiter = rate_limiter
+        self._signing_context = None
+        self._refill_lock = threading.Lock()
+        self._refill_thread = None
+        self._closed = False
         self.user_agent = user_agent
+        self._owns_session = session is None
+        self.session = self.new_session(
+            pool_connections, pool_maxsize, max_retries, http2) if (
+                session is None) else session
+
+    @classmethod
+    def new_session(cls, pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE, max_retries=0, http2=False):
+        """Create new HTTP session with a connection pool.
+
+        :param int pool_connections: Number of per-host connection
+            pools to cache.
+        :param int pool_maxsize: Maximum number of connections kept
+            alive in each per-host pool.
+        :param max_retries: Retry policy for failed connections, either
+            an `int` or a `requests.packages.urllib3.util.retry.Retry`
+            instance. Note that nonce-carrying ``POST`` requests are
+            never replayed by the default policy.
+        :param bool http2: Send ``https://`` requests using HTTP/2, so
+            that concurrent requests to the same host are multiplexed
+            over a single connection. Requires the optional ``hyper``
+            package (``acme[http2]``). Servers that do not negotiate
+            HTTP/2 are transparently spoken to over HTTP/1.1.
+            `pool_connections`, `pool_maxsize` and `max_retries` do not
+            apply to ``https://`` requests then, and a warning is logged
+            if they are set.
+
+        :rtype: `requests.Session`
+
+        :raises .errors.Error: if `http2` is requested, but ``hyper`` is
+            not installed.
+
+        """
+        session = requests.Session()
+        adapter = adapters.HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+            max_retries=max_retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if http2:
+            try:
+                # pylint: disable=import-error
+                from hyper.contrib import HTTP20Adapter
+            except ImportError:
+                raise errors.Error(
+                    'HTTP/2 requires the "hyper" package, install acme[http2]')
+            if (pool_connections, pool_maxsize, max_retries) != (
+                    cls.POOL_CONNECTIONS, cls.POOL_MAXSIZE, 0):
+                logger.warning('pool_connections, pool_maxsize and '
+                               'max_retries are ignored for HTTP/2 requests')
+            session.mount('https://', HTTP20Adapter())
+        return session
+
+    def close(self):
+        """Close the network, releasing pooled connections.
+
+        Only sessions created by the network itself are closed.
+        Background nonce refill is stopped, and `rate_limiter` state
+        is saved.
+
+        """
+        self._closed = True
+        if self.rate_limiter is not None:
+            self.rate_limiter.save()
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def signing_context(self):
+        """Signing context (`.SigningContext`) for `key` and `alg`.
+
+        Created on first use, and re-created if `key` or `alg` change.
+
+        """
+        context = self._signing_context
+        if context is None or context.key is not self.key or (
+                context.alg is not self.alg):
+            context = self._signing_context = jws.SigningContext(
+                self.key, self.alg)
+        return context
 
     def _wrap_in_jws(self, obj, nonce):
         """Wrap `JSONDeSerializable` object in JWS.
@@ -504,13 +1094,13 @@ class ClientNetwork(object):
 
         :param .JSONDeSerializable obj:
         :param bytes nonce:
-        :rtype: `.JWS`
+        :returns: Serialized `.JWS`.
+        :rtype: str
 
         """
         jobj = obj.json_dumps().encode()
         logger.debug('Serialized JSON: %s', jobj)
-        return jws.JWS.sign(
-            payload=jobj, key=self.key, alg=self.alg, nonce=nonce).json_dumps()
+        return self.signing_context.sign(jobj, nonce)
 
     @classmethod
     def _check_response(cls, response, content_type=None):
@@ -531,16 +1121,15 @@ class ClientNetwork(object):
         :raises .ClientError: In case of other networking errors.
 
         """
-        logger.debug('Received response %s (headers: %s): %r',
-                     response, response.headers, response.content)
-
         response_ct = response.headers.get('Content-Type')
-        try:
-            # TODO: response.json() is called twice, once here, and
-            # once in _get and _post clients
-            jobj = response.json()
-        except ValueError as error:
-            jobj = None
+        jobj = None
+        # non-JSON bodies (e.g. DER certificates) are only decoded if
+        # they might carry an error
+        if not response.ok or content_type == cls.JSON_CONTENT_TYPE:
+            try:
+                jobj = response.json()
+            except ValueError:
+                pass
 
         if not response.ok:
             if jobj is not None:
@@ -573,7 +1162,7 @@ class ClientNetwork(object):
 
         Makes sure that `verify_ssl` is respected. Logs request and
         response (with headers). For allowed parameters please see
-        `requests.request`.
+        `requests.Session.request`.
 
         :param str method: method for the new `requests.Request` object
         :param str url: URL for the new `requests.Request` object
@@ -581,19 +1170,22 @@ class ClientNetwork(object):
         :raises requests.exceptions.RequestException: in case of any problems
 
         :returns: HTTP Response
-        :rtype: `requests.Response`
+        :rtype: `CachedResponse`
 
 
         """
-        logging.debug('Sending %s request to %s. args: %r, kwargs: %r',
-                      method, url, args, kwargs)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug('Sending %s request to %s. args: %r, kwargs: %r',
+                         method, url, args, kwargs)
         kwargs['verify'] = self.verify_ssl
         kwargs.setdefault('headers', {})
         kwargs['headers'].setdefault('User-Agent', self.user_agent)
-        response = requests.request(method, url, *args, **kwargs)
-        logging.debug('Received %s. Headers: %s. Content: %r',
-                      response, response.headers, response.content)
-        return response
+        response = self.session.request(method, url, *args, **kwargs)
+        if debug:
+            logger.debug('Received %s. Headers: %s. Content: %r',
+                         response, response.headers, response.content)
+        return CachedResponse(response)
 
     def head(self, *args, **kwargs):
         """Send HEAD request without checking the response.
@@ -605,32 +1197,176 @@ class ClientNetwork(object):
         """
         return self._send_request('HEAD', *args, **kwargs)
 
-    def get(self, url, content_type=JSON_CONTENT_TYPE, **kwargs):
-        """Send GET request and check response."""
-        return self._check_response(
-            self._send_request('GET', url, **kwargs), content_type=content_type)
+    def _retry_delay(self, method, attempt, response, endpoint):
+        """Get delay before retrying, or ``None`` if shouldn't retry."""
+        delay = self.retry_policy.delay(method, attempt, response)
+        if (delay is not None and response.status_code == 429 and
+                self.rate_limiter is not None and
+                self.rate_limiter.limits(endpoint)):
+            # rate limiter has learned Retry-After (_learn_rate_limit),
+            # and waits before the next attempt is sent
+            delay = 0
+        if delay is not None:
+            logger.debug('Retrying %s request (attempt %d) in %d seconds',
+                         method, attempt + 1, delay)
+        return delay
+
+    def get(self, url, content_type=JSON_CONTENT_TYPE, cache=None, **kwargs):
+        """Send GET request and check response.
+
+        Transient server errors are retried according to `retry_policy`.
+
+        :param .ResourceCache cache: If provided, fresh cached responses
+            are returned without contacting the server, stale ones are
+            revalidated using a conditional request, and successful
+            responses are stored.
 
-    def _add_nonce(self, response):
-        if self.REPLAY_NONCE_HEADER in response.headers:
-            nonce = response.headers[self.REPLAY_NONCE_HEADER]
+        """
+        if cache is None:
+            return self._check_response(
+                self._get_with_retries(url, **kwargs),
+                content_type=content_type)
+
+        entry = cache.lookup(url)
+        if entry is not None:
+            if cache.is_fresh(entry):
+                logger.debug('Using cached response for %s', url)
+                return CachedResponse(entry.to_response())
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers.update(cache.conditional_headers(entry))
+            kwargs['headers'] = headers
+
+        response = self._get_with_retries(url, **kwargs)
+        if entry is not None and (
+                response.status_code == http_client.NOT_MODIFIED):
+            logger.debug('Cached response for %s revalidated', url)
+            return CachedResponse(
+                cache.revalidated(entry, response).to_response())
+
+        response = self._check_response(response, content_type=content_type)
+        cache.store(url, response)
+        return response
+
+    def _get_with_retries(self, url, **kwargs):
+        endpoint = ratelimit.RateLimiter.endpoint_class('GET')
+        attempt = 1
+        response = self._get_once(endpoint, url, **kwargs)
+        delay = self._retry_delay('GET', attempt, response, endpoint)
+        while delay is not None:
+            time.sleep(delay)
+            attempt += 1
+            response = self._get_once(endpoint, url, **kwargs)
+            delay = self._retry_delay('GET', attempt, response, endpoint)
+        return response
+
+    def _wait_for_rate_limit(self, endpoint):
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(endpoint)
+
+    def _learn_rate_limit(self, endpoint, response):
+        if self.rate_limiter is None:
+            return
+        if response.status_code == 429:  # missing in Python 2 httplib
+            self.rate_limiter.throttled(
+                endpoint, Client.retry_after_delay(response))
+        elif response.ok:
+            self.rate_limiter.succeeded(endpoint)
+
+    def _get_once(self, endpoint, url, **kwargs):
+        self._wait_for_rate_limit(endpoint)
+        response = self._send_request('GET', url, **kwargs)
+        self._learn_rate_limit(endpoint, response)
+        return response
+
+    @classmethod
+    def _nonce_from_response(cls, response):
+        """Decode nonce from response ``Replay-Nonce`` header.
+
+        :raises .BadNonce: If nonce cannot be decoded.
+        :raises .MissingNonce: If response doesn't carry a nonce.
+
+        :rtype: bytes
+
+        """
+        if cls.REPLAY_NONCE_HEADER in response.headers:
+            nonce = response.headers[cls.REPLAY_NONCE_HEADER]
             try:
-                decoded_nonce = jws.Header._fields['nonce'].decode(nonce)
+                return jws.Header._fields['nonce'].decode(nonce)
             except jose.DeserializationError as error:
                 raise errors.BadNonce(nonce, error)
-            logger.debug('Storing nonce: %r', decoded_nonce)
-            self._nonces.add(decoded_nonce)
         else:
             raise errors.MissingNonce(response)
 
+    def _add_nonce(self, response):
+        decoded_nonce = self._nonce_from_response(response)
+        logger.debug('Storing nonce: %r', decoded_nonce)
+        self.nonces.add(decoded_nonce)
+
+    def _refill_nonces(self, url):
+        try:
+            while self.nonces.needs_refill() and not self._closed:
+                self._add_nonce(self.head(url))
+        except (requests.exceptions.RequestException,
+                errors.NonceError) as error:
+            logger.debug('Background nonce refill failed: %s', error)
+        finally:
+            with self._refill_lock:
+                self._refill_thread = None
+
+    def _maybe_refill_nonces(self, url):
+        if not self.nonces.needs_refill() or self._closed:
+            return
+        with self._refill_lock:
+            if self._refill_thread is None:
+                logger.debug('Refilling nonce pool in background')
+                self._refill_thread = threading.Thread(
+                    target=self._refill_nonces, args=(url,))
+                self._refill_thread.daemon = True
+                self._refill_thread.start()
+
     def _get_nonce(self, url):
-        if not self._nonces:
-            logging.debug('Requesting fresh nonce')
-            self._add_nonce(self.head(url))
-        return self._nonces.pop()
+        nonce = self.nonces.pop()
+        if nonce is None:
+            logger.debug('Requesting fresh nonce')
+            response = self.head(url)
+            nonce = self._nonce_from_response(response)
+        self._maybe_refill_nonces(url)
+        return nonce
+
+    def _prepare_post_retry(self, response):
+        if RetryPolicy.is_bad_nonce(response):
+            self.nonces.bad_nonce_retry()
+        try:
+            self._add_nonce(response)
+        except errors.NonceError:
+            pass  # a fresh one will be requested
 
-    def post(self, url, obj, content_type=JSON_CONTENT_TYPE, **kwargs):
-        """POST object wrapped in `.JWS` and check response."""
+    def _post_once(self, endpoint, url, obj, **kwargs):
+        self._wait_for_rate_limit(endpoint)
         data = self._wrap_in_jws(obj, self._get_nonce(url))
         response = self._send_request('POST', url, data=data, **kwargs)
+        if RetryPolicy.is_bad_nonce(response):
+            self.nonces.bad_nonce()
+        self._learn_rate_limit(endpoint, response)
+        return response
+
+    def post(self, url, obj, content_type=JSON_CONTENT_TYPE, **kwargs):
+        """POST object wrapped in `.JWS` and check response.
+
+        Requests rejected because of a bad nonce, or because of server
+        load, are retried (with a fresh nonce) according to
+        `retry_policy`.
+
+        """
+        endpoint = ratelimit.RateLimiter.endpoint_class('POST', obj)
+        attempt = 1
+        response = self._post_once(endpoint, url, obj, **kwargs)
+        delay = self._retry_delay('POST', attempt, response, endpoint)
+        while delay is not None:
+            self._prepare_post_retry(response)
+            time.sleep(delay)
+            attempt += 1
+            response = self._post_once(endpoint, url, obj, **kwargs)
+            delay = self._retry_delay('POST', attempt, response, endpoint)
         self._add_nonce(response)
         return self._check_response(response, content_type=content_type)
@@ -1,6 +1,8 @@
 """Tests for acme.client."""
 import datetime
 import json
+import sys
+import threading
 import unittest
 
 from six.moves import http_client  # pylint: disable=import-error
@@ -82,7 +84,15 @@ class ClientTest(unittest.TestCase):
         from acme.client import Client
         self.client = Client(
             directory=uri, key=KEY, alg=jose.RS256, net=self.net)
-        self.net.get.assert_called_once_with(uri)
+        self.net.get.assert_called_once_with(uri, cache=None)
+
+    def test_init_downloads_directory_with_cache(self):
+        uri = 'http://www.letsencrypt-demo.org/directory'
+        cache = mock.MagicMock()
+        from acme.client import Client
+        self.client = Client(directory=uri, key=KEY, alg=jose.RS256,
+                             net=self.net, cache=cache)
+        self.net.get.assert_called_once_with(uri, cache=cache)
 
     def test_register(self):
         # "Instance of 'Field' has no to_json/update member" bug:
@@ -127,6 +137,36 @@ class ClientTest(unittest.TestCase):
         self.response.json.return_value = self.regr.body.to_json()
         self.assertEqual(self.regr, self.client.query_registration(self.regr))
 
+    def test_query_registration_cached(self):
+        from acme.cache import ResourceCache
+        self.client.cache = ResourceCache()
+        self.response.json.return_value = self.regr.body.to_json()
+        self.assertEqual(self.regr, self.client.query_registration(
+            self.regr, use_cache=True))
+        self.assertEqual(self.regr, self.client.query_registration(
+            self.regr, use_cache=True))
+        self.assertEqual(1, self.net.post.call_count)
+        # the server is queried unless the cache is asked for
+        self.assertEqual(self.regr, self.client.query_registration(self.regr))
+        self.assertEqual(2, self.net.post.call_count)
+
+    def test_query_registration_cache_expired(self):
+        from acme.cache import ResourceCache
+        self.client.cache = ResourceCache(ttl=0)
+        self.response.json.return_value = self.regr.body.to_json()
+        self.client.query_registration(self.regr, use_cache=True)
+        self.client.query_registration(self.regr, use_cache=True)
+        self.assertEqual(2, self.net.post.call_count)
+
+    def test_query_registration_cache_corrupted(self):
+        from acme.cache import ResourceCache
+        self.client.cache = ResourceCache()
+        self.client.cache.store_content('regr:' + self.regr.uri, b'{}')
+        self.response.json.return_value = self.regr.body.to_json()
+        self.assertEqual(self.regr, self.client.query_registration(
+            self.regr, use_cache=True))
+        self.assertEqual(1, self.net.post.call_count)
+
     def test_agree_to_tos(self):
         self.client.update_registration = mock.Mock()
         self.client.agree_to_tos(self.regr)
@@ -215,6 +255,23 @@ class ClientTest(unittest.TestCase):
             datetime.datetime(2015, 3, 27, 0, 0, 10),
             self.client.retry_after(response=self.response, default=10))
 
+    @mock.patch('acme.client.datetime')
+    def test_retry_after_delay(self, dt_mock):
+        dt_mock.datetime.now.return_value = datetime.datetime(2015, 3, 27)
+        dt_mock.timedelta = datetime.timedelta
+
+        self.assertTrue(self.client.retry_after_delay(self.response) is None)
+        self.assertEqual(10, self.client.retry_after_delay(
+            self.response, default=10))
+        self.response.headers['Retry-After'] = '50'
+        self.assertEqual(50, self.client.retry_after_delay(self.response))
+        self.response.headers['Retry-After'] = 'Fri, 31 Dec 1999 23:59:59 GMT'
+        self.assertEqual(0, self.client.retry_after_delay(self.response))
+        self.response.headers['Retry-After'] = 'foooo'
+        self.assertEqual(0, self.client.retry_after_delay(self.response))
+        self.assertEqual(10, self.client.retry_after_delay(
+            self.response, default=10))
+
     def test_poll(self):
         self.response.json.return_value = self.authzr.body.to_json()
         self.assertEqual((self.authzr, self.response),
@@ -226,6 +283,13 @@ class ClientTest(unittest.TestCase):
         self.assertRaises(
             errors.UnexpectedUpdate, self.client.poll, self.authzr)
 
+    def test_poll_lazy(self):
+        self.response.json.return_value = self.authzr.body.to_json()
+        updated_authzr, _ = self.client.poll(self.authzr, lazy=True)
+        self.assertTrue(isinstance(
+            updated_authzr.body, messages.LazyAuthorization))
+        self.assertEqual(self.authzr, updated_authzr)
+
     def test_request_issuance(self):
         self.response.content = CERT_DER
         self.response.headers['Location'] = self.certr.uri
@@ -263,7 +327,8 @@ class ClientTest(unittest.TestCase):
         dt_mock.datetime.now.side_effect = now
         dt_mock.timedelta = datetime.timedelta
 
-        def poll(authzr):  # pylint: disable=missing-docstring
+        def poll(authzr, lazy):  # pylint: disable=missing-docstring
+            self.assertTrue(lazy)
             # record poll start time based on the current clock value
             authzr.times.append(clock.dt)
 
@@ -341,6 +406,63 @@ class ClientTest(unittest.TestCase):
             errors.PollError, self.client.poll_and_request_issuance,
             csr, authzrs, mintime=mintime, max_attempts=2)
 
+    def _poll_and_request_issuance_parallel(self, statuses, **kwargs):
+        # statuses: uri -> list of consecutive statuses returned by poll
+        # mock call counts are not updated atomically, so calls from the
+        # worker threads are recorded in self.polled instead
+        self.polled = []
+        lock = threading.Lock()
+
+        def poll(authzr, lazy):  # pylint: disable=missing-docstring
+            self.assertTrue(lazy)
+            with lock:
+                self.polled.append(authzr.uri)
+            status = statuses[authzr.uri].pop(0)
+            return mock.MagicMock(uri=authzr.uri, body=mock.MagicMock(
+                status=status)), mock.sentinel.response
+        self.client.poll = mock.MagicMock(side_effect=poll)
+        self.client.retry_after = mock.MagicMock(
+            side_effect=lambda response, default: datetime.datetime.now())
+        self.client.request_issuance = mock.MagicMock()
+
+        authzrs = [mock.MagicMock(uri=uri) for uri in sorted(statuses)]
+        return self.client.poll_and_request_issuance(
+            mock.sentinel.csr, authzrs, max_workers=3, **kwargs)
+
+    def test_poll_and_request_issuance_parallel(self):
+        _, updated_authzrs = self._poll_and_request_issuance_parallel({
+            'a': [messages.STATUS_PENDING, messages.STATUS_VALID],
+            'b': [messages.STATUS_VALID],
+            'c': [messages.STATUS_PROCESSING, messages.STATUS_VALID],
+        })
+        self.assertEqual(['a', 'b', 'c'], [
+            authzr.uri for authzr in updated_authzrs])
+        self.assertEqual(['a', 'a', 'b', 'c', 'c'], sorted(self.polled))
+        self.client.request_issuance.assert_called_once_with(
+            mock.sentinel.csr, updated_authzrs)
+
+    def test_poll_and_request_issuance_parallel_invalid(self):
+        try:
+            self._poll_and_request_issuance_parallel({
+                'a': [messages.STATUS_INVALID],
+                'b': [messages.STATUS_PENDING] * 10,
+            })
+        except errors.PollError as error:
+            self.assertFalse(error.timeout)
+        else:  # pragma: no cover
+            self.fail('PollError not raised')
+        # both were due at once, but "b" is not polled again
+        self.assertEqual(['a', 'b'], sorted(self.polled))
+        self.assertFalse(self.client.request_issuance.called)
+
+    def test_poll_and_request_issuance_parallel_max_attempts(self):
+        self.assertRaises(
+            errors.PollError, self._poll_and_request_issuance_parallel, {
+                'a': [messages.STATUS_PENDING] * 10,
+                'b': [messages.STATUS_PENDING] * 10,
+            }, max_attempts=5)
+        self.assertEqual(5, len(self.polled))
+
     def test_check_cert(self):
         self.response.headers['Location'] = self.certr.uri
         self.response.content = CERT_DER
@@ -374,6 +496,14 @@ class ClientTest(unittest.TestCase):
         self.assertEqual([self.client._get_cert(self.certr.cert_chain_uri)[1]],
                          self.client.fetch_chain(self.certr))
 
+    def test_fetch_chain_uses_cache(self):
+        self.client.cache = mock.sentinel.cache
+        self.net.get.return_value = mock.MagicMock(
+            links={}, content=CERT_DER)
+        self.client.fetch_chain(self.certr)
+        self.assertTrue(self.net.get.call_args[1]['cache'] is
+                        mock.sentinel.cache)
+
     def test_fetch_chain_max(self):
         # pylint: disable=protected-access
         up_response = mock.MagicMock(links={'up': {'url': 'http://cert'}})
@@ -391,6 +521,72 @@ class ClientTest(unittest.TestCase):
         self.client._get_cert.return_value = (response, "certificate")
         self.assertRaises(errors.Error, self.client.fetch_chain, self.certr)
 
+    def _request_issuance_many(self, csrs, **kwargs):
+        # pylint: disable=protected-access
+        def request_issuance(csr, authzrs):
+            # pylint: disable=missing-docstring
+            if csr == 'bad':
+                raise errors.Error(csr)
+            return self.certr.update(uri=csr, authzrs=authzrs)
+        self.client.request_issuance = mock.MagicMock(
+            side_effect=request_issuance)
+        self.client.fetch_chain = mock.MagicMock(return_value=['chain'])
+        return self.client.request_issuance_many(
+            ((csr, (self.authzr,)) for csr in csrs), **kwargs)
+
+    def test_request_issuance_many(self):
+        results = list(self._request_issuance_many(
+            ['csr{0}'.format(i) for i in range(10)], max_workers=3))
+        self.assertEqual(set('csr{0}'.format(i) for i in range(10)),
+                         set(certr.uri for certr, _ in results))
+        for certr, chain in results:
+            self.assertEqual((self.authzr,), certr.authzrs)
+            self.assertEqual(['chain'], chain)
+        self.client.fetch_chain.assert_called_once_with(mock.ANY, 10)
+
+    def test_request_issuance_many_no_chain(self):
+        self.certr = self.certr.update(cert_chain_uri=None)
+        results = list(self._request_issuance_many(['csr']))
+        self.assertEqual([(self.certr.update(uri='csr'), [])], results)
+        self.assertFalse(self.client.fetch_chain.called)
+
+    def test_request_issuance_many_empty(self):
+        self.assertEqual([], list(self._request_issuance_many([])))
+
+    def test_request_issuance_many_error(self):
+        self.assertRaises(errors.Error, list, self._request_issuance_many(
+            ['csr', 'bad'], max_workers=1))
+
+    @mock.patch('acme.client.logger')
+    def test_request_issuance_many_chain_error(self, mock_logger):
+        results = self._request_issuance_many(['csr1', 'csr2'], max_workers=1)
+        self.client.fetch_chain.side_effect = [errors.Error, ['chain']]
+        self.assertEqual([(self.certr.update(uri='csr1'), []),
+                          (self.certr.update(uri='csr2'), ['chain'])],
+                         list(results))
+        self.assertTrue(mock_logger.warning.called)
+
+    def test_request_issuance_many_lazy(self):
+        consumed = []
+
+        def csrs():  # pylint: disable=missing-docstring
+            for i in range(5):
+                consumed.append(i)
+                yield 'csr{0}'.format(i)
+
+        results = self._request_issuance_many(csrs(), max_workers=2)
+        next(results)
+        self.assertTrue(len(consumed) <= 3)
+        self.assertEqual(4, len(list(results)))
+
+    @mock.patch('acme.client.time.sleep')
+    def test_request_issuance_many_min_interval(self, sleep_mock):
+        list(self._request_issuance_many(
+            ['csr1', 'csr2'], max_workers=1, min_interval=60))
+        # Python 2 threading also polls using time.sleep
+        self.assertEqual(1, len([call for call in sleep_mock.call_args_list
+                                 if call[0][0] > 50]))
+
     def test_revoke(self):
         self.client.revoke(self.certr.body)
         self.net.post.assert_called_once_with(
@@ -440,6 +636,24 @@ class ClientNetworkTest(unittest.TestCase):
         self.assertEqual(json.loads(jws.payload.decode()), {'foo': 'foo'})
         self.assertEqual(jws.signature.combined.nonce, b'Tg')
 
+    def test_wrap_in_jws_es256(self):
+        from acme.client import ClientNetwork
+        key = jose.JWKEC.load(test_util.load_vector('ec_p256_key.pem'))
+        net = ClientNetwork(key=key, alg=jose.ES256)
+        # pylint: disable=protected-access
+        jws = acme_jws.JWS.json_loads(net._wrap_in_jws(
+            messages.NewRegistration(), nonce=b'Tg'))
+        self.assertEqual(jose.ES256, jws.signature.combined.alg)
+        self.assertEqual(key.public_key(), jws.signature.combined.jwk)
+        self.assertTrue(jws.verify())
+
+    def test_signing_context_reused(self):
+        context = self.net.signing_context
+        self.assertTrue(context is self.net.signing_context)
+        self.assertTrue(context.key is KEY)
+        self.net.key = KEY2
+        self.assertTrue(self.net.signing_context.key is KEY2)
+
     def test_check_response_not_ok_jobj_no_error(self):
         self.response.ok = False
         self.response.json.return_value = {}
@@ -487,49 +701,270 @@ class ClientNetworkTest(unittest.TestCase):
             self.assertEqual(
                 self.response, self.net._check_response(self.response))
 
-    @mock.patch('acme.client.requests')
-    def test_send_request(self, mock_requests):
-        mock_requests.request.return_value = self.response
+    def test_send_request(self):
+        self.net.session = mock.MagicMock()
+        self.net.session.request.return_value = self.response
         # pylint: disable=protected-access
         self.assertEqual(self.response, self.net._send_request(
-            'HEAD', 'url', 'foo', bar='baz'))
-        mock_requests.request.assert_called_once_with(
+            'HEAD', 'url', 'foo', bar='baz').response)
+        self.net.session.request.assert_called_once_with(
             'HEAD', 'url', 'foo', verify=mock.ANY, bar='baz', headers=mock.ANY)
 
-    @mock.patch('acme.client.requests')
-    def test_send_request_verify_ssl(self, mock_requests):
+    def test_send_request_verify_ssl(self):
+        self.net.session = mock.MagicMock()
         # pylint: disable=protected-access
         for verify in True, False:
-            mock_requests.request.reset_mock()
-            mock_requests.request.return_value = self.response
+            self.net.session.request.reset_mock()
+            self.net.session.request.return_value = self.response
             self.net.verify_ssl = verify
             # pylint: disable=protected-access
             self.assertEqual(
-                self.response, self.net._send_request('GET', 'url'))
-            mock_requests.request.assert_called_once_with(
+                self.response, self.net._send_request('GET', 'url').response)
+            self.net.session.request.assert_called_once_with(
                 'GET', 'url', verify=verify, headers=mock.ANY)
 
-    @mock.patch('acme.client.requests')
-    def test_send_request_user_agent(self, mock_requests):
-        mock_requests.request.return_value = self.response
+    def test_send_request_user_agent(self):
+        self.net.session = mock.MagicMock()
+        self.net.session.request.return_value = self.response
         # pylint: disable=protected-access
         self.net._send_request('GET', 'url', headers={'bar': 'baz'})
-        mock_requests.request.assert_called_once_with(
+        self.net.session.request.assert_called_once_with(
             'GET', 'url', verify=mock.ANY,
             headers={'User-Agent': 'acme-python-test', 'bar': 'baz'})
 
         self.net._send_request('GET', 'url', headers={'User-Agent': 'foo2'})
-        mock_requests.request.assert_called_with(
+        self.net.session.request.assert_called_with(
             'GET', 'url', verify=mock.ANY, headers={'User-Agent': 'foo2'})
 
-    @mock.patch('acme.client.requests')
-    def test_requests_error_passthrough(self, mock_requests):
-        mock_requests.exceptions = requests.exceptions
-        mock_requests.request.side_effect = requests.exceptions.RequestException
+    @mock.patch('acme.client.logger')
+    def test_send_request_no_debug_logging(self, logger_mock):
+        logger_mock.isEnabledFor.return_value = False
+        self.net.session = mock.MagicMock()
+        self.net.session.request.return_value = self.response
+        # pylint: disable=protected-access
+        self.net._send_request('GET', 'url')
+        self.assertFalse(logger_mock.debug.called)
+
+    def test_check_response_ok_not_json_not_decoded(self):
+        self.response.headers['Content-Type'] = 'application/pkix-cert'
+        # pylint: disable=protected-access
+        self.assertEqual(self.response, self.net._check_response(
+            self.response, content_type='application/pkix-cert'))
+        self.assertFalse(self.response.json.called)
+
+    def test_requests_error_passthrough(self):
+        self.net.session = mock.MagicMock()
+        self.net.session.request.side_effect = (
+            requests.exceptions.RequestException)
         # pylint: disable=protected-access
         self.assertRaises(requests.exceptions.RequestException,
                           self.net._send_request, 'GET', 'uri')
 
+    def test_new_session_pool(self):
+        session = self.net.new_session(
+            pool_connections=3, pool_maxsize=7, max_retries=2)
+        adapter = session.get_adapter('https://example.com')
+        # pylint: disable=protected-access
+        self.assertEqual(7, adapter._pool_maxsize)
+        self.assertEqual(3, adapter._pool_connections)
+        self.assertEqual(2, adapter.max_retries.total)
+        self.assertTrue(adapter is session.get_adapter('http://example.com'))
+
+    def test_new_session_http2(self):
+        hyper = mock.MagicMock()
+        with mock.patch.dict(sys.modules, {
+                'hyper': hyper, 'hyper.contrib': hyper.contrib}):
+            session = self.net.new_session(http2=True)
+        self.assertTrue(session.get_adapter('https://example.com') is
+                        hyper.contrib.HTTP20Adapter.return_value)
+        self.assertTrue(isinstance(
+            session.get_adapter('http://example.com'),
+            requests.adapters.HTTPAdapter))
+
+    @mock.patch('acme.client.logger')
+    def test_new_session_http2_pool_options(self, mock_logger):
+        hyper = mock.MagicMock()
+        with mock.patch.dict(sys.modules, {
+                'hyper': hyper, 'hyper.contrib': hyper.contrib}):
+            self.net.new_session(http2=True)
+            self.assertFalse(mock_logger.warning.called)
+            self.net.new_session(pool_maxsize=50, http2=True)
+        self.assertTrue(mock_logger.warning.called)
+
+    def test_new_session_http2_missing(self):
+        with mock.patch.dict(sys.modules, {
+                'hyper': None, 'hyper.contrib': None}):
+            self.assertRaises(
+                errors.Error, self.net.new_session, http2=True)
+
+    def test_init_http2(self):
+        from acme.client import ClientNetwork
+        with mock.patch('acme.client.ClientNetwork.new_session') as new:
+            net = ClientNetwork(key=KEY, http2=True)
+        self.assertTrue(new.call_args[0][3])
+        self.assertTrue(net.session is new.return_value)
+
+    def test_close_owned_session(self):
+        self.net.session = mock.MagicMock()
+        with self.net as net:
+            self.assertTrue(net is self.net)
+        self.net.session.close.assert_called_once_with()
+
+    def test_close_external_session(self):
+        from acme.client import ClientNetwork
+        session = mock.MagicMock()
+        with ClientNetwork(key=KEY, session=session) as net:
+            self.assertTrue(net.session is session)
+        self.assertFalse(session.close.called)
+
+    def test_close_saves_rate_limiter(self):
+        self.net.rate_limiter = mock.MagicMock()
+        self.net.close()
+        self.net.rate_limiter.save.assert_called_once_with()
+
+
+class SharedSessionTest(unittest.TestCase):
+    """Tests for acme.client.shared_session."""
+
+    @mock.patch('acme.client._SHARED_SESSION', None)
+    def test_reused(self):
+        from acme.client import shared_session
+        session = shared_session()
+        self.assertTrue(isinstance(session, requests.Session))
+        self.assertTrue(session is shared_session())
+
+    @mock.patch('acme.client._SHARED_SESSION', None)
+    def test_client_default_net(self):
+        from acme.client import Client
+        from acme.client import shared_session
+        client = Client(directory=messages.Directory({}), key=KEY)
+        self.assertTrue(client.net.session is shared_session())
+
+
+class CachedResponseTest(unittest.TestCase):
+    """Tests for acme.client.CachedResponse."""
+
+    def setUp(self):
+        self.wrapped = mock.MagicMock(status_code=http_client.OK)
+        from acme.client import CachedResponse
+        self.response = CachedResponse(self.wrapped)
+
+    def test_json_decoded_once(self):
+        self.wrapped.json.return_value = {'foo': 'bar'}
+        self.assertEqual({'foo': 'bar'}, self.response.json())
+        self.assertEqual({'foo': 'bar'}, self.response.json())
+        self.wrapped.json.assert_called_once_with()
+
+    def test_json_error_decoded_once(self):
+        self.wrapped.json.side_effect = ValueError
+        self.assertRaises(ValueError, self.response.json)
+        self.assertRaises(ValueError, self.response.json)
+        self.wrapped.json.assert_called_once_with()
+
+    def test_proxy(self):
+        self.assertEqual(http_client.OK, self.response.status_code)
+        self.assertEqual(repr(self.wrapped), repr(self.response))
+
+
+class RetryPolicyTest(unittest.TestCase):
+    """Tests for acme.client.RetryPolicy."""
+
+    def setUp(self):
+        from acme.client import RetryPolicy
+        self.policy = RetryPolicy(max_attempts=3, backoff=2, max_delay=10)
+        self.response = mock.MagicMock(
+            status_code=http_client.SERVICE_UNAVAILABLE, headers={})
+
+    def test_ok(self):
+        self.response.status_code = http_client.OK
+        self.assertTrue(self.policy.delay('GET', 1, self.response) is None)
+
+    def test_bad_nonce(self):
+        self.response.status_code = http_client.BAD_REQUEST
+        self.response.json.return_value = {
+            'type': 'urn:acme:error:badNonce', 'detail': 'foo'}
+        self.assertEqual(0, self.policy.delay('POST', 1, self.response))
+        self.assertEqual(1, self.policy.stats['badNonce'])
+
+    def test_bad_request(self):
+        self.response.status_code = http_client.BAD_REQUEST
+        self.response.json.side_effect = ValueError
+        self.assertTrue(self.policy.delay('POST', 1, self.response) is None)
+        self.response.json.side_effect = None
+        self.response.json.return_value = ['foo']
+        self.assertTrue(self.policy.delay('POST', 1, self.response) is None)
+
+    def test_backoff(self):
+        self.assertEqual(2, self.policy.delay('POST', 1, self.response))
+        self.assertEqual(4, self.policy.delay('POST', 2, self.response))
+        self.assertTrue(self.policy.delay('POST', 3, self.response) is None)
+        self.assertEqual(2, self.policy.stats[http_client.SERVICE_UNAVAILABLE])
+        self.assertEqual(1, self.policy.stats['gave_up'])
+
+    def test_max_delay(self):
+        self.policy.max_attempts = 10
+        self.assertEqual(10, self.policy.delay('GET', 5, self.response))
+
+    def test_server_error_idempotent_only(self):
+        self.response.status_code = http_client.INTERNAL_SERVER_ERROR
+        self.assertEqual(2, self.policy.delay('GET', 1, self.response))
+        self.assertTrue(self.policy.delay('POST', 1, self.response) is None)
+
+    @mock.patch('acme.client.datetime')
+    def test_retry_after(self, dt_mock):
+        dt_mock.datetime.now.return_value = datetime.datetime(2015, 3, 27)
+        dt_mock.timedelta = datetime.timedelta
+        self.response.headers['Retry-After'] = '7'
+        self.assertEqual(7, self.policy.delay('POST', 1, self.response))
+        self.response.headers['Retry-After'] = '3600'
+        self.assertTrue(self.policy.delay('POST', 1, self.response) is None)
+        self.assertEqual(1, self.policy.stats['gave_up'])
+
+
+class NoncePoolTest(unittest.TestCase):
+    """Tests for acme.client.NoncePool."""
+
+    def setUp(self):
+        from acme.client import NoncePool
+        self.pool = NoncePool(low_water=2, max_age=10)
+
+    def test_fifo(self):
+        self.pool.add(b'a')
+        self.pool.add(b'b')
+        self.assertEqual(2, len(self.pool))
+        self.assertEqual(b'a', self.pool.pop())
+        self.assertEqual(b'b', self.pool.pop())
+        self.assertTrue(self.pool.pop() is None)
+        self.assertEqual((2, 1), (self.pool.hits, self.pool.misses))
+
+    @mock.patch('acme.client.time')
+    def test_expired(self, time_mock):
+        time_mock.time.return_value = 100
+        self.pool.add(b'old')
+        time_mock.time.return_value = 105
+        self.pool.add(b'new')
+        time_mock.time.return_value = 112
+        self.assertEqual(b'new', self.pool.pop())
+        self.assertEqual(1, self.pool.expired)
+        self.assertEqual(1, self.pool.stats()['hits'])
+
+    def test_needs_refill(self):
+        self.assertTrue(self.pool.needs_refill())
+        self.pool.add(b'a')
+        self.pool.add(b'b')
+        self.assertFalse(self.pool.needs_refill())
+
+    def test_bad_nonce_counters(self):
+        threads = [threading.Thread(target=func) for func in
+                   [self.pool.bad_nonce, self.pool.bad_nonce_retry] * 10]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = self.pool.stats()
+        self.assertEqual(10, stats['bad_nonces'])
+        self.assertEqual(10, stats['bad_nonce_retries'])
+
 
 class ClientNetworkWithMockedResponseTest(unittest.TestCase):
     """Tests for acme.client.ClientNetwork which mock out response."""
@@ -605,6 +1040,205 @@ class ClientNetworkWithMockedResponseTest(unittest.TestCase):
         self.assertRaises(errors.BadNonce, self.net.post, 'uri',
                           self.obj, content_type=self.content_type)
 
+    def test_post_pooled_nonce(self):
+        self.net.nonces.add(b'pooled')
+        self.net.post('uri', self.obj, content_type=self.content_type)
+        # pylint: disable=protected-access
+        self.net._wrap_in_jws.assert_called_once_with(self.obj, b'pooled')
+        self.send_request.assert_called_once_with('POST', 'uri', data=mock.ANY)
+        self.assertEqual((1, 0), (self.net.nonces.hits, self.net.nonces.misses))
+
+    def _set_statuses(self, *statuses):
+        responses = []
+        for status in statuses:
+            response = mock.MagicMock(
+                status_code=status, ok=(status == http_client.OK), links={})
+            if status == http_client.BAD_REQUEST:
+                response.json.return_value = {
+                    'type': self.net.BAD_NONCE_ERROR_TYPE, 'detail': 'stale'}
+            responses.append(response)
+
+        def send_request(*args, **kwargs):
+            # pylint: disable=unused-argument,missing-docstring
+            response = responses.pop(0) if responses else self.response
+            response.headers = {self.net.REPLAY_NONCE_HEADER:
+                                jose.b64encode(b'Nonce').decode()}
+            self.response = response
+            return response
+        self.send_request.side_effect = send_request
+
+    @mock.patch('acme.client.time.sleep')
+    def test_post_bad_nonce_retry(self, sleep_mock):
+        self._set_statuses(  # HEAD, POST, POST
+            http_client.OK, http_client.BAD_REQUEST, http_client.OK)
+        self.assertEqual(self.checked_response, self.net.post(
+            'uri', self.obj, content_type=self.content_type))
+        # pylint: disable=protected-access
+        self.assertEqual(2, self.net._wrap_in_jws.call_count)
+        sleep_mock.assert_called_once_with(0)
+        self.assertEqual(1, self.net.nonces.bad_nonces)
+        self.assertEqual(1, self.net.nonces.bad_nonce_retries)
+        self.assertEqual(1, self.net.retry_policy.stats['badNonce'])
+
+    @mock.patch('acme.client.time.sleep')
+    def test_post_retry_gives_up(self, sleep_mock):
+        self._set_statuses(
+            http_client.OK, *([http_client.SERVICE_UNAVAILABLE] * 5))
+        self.net.post('uri', self.obj, content_type=self.content_type)
+        self.assertEqual(
+            [mock.call(1), mock.call(2)], sleep_mock.call_args_list)
+        self.assertEqual(self.net.retry_policy.max_attempts, len([
+            call for call in self.send_request.call_args_list
+            if call[0][0] == 'POST']))
+        self.assertEqual(1, self.net.retry_policy.stats['gave_up'])
+
+    @mock.patch('acme.client.time.sleep')
+    def test_post_no_retry_on_server_error(self, sleep_mock):
+        self._set_statuses(http_client.OK, http_client.INTERNAL_SERVER_ERROR)
+        self.net.post('uri', self.obj, content_type=self.content_type)
+        self.assertFalse(sleep_mock.called)
+        self.assertEqual(2, self.send_request.call_count)  # HEAD, POST
+
+    def test_get_cache_miss_stores(self):
+        cache = mock.MagicMock()
+        cache.lookup.return_value = None
+        self.assertEqual(self.checked_response, self.net.get(
+            'url', content_type=self.content_type, cache=cache))
+        cache.store.assert_called_once_with('url', self.checked_response)
+
+    def test_get_cache_fresh(self):
+        from acme.cache import ResourceCache
+        cache = ResourceCache()
+        cache.store('url', mock.MagicMock(
+            status_code=http_client.OK, content=b'{}', headers={}))
+        self.assertEqual(b'{}', self.net.get(
+            'url', content_type=self.content_type, cache=cache).content)
+        self.assertFalse(self.send_request.called)
+
+    def test_get_cache_stale_not_modified(self):
+        from acme.cache import ResourceCache
+        cache = ResourceCache(ttl=0)
+        entry = cache.store('url', mock.MagicMock(
+            status_code=http_client.OK, content=b'{}',
+            headers={'ETag': '"foo"'}))
+        self.response.status_code = http_client.NOT_MODIFIED
+        response = self.net.get('url', content_type=self.content_type,
+                                cache=cache, headers={'Accept': 'bar'})
+        self.assertEqual(b'{}', response.content)
+        self.assertEqual(http_client.OK, response.status_code)
+        self.send_request.assert_called_once_with('GET', 'url', headers={
+            'Accept': 'bar', 'If-None-Match': '"foo"'})
+        self.assertTrue(cache.lookup('url').validated >= entry.validated)
+
+    def test_get_cache_stale_modified(self):
+        from acme.cache import ResourceCache
+        cache = ResourceCache(ttl=0)
+        cache.store('url', mock.MagicMock(
+            status_code=http_client.OK, content=b'{}',
+            headers={'Last-Modified': 'yesterday'}))
+        self.checked_response.status_code = http_client.OK
+        self.checked_response.headers = {}
+        self.checked_response.content = b'new'
+        self.assertEqual(self.checked_response, self.net.get(
+            'url', content_type=self.content_type, cache=cache))
+        self.send_request.assert_called_once_with(
+            'GET', 'url', headers={'If-Modified-Since': 'yesterday'})
+        self.assertEqual(b'new', cache.lookup('url').content)
+
+    @mock.patch('acme.client.time.sleep')
+    def test_get_retry(self, sleep_mock):
+        self._set_statuses(http_client.INTERNAL_SERVER_ERROR, http_client.OK)
+        self.assertEqual(self.checked_response, self.net.get(
+            'url', content_type=self.content_type))
+        sleep_mock.assert_called_once_with(1)
+        self.assertEqual(2, self.send_request.call_count)
+
+    def test_rate_limiter_consulted(self):
+        self.net.rate_limiter = mock.MagicMock()
+        self.net.post('uri', messages.NewRegistration(),
+                      content_type=self.content_type)
+        self.net.get('url', content_type=self.content_type)
+        self.assertEqual([mock.call('new-reg'), mock.call('poll')],
+                         self.net.rate_limiter.wait.call_args_list)
+        self.assertEqual([mock.call('new-reg'), mock.call('poll')],
+                         self.net.rate_limiter.succeeded.call_args_list)
+
+    @mock.patch('acme.client.time.sleep')
+    def test_post_throttled_retry_rate_limited(self, sleep_mock):
+        self.net.rate_limiter = mock.MagicMock()
+        self._set_statuses(http_client.OK, 429, http_client.OK)
+        self.net.post('uri', messages.NewRegistration(),
+                      content_type=self.content_type)
+        # the rate limiter waits before the retry, not the retry policy
+        sleep_mock.assert_called_once_with(0)
+        self.assertEqual([mock.call('new-reg')] * 2,
+                         self.net.rate_limiter.wait.call_args_list)
+        self.net.rate_limiter.throttled.assert_called_once_with(
+            'new-reg', None)
+        self.assertEqual(1, self.net.retry_policy.stats[429])
+
+    @mock.patch('acme.client.time.sleep')
+    def test_post_throttled_retry_not_rate_limited(self, sleep_mock):
+        self.net.rate_limiter = mock.MagicMock()
+        self.net.rate_limiter.limits.return_value = False
+        self._set_statuses(http_client.OK, 429, http_client.OK)
+        self.net.post('uri', messages.NewRegistration(),
+                      content_type=self.content_type)
+        sleep_mock.assert_called_once_with(1)
+
+    def test_learn_rate_limit_throttled(self):
+        # pylint: disable=protected-access
+        self.net.rate_limiter = mock.MagicMock()
+        self.net._learn_rate_limit('new-cert', mock.MagicMock(
+            status_code=429, headers={'Retry-After': '120'}))
+        endpoint, retry_after = self.net.rate_limiter.throttled.call_args[0]
+        self.assertEqual('new-cert', endpoint)
+        self.assertTrue(115 < retry_after <= 120)
+
+        self.net._learn_rate_limit('new-cert', mock.MagicMock(
+            status_code=429, headers={}))
+        self.net.rate_limiter.throttled.assert_called_with('new-cert', None)
+
+    def test_learn_rate_limit_error(self):
+        # pylint: disable=protected-access
+        self.net.rate_limiter = mock.MagicMock()
+        self.net._learn_rate_limit('new-cert', mock.MagicMock(
+            status_code=http_client.INTERNAL_SERVER_ERROR, ok=False))
+        self.assertFalse(self.net.rate_limiter.throttled.called)
+        self.assertFalse(self.net.rate_limiter.succeeded.called)
+
+    def test_post_triggers_refill(self):
+        # pylint: disable=protected-access
+        self.net._maybe_refill_nonces = mock.MagicMock()
+        self.net.post('uri', self.obj, content_type=self.content_type)
+        self.net._maybe_refill_nonces.assert_called_once_with('uri')
+
+    def test_background_refill(self):
+        self.net.nonces.low_water = 2
+        # pylint: disable=protected-access
+        self.net._maybe_refill_nonces('uri')
+        self.net._refill_thread.join()
+        self.assertEqual(2, len(self.net.nonces))
+        self.assertEqual([mock.call('HEAD', 'uri')] * 2,
+                         self.send_request.call_args_list)
+        self.assertTrue(self.net._refill_thread is None)
+
+    def test_background_refill_error(self):
+        self.net.nonces.low_water = 3
+        # pylint: disable=protected-access
+        self.net._refill_nonces('uri')  # third HEAD raises MissingNonce
+        self.assertEqual(2, len(self.net.nonces))
+        self.assertEqual(3, self.send_request.call_count)
+        self.assertTrue(self.net._refill_thread is None)
+
+    def test_no_refill_when_closed(self):
+        self.net.nonces.low_water = 1
+        self.net.close()
+        self.net.session = mock.MagicMock()
+        # pylint: disable=protected-access
+        self.net._maybe_refill_nonces('uri')
+        self.assertTrue(self.net._refill_thread is None)
+
     def test_head_get_post_error_passthrough(self):
         self.send_request.side_effect = requests.exceptions.RequestException
         for method in self.net.head, self.net.get:
@@ -51,6 +51,9 @@ from acme.jose.json_util import (
 )
 
 from acme.jose.jwa import (
+    ES256,
+    ES384,
+    ES512,
     HS256,
     HS384,
     HS512,
@@ -65,6 +68,7 @@ from acme.jose.jwa import (
 
 from acme.jose.jwk import (
     JWK,
+    JWKEC,
     JWKRSA,
 )
 
@@ -72,10 +76,12 @@ from acme.jose.jws import (
     Header,
     JWS,
     Signature,
+    Verifier,
 )
 
 from acme.jose.util import (
     ComparableX509,
+    ComparableECKey,
     ComparableKey,
     ComparableRSAKey,
     ImmutableMap,
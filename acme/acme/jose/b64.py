@@ -13,16 +13,29 @@
    standard library.
 
 """
-import base64
+import binascii
 
 import six
 
 
+BUFFER_TYPES = (six.binary_type, bytearray, memoryview)
+"""Types of binary data accepted by `b64encode` and `b64decode`."""
+
+_STANDARD_TO_URLSAFE = six.binary_type(bytearray(range(256))).replace(
+    b'+', b'-').replace(b'/', b'_')
+_URLSAFE_TO_STANDARD = six.binary_type(bytearray(range(256))).replace(
+    b'-', b'+').replace(b'_', b'/')
+
+
 def b64encode(data):
     """JOSE Base64 encode.
 
+    Binary data is passed to `binascii` as is (without copying), and
+    the length of the result without padding is computed arithmetically,
+    so that it can be cut off together with the trailing newline.
+
     :param data: Data to be encoded.
-    :type data: `bytes`
+    :type data: `bytes`, `bytearray` or `memoryview`
 
     :returns: JOSE Base64 string.
     :rtype: bytes
@@ -30,9 +43,14 @@ def b64encode(data):
     :raises TypeError: if `data` is of incorrect type
 
     """
-    if not isinstance(data, six.binary_type):
-        raise TypeError('argument should be {0}'.format(six.binary_type))
-    return base64.urlsafe_b64encode(data).rstrip(b'=')
+    if not isinstance(data, BUFFER_TYPES):
+        raise TypeError('argument should be {0}, bytearray or memoryview'
+                        .format(six.binary_type))
+    size = len(data)
+    if isinstance(data, memoryview):
+        size *= data.itemsize
+    return binascii.b2a_base64(data)[:(4 * size + 2) // 3].translate(
+        _STANDARD_TO_URLSAFE)
 
 
 def b64decode(data):
@@ -40,22 +58,34 @@ def b64decode(data):
 
     :param data: Base64 string to be decoded. If it's unicode, then
                  only ASCII characters are allowed.
-    :type data: `bytes` or `unicode`
+    :type data: `bytes`, `bytearray`, `memoryview` or `unicode`
 
     :returns: Decoded data.
     :rtype: bytes
 
-    :raises TypeError: if input is of incorrect type
+    :raises TypeError: if input is of incorrect type, or (on Python 2)
+        incorrectly padded
     :raises ValueError: if input is unicode with non-ASCII characters
+    :raises binascii.Error: if input is incorrectly padded (Python 3)
 
     """
-    if isinstance(data, six.string_types):
+    if isinstance(data, six.binary_type):
+        pass
+    elif isinstance(data, six.text_type):
         try:
             data = data.encode('ascii')
         except UnicodeEncodeError:
             raise ValueError(
                 'unicode argument should contain only ASCII characters')
-    elif not isinstance(data, six.binary_type):
+    elif isinstance(data, memoryview):
+        data = data.tobytes()
+    elif not isinstance(data, bytearray):
         raise TypeError('argument should be a str or unicode')
 
-    return base64.urlsafe_b64decode(data + b'=' * (4 - (len(data) % 4)))
+    try:
+        return binascii.a2b_base64(data.translate(_URLSAFE_TO_STANDARD) +
+                                   b'=' * (-len(data) % 4))
+    except binascii.Error as error:
+        if six.PY2:  # as base64.urlsafe_b64decode
+            raise TypeError(error)
+        raise
@@ -1,4 +1,5 @@
 """Tests for acme.jose.b64."""
+import binascii
 import unittest
 
 import six
@@ -39,6 +40,18 @@ class B64EncodeTest(unittest.TestCase):
         for text, (b64, _) in six.iteritems(B64_PADDING_EXAMPLES):
             self.assertEqual(self._call(text), b64)
 
+    def test_buffers(self):
+        for text, (b64, _) in six.iteritems(B64_PADDING_EXAMPLES):
+            self.assertEqual(self._call(bytearray(text)), b64)
+            self.assertEqual(self._call(memoryview(text)), b64)
+            self.assertTrue(isinstance(
+                self._call(memoryview(text)), six.binary_type))
+
+    def test_memoryview_slice(self):
+        self.assertEqual(
+            self._call(memoryview(b'xany carnal pleasx')[1:-1]),
+            b'YW55IGNhcm5hbCBwbGVhcw')
+
     def test_unicode_fails_with_type_error(self):
         self.assertRaises(TypeError, self._call, u'some unicode')
 
@@ -63,6 +76,17 @@ class B64DecodeTest(unittest.TestCase):
         for text, (b64, pad) in six.iteritems(B64_PADDING_EXAMPLES):
             self.assertEqual(self._call(b64 + pad), text)
 
+    def test_buffers(self):
+        for text, (b64, pad) in six.iteritems(B64_PADDING_EXAMPLES):
+            for data in b64, b64 + pad:
+                self.assertEqual(self._call(bytearray(data)), text)
+                self.assertEqual(self._call(memoryview(data)), text)
+
+    def test_incorrect_padding(self):
+        from acme.jose.b64 import b64decode
+        self.assertRaises(
+            TypeError if six.PY2 else binascii.Error, b64decode, b'YW55I')
+
     def test_unicode_with_ascii(self):
         self.assertEqual(self._call(u'YQ'), b'a')
 
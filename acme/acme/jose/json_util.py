@@ -122,6 +122,129 @@ class Field(object):
         return value
 
 
+def _field_default(field, name):
+    """Is ``name`` inherited by ``field`` from `Field` (not overridden)?"""
+    for klass in type(field).__mro__:
+        if name in vars(klass):
+            return klass is Field
+    return False  # pragma: no cover
+
+
+def _log_omitted(omitted):
+    if logger.isEnabledFor(logging.DEBUG):
+        # pylint: disable=star-args
+        logger.debug('Omitted empty fields: %s', ', '.join(
+            '{0!s}={1!r}'.format(*field) for field in omitted))
+
+
+def _compile_fields_codec(name, fields):
+    """Generate specialized serializer and deserializer for fields.
+
+    Generated functions are equivalent to iterating over ``fields`` and
+    calling `Field.omit`, `Field.encode` and `Field.decode` for every
+    field, but the loop is unrolled, attributes are accessed directly,
+    calls are skipped where the field does not customize behaviour
+    (e.g. passthrough encoders, fields that are never omitted), and
+    required fields are checked while decoding (instead of in an
+    additional pass over all fields).
+
+    :param str name: Name of the class (used in generated code names).
+    :param dict fields: Mapping from slot names to `Field` instances.
+
+    :returns: ``(encoder, decoder)`` functions, to be used as
+        `JSONObjectWithFields.fields_to_partial_json` and
+        `JSONObjectWithFields.fields_from_json` implementations.
+
+    """
+    # pylint: disable=too-many-locals
+    namespace = {
+        'DeserializationError': errors.DeserializationError,
+        'SerializationError': errors.SerializationError,
+        'log_omitted': _log_omitted,
+    }
+    enc = ['def encode(self):', '    jobj = {}', '    omitted = []']
+    dec = ['def decode(cls, jobj):', '    fields = {}']
+
+    for index, (slot, field) in enumerate(sorted(six.iteritems(fields))):
+        json_name = repr(field.json_name)
+        namespace['field_{0}'.format(index)] = field
+        namespace['default_{0}'.format(index)] = field.default
+
+        enc.append('    value = self.{0}'.format(slot))
+        indent = '    '
+        if not (_field_default(field, 'omit') and
+                _field_default(field, '_empty')):
+            enc.append('    if field_{0}.omit(value):'.format(index))
+        elif field.omitempty:
+            enc.append('    if not isinstance(value, bool) and not value:')
+        else:
+            indent = None
+        if indent is not None:
+            enc.append('        omitted.append(({0!r}, value))'.format(slot))
+            enc.append('    else:')
+            indent = '        '
+        else:
+            indent = '    '
+
+        if _field_default(field, 'encode'):
+            fenc = getattr(field.fenc, '__func__', field.fenc)
+            if fenc is Field.default_encoder.__func__:
+                encoder = None  # passthrough
+            else:
+                namespace['encode_{0}'.format(index)] = field.fenc
+                encoder = 'encode_{0}'.format(index)
+        else:
+            encoder = 'field_{0}.encode'.format(index)
+        if encoder is None:
+            enc.append('{0}jobj[{1}] = value'.format(indent, json_name))
+        else:
+            enc.extend([
+                '{0}try:'.format(indent),
+                '{0}    jobj[{1}] = {2}(value)'.format(
+                    indent, json_name, encoder),
+                '{0}except SerializationError as error:'.format(indent),
+                '{0}    raise SerializationError('.format(indent),
+                '{0}        "Could not encode {{0}} ({{1}}): {{2}}".format('
+                '{1!r}, value, error))'.format(indent, slot),
+            ])
+
+        if _field_default(field, 'decode'):
+            namespace['decode_{0}'.format(index)] = field.fdec
+            decoder = 'decode_{0}'.format(index)
+        else:
+            decoder = 'field_{0}.decode'.format(index)
+        dec.extend([
+            '    if {0} in jobj:'.format(json_name),
+            '        value = jobj[{0}]'.format(json_name),
+            '        try:',
+            '            fields[{0!r}] = {1}(value)'.format(slot, decoder),
+            '        except DeserializationError as error:',
+            # missing required fields take precedence over decoding errors
+            '            cls._check_required(jobj)',
+            '            raise DeserializationError(',
+            '                "Could not decode {{0!r}} ({{1!r}}): {{2}}".format('
+            '{0!r}, value, error))'.format(slot),
+            '    else:',
+        ])
+        if field.omitempty:
+            dec.append('        fields[{0!r}] = default_{1}'.format(
+                slot, index))
+        else:
+            dec.append('        cls._check_required(jobj)')
+
+    enc.extend([
+        '    if omitted:',
+        '        log_omitted(omitted)',
+        '    return jobj',
+    ])
+    dec.append('    return fields')
+
+    source = '\n'.join(enc + dec) + '\n'
+    code = compile(source, '<{0} fields codec>'.format(name), 'exec')
+    exec(code, namespace)  # pylint: disable=exec-used
+    return namespace['encode'], namespace['decode']
+
+
 class JSONObjectWithFieldsMeta(abc.ABCMeta):
     """Metaclass for :class:`JSONObjectWithFields` and its subclasses.
 
@@ -136,6 +259,11 @@ class JSONObjectWithFieldsMeta(abc.ABCMeta):
        (i.e. not :attr:`Field.json_name`). Original ``cls.__slots__``
        are stored in ``cls._orig_slots``.
 
+    3. ``cls._fields_encoder`` and ``cls._fields_decoder`` are set to
+       functions generated specifically for ``cls._fields``, which
+       implement :meth:`JSONObjectWithFields.fields_to_partial_json`
+       and :meth:`JSONObjectWithFields.fields_from_json` respectively.
+
     In a consequence, for a field attribute name ``some_field``,
     ``cls.some_field`` will be a slot descriptor and not an instance
     of :class:`Field`. For example::
@@ -178,6 +306,10 @@ class JSONObjectWithFieldsMeta(abc.ABCMeta):
             list(dikt['_orig_slots']) + list(six.iterkeys(fields)))
         dikt['_fields'] = fields
 
+        encoder, decoder = _compile_fields_codec(name, fields)
+        dikt['_fields_encoder'] = staticmethod(encoder)
+        dikt['_fields_decoder'] = staticmethod(decoder)
+
         return abc.ABCMeta.__new__(mcs, name, bases, dikt)
 
 
@@ -239,25 +371,7 @@ class JSONObjectWithFields(util.ImmutableMap, interfaces.JSONDeSerializable):
 
     def fields_to_partial_json(self):
         """Serialize fields to JSON."""
-        jobj = {}
-        omitted = set()
-        for slot, field in six.iteritems(self._fields):
-            value = getattr(self, slot)
-
-            if field.omit(value):
-                omitted.add((slot, value))
-            else:
-                try:
-                    jobj[field.json_name] = field.encode(value)
-                except errors.SerializationError as error:
-                    raise errors.SerializationError(
-                        'Could not encode {0} ({1}): {2}'.format(
-                            slot, value, error))
-        if omitted:
-            # pylint: disable=star-args
-            logger.debug('Omitted empty fields: %s', ', '.join(
-                '{0!s}={1!r}'.format(*field) for field in omitted))
-        return jobj
+        return self._fields_encoder(self)
 
     def to_partial_json(self):
         return self.fields_to_partial_json()
@@ -277,20 +391,7 @@ class JSONObjectWithFields(util.ImmutableMap, interfaces.JSONDeSerializable):
     @classmethod
     def fields_from_json(cls, jobj):
         """Deserialize fields from JSON."""
-        cls._check_required(jobj)
-        fields = {}
-        for slot, field in six.iteritems(cls._fields):
-            if field.json_name not in jobj and field.omitempty:
-                fields[slot] = field.default
-            else:
-                value = jobj[field.json_name]
-                try:
-                    fields[slot] = field.decode(value)
-                except errors.DeserializationError as error:
-                    raise errors.DeserializationError(
-                        'Could not decode {0!r} ({1!r}): {2}'.format(
-                            slot, value, error))
-        return fields
+        return cls._fields_decoder(cls, jobj)
 
     @classmethod
     def from_json(cls, jobj):
@@ -300,7 +401,8 @@ class JSONObjectWithFields(util.ImmutableMap, interfaces.JSONDeSerializable):
 def encode_b64jose(data):
     """Encode JOSE Base-64 field.
 
-    :param bytes data:
+    :param data: Data to be encoded.
+    :type data: `bytes`, `bytearray` or `memoryview`
     :rtype: `unicode`
 
     """
@@ -319,10 +421,9 @@ def decode_b64jose(data, size=None, minimum=False):
     :rtype: bytes
 
     """
-    error_cls = TypeError if six.PY2 else binascii.Error
     try:
-        decoded = b64.b64decode(data.encode())
-    except error_cls as error:
+        decoded = b64.b64decode(data)
+    except (TypeError, ValueError) as error:
         raise errors.DeserializationError(error)
 
     if size is not None and ((not minimum and len(decoded) != size) or
@@ -431,17 +532,32 @@ class TypedJSONObjectWithFields(JSONObjectWithFields):
     TYPES = NotImplemented
     """Types registered for JSON deserialization"""
 
+    _registered_cache = {}
+    """Whether a class is one of its `TYPES`, as resolved by
+    `get_type_cls`. Cleared by `register`; `TYPES` should not be
+    modified directly."""
+
     @classmethod
     def register(cls, type_cls, typ=None):
         """Register class for JSON deserialization."""
         typ = type_cls.typ if typ is None else typ
         cls.TYPES[typ] = type_cls
+        TypedJSONObjectWithFields._registered_cache.clear()
         return type_cls
 
+    @classmethod
+    def _is_registered(cls):
+        try:
+            return cls._registered_cache[cls]
+        except KeyError:
+            registered = cls._registered_cache[cls] = (
+                cls in six.itervalues(cls.TYPES))
+            return registered
+
     @classmethod
     def get_type_cls(cls, jobj):
         """Get the registered class for ``jobj``."""
-        if cls in six.itervalues(cls.TYPES):
+        if cls._is_registered():
             if cls.type_field_name not in jobj:
                 raise errors.DeserializationError(
                     "Missing type field ({0})".format(cls.type_field_name))
@@ -222,6 +222,52 @@ class JSONObjectWithFieldsTest(unittest.TestCase):
             {'x': 4, 'y': 500, 'Z': 3})
 
 
+    def test_fields_from_json_missing_before_decoding_error(self):
+        try:
+            self.MockJSONObjectWithFields.fields_from_json({'y': 500})
+        except errors.DeserializationError as error:
+            self.assertTrue('required' in str(error))
+        else:  # pragma: no cover
+            self.fail('DeserializationError not raised')
+
+    @mock.patch('acme.jose.json_util.logger')
+    def test_fields_to_partial_json_logs_omitted(self, mock_logger):
+        mock_logger.isEnabledFor.return_value = True
+        self.mock.fields_to_partial_json()
+        mock_logger.debug.assert_called_once_with(
+            mock.ANY, 'x=None')
+        mock_logger.reset_mock()
+        mock_logger.isEnabledFor.return_value = False
+        self.mock.fields_to_partial_json()
+        self.assertFalse(mock_logger.debug.called)
+
+    def test_custom_field_methods(self):
+        from acme.jose.json_util import Field
+        from acme.jose.json_util import JSONObjectWithFields
+
+        class CustomField(Field):
+            # pylint: disable=missing-docstring
+            def omit(self, value):
+                return value == 'omit'
+
+            def encode(self, value):
+                return 'e' + value
+
+            def decode(self, value):
+                return value[1:]
+
+        class Custom(JSONObjectWithFields):
+            # pylint: disable=missing-docstring,too-few-public-methods
+            foo = CustomField('foo', default='omit', omitempty=True)
+            bar = Field('bar', default=False, omitempty=True)
+
+        self.assertEqual({'foo': 'ex', 'bar': False},
+                         Custom(foo='x').to_partial_json())
+        self.assertEqual({'bar': True}, Custom(bar=True).to_partial_json())
+        self.assertEqual({'bar': False}, Custom().to_partial_json())
+        self.assertEqual(Custom(foo='x'), Custom.from_json({'foo': 'ex'}))
+        self.assertEqual(Custom(), Custom.from_json({}))
+
 class DeEncodersTest(unittest.TestCase):
     def setUp(self):
         self.b64_cert = (
@@ -254,6 +300,10 @@ class DeEncodersTest(unittest.TestCase):
         self.assertTrue(isinstance(encoded, six.string_types))
         self.assertEqual(u'eA', encoded)
 
+    def test_encode_b64jose_memoryview(self):
+        from acme.jose.json_util import encode_b64jose
+        self.assertEqual(u'eA', encode_b64jose(memoryview(b'x')))
+
     def test_decode_b64jose(self):
         from acme.jose.json_util import decode_b64jose
         decoded = decode_b64jose(u'eA')
@@ -264,6 +314,10 @@ class DeEncodersTest(unittest.TestCase):
         from acme.jose.json_util import decode_b64jose
         self.assertRaises(errors.DeserializationError, decode_b64jose, u'x')
 
+    def test_decode_b64jose_type_error(self):
+        from acme.jose.json_util import decode_b64jose
+        self.assertRaises(errors.DeserializationError, decode_b64jose, 1234)
+
     def test_decode_b64jose_size(self):
         from acme.jose.json_util import decode_b64jose
         self.assertEqual(b'foo', decode_b64jose(u'Zm9v', size=3))
@@ -376,6 +430,22 @@ class TypedJSONObjectWithFieldsTest(unittest.TestCase):
         self.assertEqual({'foo': 'bar'}, self.parent_cls.from_json(
             {'type': 'test', 'foo': 'bar'}))
 
+    def test_get_type_cls_registered(self):
+        msg_cls = type(self.msg)
+        for _ in range(2):  # cached
+            self.assertTrue(msg_cls is msg_cls.get_type_cls({'type': 'x'}))
+            self.assertRaises(
+                errors.DeserializationError, msg_cls.get_type_cls, {})
+
+    def test_get_type_cls_register_clears_cache(self):
+        # pylint: disable=missing-docstring,abstract-method
+        class Other(self.parent_cls):
+            typ = 'other'
+        self.assertRaises(
+            errors.UnrecognizedTypeError, Other.get_type_cls, {'type': 'x'})
+        self.parent_cls.register(Other)
+        self.assertTrue(Other is Other.get_type_cls({'type': 'x'}))
+
 
 if __name__ == '__main__':
     unittest.main()  # pragma: no cover
@@ -4,6 +4,7 @@ https://tools.ietf.org/html/draft-ietf-jose-json-web-algorithms-40
 
 """
 import abc
+import binascii
 import collections
 import logging
 
@@ -11,7 +12,16 @@ import cryptography.exceptions
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives import hmac
+from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.asymmetric import padding
+try:
+    from cryptography.hazmat.primitives.asymmetric.utils import (
+        decode_dss_signature, encode_dss_signature)
+except ImportError:  # pragma: no cover
+    # cryptography<1.1
+    from cryptography.hazmat.primitives.asymmetric.utils import (
+        decode_rfc6979_signature as decode_dss_signature,
+        encode_rfc6979_signature as encode_dss_signature)
 
 from acme.jose import errors
 from acme.jose import interfaces
@@ -111,6 +121,9 @@ class _JWARSA(object):
         except AttributeError as error:
             logger.debug(error, exc_info=True)
             raise errors.Error("Public key cannot be used for signing")
+        except TypeError as error:  # not an RSA key
+            logger.debug(error, exc_info=True)
+            raise errors.Error("Key cannot be used for RSA signing")
         except ValueError as error:  # digest too large
             logger.debug(error, exc_info=True)
             raise errors.Error(str(error))
@@ -123,7 +136,11 @@ class _JWARSA(object):
 
     def verify(self, key, msg, sig):
         """Verify the ``msg` and ``sig`` using ``key``."""
-        verifier = key.verifier(sig, self.padding, self.hash)
+        try:
+            verifier = key.verifier(sig, self.padding, self.hash)
+        except (AttributeError, TypeError) as error:  # not an RSA key
+            logger.debug(error, exc_info=True)
+            return False
         verifier.update(msg)
         try:
             verifier.verify()
@@ -152,15 +169,57 @@ class _JWAPS(_JWARSA, JWASignature):
         self.hash = hash_()
 
 
-class _JWAES(JWASignature):  # pylint: disable=abstract-class-not-used
+class _JWAES(JWASignature):
 
-    # TODO: implement ES signatures
+    kty = jwk.JWKEC
 
-    def sign(self, key, msg):  # pragma: no cover
-        raise NotImplementedError()
+    def __init__(self, name, hash_, size):
+        super(_JWAES, self).__init__(name)
+        self.hash = hash_()
+        self.size = size  # length (in bytes) of each of R and S
 
-    def verify(self, key, msg, sig):  # pragma: no cover
-        raise NotImplementedError()
+    def sign(self, key, msg):
+        """Sign the ``msg`` using ``key``.
+
+        :returns: Concatenation of fixed length big-endian ``R`` and
+            ``S`` (as opposed to DER produced by `cryptography`).
+
+        """
+        try:
+            signer = key.signer(ec.ECDSA(self.hash))
+        except AttributeError as error:
+            logger.debug(error, exc_info=True)
+            raise errors.Error("Public key cannot be used for signing")
+        except TypeError as error:  # not an EC key
+            logger.debug(error, exc_info=True)
+            raise errors.Error("Key cannot be used for ECDSA signing")
+        signer.update(msg)
+        r, s = decode_dss_signature(signer.finalize())  # pylint: disable=invalid-name
+        return binascii.unhexlify('{0:0{2}x}{1:0{2}x}'.format(
+            r, s, self.size * 2))
+
+    def verify(self, key, msg, sig):
+        """Verify the ``msg` and ``sig`` using ``key``."""
+        if len(sig) != 2 * self.size:
+            logger.debug('Signature has wrong length: %d', len(sig))
+            return False
+        # pylint: disable=invalid-name
+        r = int(binascii.hexlify(sig[:self.size]), 16)
+        s = int(binascii.hexlify(sig[self.size:]), 16)
+        try:
+            verifier = key.verifier(
+                encode_dss_signature(r, s), ec.ECDSA(self.hash))
+        except (AttributeError, TypeError) as error:  # not an EC key
+            logger.debug(error, exc_info=True)
+            return False
+        verifier.update(msg)
+        try:
+            verifier.verify()
+        except cryptography.exceptions.InvalidSignature as error:
+            logger.debug(error, exc_info=True)
+            return False
+        else:
+            return True
 
 
 HS256 = JWASignature.register(_JWAHS('HS256', hashes.SHA256))
@@ -175,6 +234,6 @@ PS256 = JWASignature.register(_JWAPS('PS256', hashes.SHA256))
 PS384 = JWASignature.register(_JWAPS('PS384', hashes.SHA384))
 PS512 = JWASignature.register(_JWAPS('PS512', hashes.SHA512))
 
-ES256 = JWASignature.register(_JWAES('ES256'))
-ES384 = JWASignature.register(_JWAES('ES384'))
-ES512 = JWASignature.register(_JWAES('ES512'))
+ES256 = JWASignature.register(_JWAES('ES256', hashes.SHA256, 32))
+ES384 = JWASignature.register(_JWAES('ES384', hashes.SHA384, 48))
+ES512 = JWASignature.register(_JWAES('ES512', hashes.SHA512, 66))
@@ -9,6 +9,9 @@ from acme.jose import errors
 RSA256_KEY = test_util.load_rsa_private_key('rsa256_key.pem')
 RSA512_KEY = test_util.load_rsa_private_key('rsa512_key.pem')
 RSA1024_KEY = test_util.load_rsa_private_key('rsa1024_key.pem')
+EC_P256_KEY = test_util.load_ec_private_key('ec_p256_key.pem')
+EC_P384_KEY = test_util.load_ec_private_key('ec_p384_key.pem')
+EC_P521_KEY = test_util.load_ec_private_key('ec_p521_key.pem')
 
 
 class JWASignatureTest(unittest.TestCase):
@@ -79,6 +82,15 @@ class JWARSTest(unittest.TestCase):
         self.assertRaises(errors.Error, RS256.sign, RSA256_KEY, b'foo')
         self.assertRaises(errors.Error, PS256.sign, RSA256_KEY, b'foo')
 
+    def test_sign_wrong_key_type(self):
+        from acme.jose.jwa import RS256
+        self.assertRaises(errors.Error, RS256.sign, EC_P256_KEY, b'foo')
+
+    def test_verify_wrong_key_type(self):
+        from acme.jose.jwa import RS256
+        self.assertFalse(RS256.verify(
+            EC_P256_KEY.public_key(), b'foo', b'a' * 64))
+
     def test_rs(self):
         from acme.jose.jwa import RS256
         sig = (
@@ -100,5 +112,47 @@ class JWARSTest(unittest.TestCase):
             RSA1024_KEY.public_key(), b'foo', sig + b'!'))
 
 
+class JWAESTest(unittest.TestCase):
+
+    def test_sign_no_private_part(self):
+        from acme.jose.jwa import ES256
+        self.assertRaises(
+            errors.Error, ES256.sign, EC_P256_KEY.public_key(), b'foo')
+
+    def test_sign_wrong_key_type(self):
+        from acme.jose.jwa import ES256
+        self.assertRaises(errors.Error, ES256.sign, RSA512_KEY, b'foo')
+
+    def test_verify_wrong_key_type(self):
+        from acme.jose.jwa import ES256
+        self.assertFalse(ES256.verify(
+            RSA512_KEY.public_key(), b'foo', b'a' * 64))
+
+    def test_es(self):
+        from acme.jose.jwa import ES256, ES384, ES512
+        for alg, key, size in ((ES256, EC_P256_KEY, 64),
+                               (ES384, EC_P384_KEY, 96),
+                               (ES512, EC_P521_KEY, 132)):
+            sig = alg.sign(key, b'foo')
+            self.assertEqual(size, len(sig))
+            self.assertTrue(alg.verify(key.public_key(), b'foo', sig))
+            self.assertFalse(alg.verify(key.public_key(), b'bar', sig))
+
+    def test_verify_wrong_length(self):
+        from acme.jose.jwa import ES256
+        sig = ES256.sign(EC_P256_KEY, b'foo')
+        self.assertFalse(ES256.verify(
+            EC_P256_KEY.public_key(), b'foo', sig + b'!'))
+        self.assertFalse(ES256.verify(
+            EC_P256_KEY.public_key(), b'foo', sig[:-1]))
+
+    def test_verify_tampered(self):
+        from acme.jose.jwa import ES256
+        sig = bytearray(ES256.sign(EC_P256_KEY, b'foo'))
+        sig[-1] ^= 1
+        self.assertFalse(ES256.verify(
+            EC_P256_KEY.public_key(), b'foo', bytes(sig)))
+
+
 if __name__ == '__main__':
     unittest.main()  # pragma: no cover
@@ -124,30 +124,6 @@ class JWK(json_util.TypedJSONObjectWithFields):
         raise errors.Error('Unsupported algorithm: {0}'.format(key.__class__))
 
 
-@JWK.register
-class JWKES(JWK):  # pragma: no cover
-    # pylint: disable=abstract-class-not-used
-    """ES JWK.
-
-    .. warning:: This is not yet implemented!
-
-    """
-    typ = 'ES'
-    cryptography_key_types = (
-        ec.EllipticCurvePublicKey, ec.EllipticCurvePrivateKey)
-    required = ('crv', JWK.type_field_name, 'x', 'y')
-
-    def fields_to_partial_json(self):
-        raise NotImplementedError()
-
-    @classmethod
-    def fields_from_json(cls, jobj):
-        raise NotImplementedError()
-
-    def public_key(self):
-        raise NotImplementedError()
-
-
 @JWK.register
 class JWKOct(JWK):
     """Symmetric JWK."""
@@ -279,3 +255,95 @@ class JWKRSA(JWK):
             }
         return dict((key, self._encode_param(value))
                     for key, value in six.iteritems(params))
+
+
+@JWK.register
+class JWKEC(JWK):
+    """EC JWK.
+
+    :ivar key: `cryptography.hazmat.primitives.ec.EllipticCurvePrivateKey`
+        or `cryptography.hazmat.primitives.ec.EllipticCurvePublicKey`
+        wrapped in `.ComparableECKey`
+
+    """
+    typ = 'EC'
+    cryptography_key_types = (
+        ec.EllipticCurvePublicKey, ec.EllipticCurvePrivateKey)
+    __slots__ = ('key',)
+    required = ('crv', JWK.type_field_name, 'x', 'y')
+
+    CURVES = {
+        'P-256': (ec.SECP256R1, 32),
+        'P-384': (ec.SECP384R1, 48),
+        'P-521': (ec.SECP521R1, 66),
+    }
+    """Supported curves: JWK ``crv`` name to curve class and length
+    (in bytes) of encoded coordinates."""
+
+    def __init__(self, *args, **kwargs):
+        if 'key' in kwargs and not isinstance(
+                kwargs['key'], util.ComparableECKey):
+            kwargs['key'] = util.ComparableECKey(kwargs['key'])
+        super(JWKEC, self).__init__(*args, **kwargs)
+
+    @property
+    def crv(self):
+        """JWK ``crv`` name of the key's curve."""
+        for crv, (curve_cls, _) in six.iteritems(self.CURVES):
+            if self.key.curve.name == curve_cls.name:
+                return crv
+        raise errors.Error('Unsupported curve: {0}'.format(
+            self.key.curve.name))
+
+    @classmethod
+    def _encode_param(cls, data, size):
+        """Encode coordinate (or private value) as fixed size octets."""
+        return json_util.encode_b64jose(
+            binascii.unhexlify('{0:0{1}x}'.format(data, size * 2)))
+
+    @classmethod
+    def _decode_param(cls, data, size):
+        decoded = json_util.decode_b64jose(data, size)
+        return int(binascii.hexlify(decoded), 16)
+
+    def public_key(self):
+        return type(self)(key=self.key.public_key())
+
+    @classmethod
+    def fields_from_json(cls, jobj):
+        try:
+            curve_cls, size = cls.CURVES[jobj['crv']]
+        except KeyError:
+            raise errors.DeserializationError(
+                'Unsupported curve: {0}'.format(jobj.get('crv')))
+        # pylint: disable=invalid-name
+        x, y = (cls._decode_param(jobj[param], size) for param in ('x', 'y'))
+        public_numbers = ec.EllipticCurvePublicNumbers(x, y, curve_cls())
+        try:
+            if 'd' not in jobj:  # public key
+                key = public_numbers.public_key(default_backend())
+            else:  # private key
+                key = ec.EllipticCurvePrivateNumbers(
+                    cls._decode_param(jobj['d'], size),
+                    public_numbers).private_key(default_backend())
+        except ValueError as error:  # e.g. point not on the curve
+            raise errors.DeserializationError(error)
+        return cls(key=key)
+
+    def fields_to_partial_json(self):
+        crv = self.crv
+        size = self.CURVES[crv][1]
+        # pylint: disable=protected-access
+        if isinstance(self.key._wrapped, ec.EllipticCurvePublicKey):
+            public = self.key.public_numbers()
+            params = {}
+        else:  # ec.EllipticCurvePrivateKey
+            private = self.key.private_numbers()
+            public = private.public_numbers
+            params = {'d': self._encode_param(private.private_value, size)}
+        params.update({
+            'crv': crv,
+            'x': self._encode_param(public.x, size),
+            'y': self._encode_param(public.y, size),
+        })
+        return params
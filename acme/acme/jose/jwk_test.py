@@ -12,6 +12,8 @@ from acme.jose import util
 DSA_PEM = test_util.load_vector('dsa512_key.pem')
 RSA256_KEY = test_util.load_rsa_private_key('rsa256_key.pem')
 RSA512_KEY = test_util.load_rsa_private_key('rsa512_key.pem')
+EC_P256_KEY = test_util.load_ec_private_key('ec_p256_key.pem')
+EC_P521_KEY = test_util.load_ec_private_key('ec_p521_key.pem')
 
 
 class JWKTest(unittest.TestCase):
@@ -187,5 +189,84 @@ class JWKRSATest(unittest.TestCase, JWKTestBaseMixin):
             b"f63838e96077ad1fc01c3f8405774dedc0641f558ebb4b40dccf5f9b6d66a932")
 
 
+class JWKECTest(unittest.TestCase, JWKTestBaseMixin):
+    """Tests for acme.jose.jwk.JWKEC."""
+
+    thumbprint = binascii.unhexlify(
+        b'fe9f947e28c8cfb29988daecf899f9763e03f32a002788b44131a19008a3370c')
+
+    def setUp(self):
+        from acme.jose.jwk import JWKEC
+        self.private = JWKEC(key=EC_P256_KEY)
+        self.public = JWKEC(key=EC_P256_KEY.public_key())
+        self.public_json = {
+            'kty': 'EC',
+            'crv': 'P-256',
+            'x': 'G6FaJVoK7mOay0iquqJYkPyKq2YRDBI1-9Wy2rIf3Zo',
+            'y': 'rFc8WLq7Xh3dSBNfINJ51DsETN8olDf1a33FhYu_19E',
+        }
+        self.private_json = self.public_json.copy()
+        self.private_json['d'] = '11Fi-3pUVCDRrHwORyMlmmqSHFVINyv8Cl7Dx7tHOCI'
+        self.jwk = self.private
+
+    def test_init_auto_comparable(self):
+        from acme.jose.jwk import JWKEC
+        # pylint: disable=protected-access
+        jwk = JWKEC(key=EC_P256_KEY._wrapped)
+        self.assertTrue(isinstance(jwk.key, util.ComparableECKey))
+        self.assertEqual(self.private, jwk)
+
+    def test_crv(self):
+        from acme.jose.jwk import JWKEC
+        self.assertEqual('P-256', self.private.crv)
+        self.assertEqual('P-521', JWKEC(key=EC_P521_KEY).crv)
+
+    def test_load(self):
+        from acme.jose.jwk import JWK
+        self.assertEqual(self.private, JWK.load(
+            test_util.load_vector('ec_p256_key.pem')))
+
+    def test_public_key(self):
+        self.assertEqual(self.public, self.private.public_key())
+
+    def test_to_partial_json(self):
+        self.assertEqual(self.public_json, self.public.to_partial_json())
+        self.assertEqual(self.private_json, self.private.to_partial_json())
+
+    def test_from_json(self):
+        from acme.jose.jwk import JWK
+        self.assertEqual(self.public, JWK.from_json(self.public_json))
+        self.assertEqual(self.private, JWK.from_json(self.private_json))
+
+    def test_json_round_trip_p521(self):
+        from acme.jose.jwk import JWK, JWKEC
+        jwk = JWKEC(key=EC_P521_KEY)
+        jobj = jwk.to_partial_json()
+        self.assertEqual(88, len(jobj['x']))
+        self.assertEqual(jwk, JWK.from_json(jobj))
+
+    def test_from_json_hashable(self):
+        from acme.jose.jwk import JWK
+        hash(JWK.from_json(self.public_json))
+
+    def test_from_json_unsupported_curve(self):
+        from acme.jose.jwk import JWK
+        self.public_json['crv'] = 'P-192'
+        self.assertRaises(
+            errors.DeserializationError, JWK.from_json, self.public_json)
+
+    def test_from_json_wrong_size(self):
+        from acme.jose.jwk import JWK
+        self.public_json['x'] = 'AQAB'
+        self.assertRaises(
+            errors.DeserializationError, JWK.from_json, self.public_json)
+
+    def test_from_json_not_on_curve(self):
+        from acme.jose.jwk import JWK
+        self.public_json['y'] = self.public_json['x']
+        self.assertRaises(
+            errors.DeserializationError, JWK.from_json, self.public_json)
+
+
 if __name__ == '__main__':
     unittest.main()  # pragma: no cover
@@ -1,7 +1,11 @@
 """JOSE Web Signature."""
 import argparse
 import base64
+import binascii
+import hashlib
+import json
 import sys
+import timeit
 
 import OpenSSL
 import six
@@ -188,8 +192,8 @@ class Signature(json_util.JSONObjectWithFields):
 
     @classmethod
     def _msg(cls, protected, payload):
-        return (b64.b64encode(protected.encode('utf-8')) + b'.' +
-                b64.b64encode(payload))
+        return b'.'.join((b64.b64encode(protected.encode('utf-8')),
+                          b64.b64encode(payload)))
 
     def verify(self, payload, key=None):
         """Verify.
@@ -291,12 +295,10 @@ class JWS(json_util.JSONObjectWithFields):
         assert 'alg' not in self.signature.header.not_omitted()
         # ... it must be in protected
 
-        return (
-            b64.b64encode(self.signature.protected.encode('utf-8')) +
-            b'.' +
-            b64.b64encode(self.payload) +
-            b'.' +
-            b64.b64encode(self.signature.signature))
+        return b'.'.join((
+            b64.b64encode(self.signature.protected.encode('utf-8')),
+            b64.b64encode(self.payload),
+            b64.b64encode(self.signature.signature)))
 
     @classmethod
     def from_compact(cls, compact):
@@ -344,6 +346,153 @@ class JWS(json_util.JSONObjectWithFields):
                                         for sig in jobj['signatures']))
 
 
+class Verifier(object):
+    """Low-allocation JWS verifier.
+
+    Works directly on the compact or flattened JSON serialization,
+    without creating `Header`, `Signature` or `JWS` objects: each
+    Base64 segment is decoded once, and the JWS Signing Input is made
+    of the original (encoded) segments instead of being re-encoded.
+    Public keys found in the "jwk" header parameter are cached by their
+    thumbprint, so that a key is deserialized only once, no matter how
+    many messages it signed.
+
+    Only "alg" and "jwk" header parameters are interpreted, and "crit"
+    is rejected (cf. `Header`).
+
+    :ivar int max_keys: Maximum number of cached keys.
+
+    """
+
+    def __init__(self, max_keys=1024):
+        self.max_keys = max_keys
+        self._keys = {}
+
+    @classmethod
+    def _b64decode(cls, data):
+        try:
+            return b64.b64decode(data)
+        except (TypeError, ValueError, binascii.Error) as error:
+            raise errors.DeserializationError(error)
+
+    @classmethod
+    def _decode_header(cls, protected):
+        try:
+            header = json.loads(cls._b64decode(protected).decode('utf-8'))
+        except ValueError as error:
+            raise errors.DeserializationError(error)
+        if not isinstance(header, dict):
+            raise errors.DeserializationError('Header is not a JSON object')
+        return header
+
+    def find_key(self, jobj):
+        """Find (cached) public key for its JSON serialization.
+
+        :param dict jobj: JWK serialized to JSON.
+
+        :rtype: `.JWK`
+
+        """
+        try:
+            kty = jwk.JWK.TYPES[jobj[jwk.JWK.type_field_name]]
+            params = dict((name, jobj[name]) for name in kty.required)
+        except (KeyError, TypeError):
+            raise errors.DeserializationError('Unsupported or incomplete JWK')
+        # pylint: disable=protected-access
+        thumbprint = hashlib.sha256(json.dumps(
+            params, **jwk.JWK._thumbprint_json_dumps_params).encode()).digest()
+        key = self._keys.get(thumbprint)
+        if key is None:
+            # only the required (public) parameters
+            key = kty.from_json(params)
+            if len(self._keys) >= self.max_keys:
+                self._keys.clear()
+            self._keys[thumbprint] = key
+        return key
+
+    def _verify(self, header, protected, payload, signature, key):
+        if 'crit' in header:
+            raise errors.DeserializationError(
+                '"crit" is not supported, please subclass')
+        try:
+            alg = jwa.JWASignature.from_json(header['alg'])
+        except (KeyError, TypeError):
+            raise errors.DeserializationError('alg not present or unknown')
+        if key is None:
+            if 'jwk' not in header:
+                raise errors.Error('No key found')
+            key = self.find_key(header['jwk'])
+        if not isinstance(key, alg.kty):
+            raise errors.Error('{0} key cannot be used with {1}'.format(
+                key.typ, alg.name))
+        if not alg.verify(key=key.key, msg=protected + b'.' + payload,
+                          sig=self._b64decode(signature)):
+            raise errors.Error('Invalid signature')
+        return self._b64decode(payload)
+
+    def verify_compact(self, compact, key=None):
+        """Verify JWS in Compact Serialization.
+
+        :param bytes compact: Compact serialization.
+        :param JWK key: Key used for verification. Defaults to the key
+            in the "jwk" header parameter.
+
+        :returns: Verified JWS Payload.
+        :rtype: bytes
+
+        :raises acme.jose.errors.Error: if the signature is invalid, or
+            the JWS cannot be decoded.
+
+        """
+        try:
+            protected, payload, signature = compact.split(b'.')
+        except ValueError:
+            raise errors.DeserializationError(
+                'Compact JWS serialization should comprise of exactly'
+                ' 3 dot-separated components')
+        return self._verify(self._decode_header(protected), protected,
+                            payload, signature, key)
+
+    def verify_flattened(self, jobj, key=None):
+        """Verify JWS in Flattened JSON Serialization.
+
+        :param jobj: Flattened JSON serialization (`dict`), or its JSON
+            dump (`str`).
+        :param JWK key: Key used for verification. Defaults to the key
+            in the "jwk" header parameter.
+
+        :returns: Verified JWS Payload.
+        :rtype: bytes
+
+        :raises acme.jose.errors.Error: if the signature is invalid, or
+            the JWS cannot be decoded.
+
+        """
+        if not isinstance(jobj, dict):
+            try:
+                jobj = json.loads(jobj)
+            except ValueError as error:
+                raise errors.DeserializationError(error)
+        try:
+            protected = jobj.get('protected', u'').encode('ascii')
+            payload = jobj['payload'].encode('ascii')
+            signature = jobj['signature']
+            header = jobj.get('header', {})
+        except (AttributeError, KeyError, UnicodeEncodeError) as error:
+            raise errors.DeserializationError(
+                'Not a flattened JWS: {0!r}'.format(error))
+        if not isinstance(header, dict):
+            raise errors.DeserializationError('Header is not a JSON object')
+        if protected:
+            protected_header = self._decode_header(protected)
+            if set(header).intersection(protected_header):
+                raise errors.DeserializationError(
+                    'Protected and unprotected headers overlap')
+            header = dict(header)
+            header.update(protected_header)
+        return self._verify(header, protected, payload, signature, key)
+
+
 class CLI(object):
     """JWS CLI."""
 
@@ -368,11 +517,12 @@ class CLI(object):
     @classmethod
     def verify(cls, args):
         """Verify."""
+        data = sys.stdin.read()
         if args.compact:
-            sig = JWS.from_compact(sys.stdin.read().encode())
+            sig = JWS.from_compact(data.encode())
         else:  # JSON
             try:
-                sig = JWS.json_loads(sys.stdin.read())
+                sig = JWS.json_loads(data)
             except errors.Error as error:
                 six.print_(error)
                 return -1
@@ -384,9 +534,32 @@ class CLI(object):
         else:
             key = None
 
-        sys.stdout.write(sig.payload)
+        if args.bench:
+            cls.bench(data, args.compact, key, args.bench)
+        else:
+            sys.stdout.write(sig.payload)
         return not sig.verify(key=key)
 
+    @classmethod
+    def bench(cls, data, compact, key, number):
+        """Compare verification throughput of `JWS` and `Verifier`."""
+        verifier = Verifier()
+        if compact:
+            data = data.encode()
+            paths = (
+                ('JWS', lambda: JWS.from_compact(data).verify(key=key)),
+                ('Verifier', lambda: verifier.verify_compact(data, key=key)),
+            )
+        else:
+            paths = (
+                ('JWS', lambda: JWS.json_loads(data).verify(key=key)),
+                ('Verifier', lambda: verifier.verify_flattened(data, key=key)),
+            )
+        for name, func in paths:
+            seconds = timeit.timeit(func, number=number)
+            six.print_('{0}: {1:.1f} verifications/s'.format(
+                name, number / seconds))
+
     @classmethod
     def _alg_type(cls, arg):
         return jwa.JWASignature.from_json(arg)
@@ -423,6 +596,9 @@ class CLI(object):
             '-k', '--key', type=argparse.FileType('rb'), required=False)
         parser_verify.add_argument(
             '--kty', type=cls._kty_type, required=False)
+        parser_verify.add_argument(
+            '--bench', type=int, metavar='N', help='Verify N times and '
+            'report throughput instead of printing the payload.')
 
         parsed = parser.parse_args(args)
         return parsed.func(parsed)
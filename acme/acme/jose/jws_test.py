@@ -1,5 +1,6 @@
 """Tests for acme.jose.jws."""
 import base64
+import json
 import unittest
 
 import mock
@@ -199,6 +200,94 @@ class JWSTest(unittest.TestCase):
         hash(JWS.from_json(self.mixed.to_json()))
 
 
+class VerifierTest(unittest.TestCase):
+    """Tests for acme.jose.jws.Verifier."""
+
+    def setUp(self):
+        from acme.jose.jws import JWS
+        from acme.jose.jws import Verifier
+        self.verifier = Verifier()
+        self.compact = JWS.sign(
+            payload=b'foo', key=KEY, alg=jwa.RS256,
+            protect=frozenset(['alg', 'jwk'])).to_compact()
+        self.flat = json.loads(JWS.sign(
+            payload=b'foo', key=KEY, alg=jwa.RS256, protect=frozenset(['alg']),
+            kid='bar').json_dumps())
+
+    def test_verify_compact(self):
+        self.assertEqual(b'foo', self.verifier.verify_compact(self.compact))
+        self.assertEqual(b'foo', self.verifier.verify_compact(
+            self.compact, key=KEY.public_key()))
+
+    def test_verify_flattened(self):
+        self.assertEqual(b'foo', self.verifier.verify_flattened(self.flat))
+        self.assertEqual(b'foo', self.verifier.verify_flattened(
+            json.dumps(self.flat)))
+
+    def test_consistent_with_jws(self):
+        from acme.jose.jws import JWS
+        jws = JWS.sign(payload=b'{"foo": 1}', key=KEY, alg=jwa.RS256,
+                       kid='bar', protect=frozenset(['kid']))
+        self.assertEqual(b'{"foo": 1}', self.verifier.verify_flattened(
+            jws.json_dumps()))
+
+    def test_invalid_signature(self):
+        protected, payload, _ = self.compact.split(b'.')
+        tampered = b'.'.join([protected, payload, b'AAAA'])
+        self.assertRaises(
+            errors.Error, self.verifier.verify_compact, tampered)
+        self.flat['payload'] = 'YmFy'
+        self.assertRaises(errors.Error, self.verifier.verify_flattened,
+                          self.flat)
+
+    def test_wrong_key(self):
+        other = jwk.JWKRSA.load(test_util.load_vector('rsa1024_key.pem'))
+        self.assertRaises(errors.Error, self.verifier.verify_compact,
+                          self.compact, key=other.public_key())
+        self.assertRaises(errors.Error, self.verifier.verify_compact,
+                          self.compact, key=jwk.JWKOct(key=b'secret'))
+
+    def test_key_cached_by_thumbprint(self):
+        with mock.patch('acme.jose.jws.jwk.JWKRSA.from_json',
+                        wraps=jwk.JWKRSA.from_json) as from_json:
+            for _ in range(3):
+                self.verifier.verify_compact(self.compact)
+        self.assertEqual(1, from_json.call_count)
+        self.assertEqual(
+            KEY.public_key(), self.verifier.find_key(
+                KEY.public_key().to_partial_json()))
+
+    def test_key_cache_bounded(self):
+        self.verifier.max_keys = 1
+        self.verifier.find_key(KEY.to_partial_json())
+        self.verifier.find_key(jwk.JWKOct(key=b'foo').to_partial_json())
+        # pylint: disable=protected-access
+        self.assertEqual(1, len(self.verifier._keys))
+
+    def test_malformed(self):
+        for compact in (b'foo', b'a.b.c', b'e30.Zm9v.AAAA', b'W10.Zm9v.AAAA',
+                        b'eyJhbGciOiAiZm9vIn0.Zm9v.AAAA',
+                        b'eyJjcml0IjogW119.Zm9v.AAAA'):
+            self.assertRaises(errors.DeserializationError,
+                              self.verifier.verify_compact, compact)
+        for flat in ('[', {'signature': 'AAAA'}, {'payload': 1},
+                     {'payload': '', 'signature': '', 'header': []}):
+            self.assertRaises(errors.DeserializationError,
+                              self.verifier.verify_flattened, flat)
+
+    def test_no_key(self):
+        del self.flat['header']['jwk']
+        self.assertRaises(errors.Error, self.verifier.verify_flattened,
+                          self.flat)
+        self.assertRaises(errors.DeserializationError, self.verifier.find_key,
+                          {'kty': 'RSA', 'n': 'AQAB'})
+
+    def test_overlapping_headers(self):
+        self.flat['header']['alg'] = 'RS256'
+        self.assertRaises(errors.DeserializationError,
+                          self.verifier.verify_flattened, self.flat)
+
+
 class CLITest(unittest.TestCase):
 
     def setUp(self):
@@ -234,6 +323,22 @@ class CLITest(unittest.TestCase):
                     '--compact', 'verify', '--kty', 'RSA',
                     '-k', self.key_path]))
 
+    def test_bench(self):
+        from acme.jose.jws import CLI
+
+        for args in [], ['--compact']:
+            with mock.patch('sys.stdin') as sin:
+                sin.read.return_value = 'foo'
+                with mock.patch('sys.stdout') as sout:
+                    CLI.run(args + ['sign', '-k', self.key_path, '-p', 'jwk'])
+                sin.read.return_value = sout.write.mock_calls[0][1][0]
+                with mock.patch('acme.jose.jws.six.print_') as mock_print:
+                    self.assertEqual(0, CLI.run(args + [
+                        'verify', '--bench', '2']))
+            self.assertEqual(2, mock_print.call_count)
+            self.assertTrue(
+                'Verifier' in mock_print.call_args_list[1][0][0])
+
 
 if __name__ == '__main__':
     unittest.main()  # pragma: no cover
@@ -1,6 +1,7 @@
 """JOSE utilities."""
 import collections
 
+from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.asymmetric import rsa
 import OpenSSL
 import six
@@ -134,6 +135,28 @@ class ComparableRSAKey(ComparableKey):  # pylint: disable=too-few-public-methods
             return hash((self.__class__, pub.n, pub.e))
 
 
+class ComparableECKey(ComparableKey):  # pylint: disable=too-few-public-methods
+    """Wrapper for `cryptography` EC keys.
+
+    Wraps around:
+    - `cryptography.hazmat.primitives.asymmetric.EllipticCurvePrivateKey`
+    - `cryptography.hazmat.primitives.asymmetric.EllipticCurvePublicKey`
+
+    """
+
+    def __hash__(self):
+        if isinstance(self._wrapped,
+                      ec.EllipticCurvePrivateKeyWithSerialization):
+            priv = self.private_numbers()
+            pub = priv.public_numbers
+            return hash((self.__class__, pub.curve.name, pub.x, pub.y,
+                         priv.private_value))
+        elif isinstance(self._wrapped,
+                        ec.EllipticCurvePublicKeyWithSerialization):
+            pub = self.public_numbers()
+            return hash((self.__class__, pub.curve.name, pub.x, pub.y))
+
+
 class ImmutableMap(collections.Mapping, collections.Hashable):
     # pylint: disable=too-few-public-methods
     """Immutable key to value mapping with attribute access."""
@@ -91,6 +91,35 @@ class ComparableRSAKeyTest(unittest.TestCase):
         self.assertTrue(isinstance(self.key.public_key(), ComparableRSAKey))
 
 
+class ComparableECKeyTest(unittest.TestCase):
+    """Tests for acme.jose.util.ComparableECKey."""
+
+    def setUp(self):
+        # test_utl.load_ec_private_key return ComparableECKey
+        self.key = test_util.load_ec_private_key('ec_p256_key.pem')
+        self.key_same = test_util.load_ec_private_key('ec_p256_key.pem')
+        self.key2 = test_util.load_ec_private_key('ec_p384_key.pem')
+
+    def test_eq(self):
+        self.assertEqual(self.key, self.key_same)
+        self.assertEqual(self.key.public_key(), self.key_same.public_key())
+
+    def test_ne(self):
+        self.assertNotEqual(self.key, self.key2)
+        self.assertNotEqual(self.key, self.key.public_key())
+
+    def test_hash(self):
+        self.assertTrue(isinstance(hash(self.key), int))
+        self.assertEqual(hash(self.key), hash(self.key_same))
+        self.assertEqual(hash(self.key.public_key()),
+                         hash(self.key_same.public_key()))
+        self.assertNotEqual(hash(self.key), hash(self.key2))
+
+    def test_public_key(self):
+        from acme.jose.util import ComparableECKey
+        self.assertTrue(isinstance(self.key.public_key(), ComparableECKey))
+
+
 class ImmutableMapTest(unittest.TestCase):
     """Tests for acme.jose.util.ImmutableMap."""
 
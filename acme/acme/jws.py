@@ -1,4 +1,8 @@
 """ACME JOSE JWS."""
+import json
+
+from cryptography.hazmat.primitives import hashes
+
 from acme import jose
 
 
@@ -42,3 +46,77 @@ class JWS(jose.JWS):
     def sign(cls, payload, key, alg, nonce):  # pylint: disable=arguments-differ
         return super(JWS, cls).sign(payload, key=key, alg=alg,
                                     protect=frozenset(['nonce']), nonce=nonce)
+
+
+class SigningContext(object):
+    """Signing context for a single account key and algorithm.
+
+    Everything in the ACME `JWS` that does not depend on the nonce or
+    payload (public JWK, unprotected header, key thumbprints) is
+    computed once, so that signing a request reduces to encoding the
+    nonce and payload, and the signature operation itself.
+
+    Context can also be used in place of the account key when
+    generating key authorizations for challenges (e.g.
+    `.KeyAuthorizationChallenge.response`), in which case the cached
+    thumbprint is used.
+
+    :ivar key: Private `.JWK`.
+    :ivar alg: `.JWASignature`.
+
+    """
+    __slots__ = ('key', 'alg', '_public_key', '_header', '_thumbprints')
+
+    def __init__(self, key, alg):
+        assert isinstance(key, alg.kty)
+        self.key = key
+        self.alg = alg
+        self._public_key = key.public_key()
+        # serialize to JSON and back, so that the header can be dumped
+        # together with the per-request parts without custom encoders
+        self._header = json.loads(Header(
+            alg=alg, jwk=self._public_key).json_dumps())
+        self._thumbprints = {}
+
+    def public_key(self):
+        """Public key (`.JWK`), computed once."""
+        return self._public_key
+
+    def thumbprint(self, hash_function=hashes.SHA256):
+        """JWK Thumbprint of the key, computed once per hash function.
+
+        :rtype: bytes
+
+        """
+        try:
+            return self._thumbprints[hash_function]
+        except KeyError:
+            thumbprint = self._thumbprints[hash_function] = (
+                self._public_key.thumbprint(hash_function=hash_function))
+            return thumbprint
+
+    def sign(self, payload, nonce):
+        """Sign the payload.
+
+        Result is equivalent to ``JWS.sign(payload, key, alg,
+        nonce).json_dumps()``.
+
+        :param bytes payload: JWS Payload.
+        :param bytes nonce: Replay nonce (protected).
+
+        :returns: Serialized (flattened JSON) JWS.
+        :rtype: str
+
+        """
+        protected = json.dumps(
+            {'nonce': jose.encode_b64jose(nonce)}).encode('utf-8')
+        encoded_protected = jose.b64encode(protected)
+        encoded_payload = jose.b64encode(payload)
+        signature = self.alg.sign(
+            self.key.key, encoded_protected + b'.' + encoded_payload)
+        return json.dumps({
+            'header': self._header,
+            'protected': encoded_protected.decode('ascii'),
+            'payload': encoded_payload.decode('ascii'),
+            'signature': jose.encode_b64jose(signature),
+        })
@@ -1,6 +1,9 @@
 """Tests for acme.jws."""
 import unittest
 
+from cryptography.hazmat.primitives import hashes
+
+from acme import challenges
 from acme import jose
 from acme import test_util
 
@@ -48,5 +51,40 @@ class JWSTest(unittest.TestCase):
         self.assertEqual(jws, JWS.from_json(jws.to_json()))
 
 
+class SigningContextTest(unittest.TestCase):
+    """Tests for acme.jws.SigningContext."""
+
+    def setUp(self):
+        from acme.jws import SigningContext
+        self.context = SigningContext(KEY, jose.RS256)
+
+    def test_sign_equivalent(self):
+        from acme.jws import JWS
+        jws = JWS.json_loads(self.context.sign(b'foo', b'Nonce'))
+        self.assertEqual(JWS.sign(
+            payload=b'foo', key=KEY, alg=jose.RS256, nonce=b'Nonce'), jws)
+        self.assertTrue(jws.verify())
+        self.assertEqual(KEY.public_key(), jws.signature.combined.jwk)
+        self.assertEqual(b'Nonce', jws.signature.combined.nonce)
+        self.assertEqual('{"nonce": "Tm9uY2U"}', jws.signature.protected)
+
+    def test_public_key(self):
+        self.assertEqual(KEY.public_key(), self.context.public_key())
+
+    def test_thumbprint_cached(self):
+        self.assertEqual(KEY.thumbprint(), self.context.thumbprint())
+        self.assertTrue(self.context.thumbprint() is
+                        self.context.thumbprint())
+        self.assertEqual(KEY.thumbprint(hashes.SHA1),
+                         self.context.thumbprint(hashes.SHA1))
+
+    def test_key_authorization(self):
+        chall = challenges.HTTP01(token=b'x' * 16)
+        self.assertEqual(chall.key_authorization(KEY),
+                         chall.key_authorization(self.context))
+        self.assertTrue(chall.response(self.context).verify(
+            chall, KEY.public_key()))
+
+
 if __name__ == '__main__':
     unittest.main()  # pragma: no cover
@@ -1,6 +1,8 @@
 """ACME protocol messages."""
 import collections
 
+import six
+
 from acme import challenges
 from acme import errors
 from acme import fields
@@ -59,32 +61,52 @@ class Error(jose.JSONObjectWithFields, errors.Error):
 
 
 class _Constant(jose.JSONDeSerializable, collections.Hashable):
-    """ACME constant."""
-    __slots__ = ('name',)
+    """ACME constant.
+
+    Constants are flyweights: there is only one instance for each name,
+    which is returned both by the constructor and `from_json`.
+
+    """
+    __slots__ = ('name', '_hash')
     POSSIBLE_NAMES = NotImplemented
 
-    def __init__(self, name):
-        self.POSSIBLE_NAMES[name] = self
+    def __new__(cls, name):
+        try:
+            return cls.POSSIBLE_NAMES[name]
+        except KeyError:
+            self = cls.POSSIBLE_NAMES[name] = super(
+                _Constant, cls).__new__(cls)
+            return self
+
+    def __init__(self, name):  # pylint: disable=super-init-not-called
         self.name = name
+        self._hash = hash((self.__class__, self.name))
+
+    def __reduce__(self):
+        # no state: restoring the hash (computed in another process,
+        # from another class object) would corrupt the shared instance
+        return (self.__class__, (self.name,))
 
     def to_partial_json(self):
         return self.name
 
     @classmethod
     def from_json(cls, value):
-        if value not in cls.POSSIBLE_NAMES:
+        try:
+            return cls.POSSIBLE_NAMES[value]
+        except (KeyError, TypeError):  # TypeError: unhashable value
             raise jose.DeserializationError(
                 '{0} not recognized'.format(cls.__name__))
-        return cls.POSSIBLE_NAMES[value]
 
     def __repr__(self):
         return '{0}({1})'.format(self.__class__.__name__, self.name)
 
     def __eq__(self, other):
-        return isinstance(other, type(self)) and other.name == self.name
+        return self is other or (
+            isinstance(other, type(self)) and other.name == self.name)
 
     def __hash__(self):
-        return hash((self.__class__, self.name))
+        return self._hash
 
     def __ne__(self, other):
         return not self == other
@@ -144,14 +166,28 @@ class Directory(jose.JSONDeSerializable):
         # TODO: check that everything is an absolute URL; acme-spec is
         # not clear on that
         self._jobj = canon_jobj
+        # precomputed lookups by resource type, resource body class
+        # and attribute name, so that common accesses need no _canon_key
+        self._items = dict(canon_jobj)
+        self._items.update(
+            (self._REGISTERED_TYPES[key], value)
+            for key, value in six.iteritems(canon_jobj))
+        self._attrs = dict(
+            (key.replace('-', '_'), value)
+            for key, value in six.iteritems(canon_jobj))
 
     def __getattr__(self, name):
         try:
-            return self[name.replace('_', '-')]
-        except KeyError as error:
-            raise AttributeError(str(error))
+            # __dict__: no recursion if not initialized (e.g. unpickling)
+            return self.__dict__['_attrs'][name]
+        except KeyError:
+            raise AttributeError('Directory field not found')
 
     def __getitem__(self, name):
+        try:
+            return self._items[name]
+        except (KeyError, TypeError):  # TypeError: unhashable key
+            pass
         try:
             return self._jobj[self._canon_key(name)]
         except KeyError:
@@ -373,6 +409,99 @@ class Authorization(ResourceBody):
                      for combo in self.combinations)
 
 
+class LazyChallengeBodies(jose.JSONDeSerializable, collections.Sequence,
+                          collections.Hashable):
+    """Challenges of `LazyAuthorization`.
+
+    Sequence of `ChallengeBody`, each of which is deserialized only
+    when it is accessed for the first time. Consequently,
+    `jose.DeserializationError` for a malformed challenge is raised on
+    access rather than when the authorization is deserialized.
+
+    Compares equal to a `tuple` of the same challenges.
+
+    :ivar tuple jobjs: Raw (partially serialized) challenges.
+
+    """
+    __slots__ = ('jobjs', '_challbs', '_resolved')
+
+    def __init__(self, jobjs):
+        self.jobjs = tuple(jobjs)
+        self._challbs = [None] * len(self.jobjs)
+        self._resolved = {}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[idx] for idx in range(*index.indices(len(self))))
+        challb = self._challbs[index]
+        if challb is None:
+            challb = self._challbs[index] = ChallengeBody.from_json(
+                self.jobjs[index])
+        return challb
+
+    def __len__(self):
+        return len(self.jobjs)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyChallengeBodies) and other.jobjs == self.jobjs:
+            return True
+        return isinstance(other, collections.Sequence) and (
+            tuple(self) == tuple(other))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(self.__class__.__name__, self.jobjs)
+
+    def resolve(self, combinations):
+        """Resolve challenge combinations.
+
+        Results are memoized by ``combinations``.
+
+        :param tuple combinations: Combinations of challenge indices.
+
+        :returns: Combinations with challenges instead of indices.
+        :rtype: tuple
+
+        """
+        try:
+            return self._resolved[combinations]
+        except KeyError:
+            resolved = self._resolved[combinations] = tuple(
+                tuple(self[idx] for idx in combo) for combo in combinations)
+            return resolved
+
+    def to_partial_json(self):
+        return [jobj if challb is None else challb
+                for jobj, challb in six.moves.zip(self.jobjs, self._challbs)]
+
+    @classmethod
+    def from_json(cls, jobj):
+        return cls(jobj)
+
+
+class LazyAuthorization(Authorization):
+    """Authorization Resource Body with lazily deserialized challenges.
+
+    Suitable e.g. for polling, when only `status` is inspected. See
+    `LazyChallengeBodies`.
+
+    """
+    challenges = jose.Field('challenges', omitempty=True,
+                            decoder=LazyChallengeBodies.from_json)
+
+    @property
+    def resolved_combinations(self):
+        """Combinations with challenges instead of indices (memoized)."""
+        if isinstance(self.challenges, LazyChallengeBodies):
+            return self.challenges.resolve(self.combinations)
+        return super(LazyAuthorization, self).resolved_combinations
+
+
 @Directory.register
 class NewAuthorization(Authorization):
     """New authorization."""
@@ -1,4 +1,5 @@
 """Tests for acme.messages."""
+import json
 import unittest
 
 import mock
@@ -69,6 +70,36 @@ class ConstantTest(unittest.TestCase):
     def test_from_json_hashable(self):
         hash(self.MockConstant.from_json('a'))
 
+    def test_from_json_unhashable(self):
+        self.assertRaises(
+            jose.DeserializationError, self.MockConstant.from_json, ['a'])
+
+    def test_flyweight(self):
+        self.assertTrue(self.const_a is self.MockConstant('a'))
+        self.assertTrue(self.const_a is self.MockConstant.from_json('a'))
+
+    def test_copy_and_pickle(self):
+        import copy
+        import pickle
+        from acme.messages import STATUS_VALID
+        self.assertTrue(STATUS_VALID is copy.deepcopy(STATUS_VALID))
+        self.assertTrue(STATUS_VALID is pickle.loads(
+            pickle.dumps(STATUS_VALID, protocol=2)))
+
+    def test_pickle_keeps_hash(self):
+        import pickle
+        from acme.messages import Status, STATUS_VALID
+        statuses = {STATUS_VALID: 'valid'}
+        status_hash = hash(STATUS_VALID)
+        # only the name is pickled, nothing is restored onto the
+        # shared instance
+        self.assertEqual((Status, ('valid',)), STATUS_VALID.__reduce__())
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            self.assertTrue(STATUS_VALID is pickle.loads(
+                pickle.dumps(STATUS_VALID, protocol=protocol)))
+            self.assertEqual(status_hash, hash(STATUS_VALID))
+            self.assertTrue(STATUS_VALID in statuses)
+
     def test_repr(self):
         self.assertEqual('MockConstant(a)', repr(self.const_a))
         self.assertEqual('MockConstant(b)', repr(self.const_b))
@@ -105,8 +136,20 @@ class DirectoryTest(unittest.TestCase):
     def test_getitem_fails_with_key_error(self):
         self.assertRaises(KeyError, self.dir.__getitem__, 'foo')
 
+    def test_getitem_instance(self):
+        self.assertEqual('cert', self.dir[mock.MagicMock(
+            resource_type='new-cert')])
+
     def test_getattr(self):
         self.assertEqual('reg', self.dir.new_reg)
+        self.assertEqual('cert', self.dir.new_cert)
+
+    def test_pickle(self):
+        import pickle
+        from acme.messages import Directory
+        directory = pickle.loads(pickle.dumps(
+            Directory({'new-reg': 'reg'}), protocol=2))
+        self.assertEqual('reg', directory.new_reg)
 
     def test_getattr_fails_with_attribute_error(self):
         self.assertRaises(AttributeError, self.dir.__getattr__, 'foo')
@@ -305,6 +348,88 @@ class AuthorizationTest(unittest.TestCase):
         ))
 
 
+class LazyAuthorizationTest(unittest.TestCase):
+    """Tests for acme.messages.LazyAuthorization."""
+
+    def setUp(self):
+        from acme.messages import Authorization
+        from acme.messages import ChallengeBody
+        from acme.messages import Identifier
+        from acme.messages import IDENTIFIER_FQDN
+        self.challbs = (
+            ChallengeBody(uri='http://challb1', chall=challenges.HTTP01(
+                token=b'IlirfxKKXAsHtmzK29Pj8A')),
+            ChallengeBody(uri='http://challb2', chall=challenges.DNS(
+                token=b'DGyRejmCefe7v4NfDGDKfA')),
+        )
+        self.authz = Authorization(
+            identifier=Identifier(typ=IDENTIFIER_FQDN, value='example.com'),
+            combinations=((0,), (1,)), challenges=self.challbs)
+        self.jobj = json.loads(self.authz.json_dumps())
+
+        self.decode_patch = mock.patch(
+            'acme.messages.ChallengeBody.from_json',
+            side_effect=ChallengeBody.from_json)
+        self.decode = self.decode_patch.start()
+
+    def tearDown(self):
+        self.decode_patch.stop()
+
+    def _from_json(self):
+        from acme.messages import LazyAuthorization
+        return LazyAuthorization.from_json(self.jobj)
+
+    def test_challenges_not_decoded(self):
+        authz = self._from_json()
+        self.assertEqual(2, len(authz.challenges))
+        self.assertFalse(self.decode.called)
+
+    def test_challenges_decoded_once(self):
+        authz = self._from_json()
+        self.assertEqual(self.challbs[1], authz.challenges[1])
+        self.assertEqual(self.challbs[1], authz.challenges[-1])
+        self.decode.assert_called_once_with(self.jobj['challenges'][1])
+        self.assertEqual(self.challbs, authz.challenges[:])
+        self.assertEqual(2, self.decode.call_count)
+
+    def test_challenges_decoding_error(self):
+        self.jobj['challenges'][0] = {'type': 'foo'}
+        authz = self._from_json()
+        self.assertRaises(jose.DeserializationError,
+                          authz.challenges.__getitem__, 0)
+
+    def test_equality(self):
+        authz = self._from_json()
+        self.assertEqual(self.authz, authz)
+        self.assertEqual(authz, self.authz)
+        self.assertEqual(authz, self._from_json())
+        self.assertFalse(authz.challenges != self.challbs)
+        self.assertNotEqual(authz.challenges, self.challbs[:1])
+        self.assertEqual(hash(self.challbs), hash(authz.challenges))
+
+    def test_resolved_combinations(self):
+        authz = self._from_json()
+        resolved = authz.resolved_combinations
+        self.assertEqual(self.authz.resolved_combinations, resolved)
+        self.assertTrue(resolved is authz.resolved_combinations)
+
+    def test_resolved_combinations_not_lazy(self):
+        from acme.messages import LazyAuthorization
+        authz = LazyAuthorization(**dict(self.authz))
+        self.assertEqual(self.authz.resolved_combinations,
+                         authz.resolved_combinations)
+
+    def test_to_json(self):
+        authz = self._from_json()
+        self.assertEqual(self.jobj, json.loads(authz.json_dumps()))
+        authz.challenges[0]  # pylint: disable=pointless-statement
+        self.assertEqual(self.jobj, json.loads(authz.json_dumps()))
+
+    def test_repr(self):
+        self.assertTrue(repr(self._from_json().challenges).startswith(
+            'LazyChallengeBodies('))
+
+
 class AuthorizationResourceTest(unittest.TestCase):
     """Tests for acme.messages.AuthorizationResource."""
 
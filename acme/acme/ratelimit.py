@@ -0,0 +1,241 @@
+"""Client-side rate limiting of ACME requests."""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket(object):
+    """Token bucket.
+
+    Bucket holds at most `capacity` tokens and is refilled with `rate`
+    tokens per second. Each request consumes a single token. When the
+    server throttles the client, the bucket is emptied, blocked until
+    the time indicated by the server, and `rate` is halved (down to
+    `min_rate`); it then grows back towards `max_rate` with each
+    successful request.
+
+    :ivar float max_rate: Configured refill rate (tokens per second).
+    :ivar float rate: Current (learned) refill rate.
+    :ivar float capacity: Maximum number of tokens.
+    :ivar float tokens: Number of available tokens. Negative, if
+        tokens were reserved by callers that are still waiting.
+    :ivar float updated: Time of the last refill.
+    :ivar float blocked_until: Time before which no requests should be
+        sent.
+
+    """
+    RECOVERY = 0.05
+    """Fraction of `max_rate` regained after each successful request."""
+
+    def __init__(self, rate, capacity, min_rate=None):
+        self.max_rate = self.rate = float(rate)
+        self.min_rate = self.max_rate / 64 if min_rate is None else min_rate
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated = time.time()
+        self.blocked_until = 0
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def acquire(self):
+        """Reserve a token.
+
+        :returns: Time (in seconds) the caller has to wait before
+            sending the request.
+        :rtype: float
+
+        """
+        now = time.time()
+        self._refill(now)
+        self.tokens -= 1
+        delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        return max(delay, self.blocked_until - now)
+
+    def throttled(self, retry_after=None):
+        """Learn from a throttled request.
+
+        :param float retry_after: Seconds before the server is willing
+            to accept further requests, if known.
+
+        """
+        now = time.time()
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._refill(now)
+        self.tokens = min(self.tokens, 0)
+        self.blocked_until = max(
+            self.blocked_until,
+            now + (1 / self.rate if retry_after is None else retry_after))
+
+    def succeeded(self):
+        """Learn from a successful request."""
+        self.rate = min(self.max_rate,
+                        self.rate + self.max_rate * self.RECOVERY)
+
+    def to_json(self):
+        """Serialize state to JSON."""
+        return {
+            'rate': self.rate,
+            'tokens': self.tokens,
+            'updated': self.updated,
+            'blocked_until': self.blocked_until,
+        }
+
+    def update_from_json(self, jobj):
+        """Restore state serialized with `to_json`.
+
+        Configuration (`max_rate`, `capacity`) is not overridden.
+
+        """
+        self.rate = min(self.max_rate, max(self.min_rate, jobj['rate']))
+        self.tokens = min(self.capacity, jobj['tokens'])
+        self.updated = jobj['updated']
+        self.blocked_until = jobj['blocked_until']
+
+
+class RateLimiter(object):
+    """Rate limiter with a `TokenBucket` per endpoint class.
+
+    Endpoint class of a POST request is the ``resource`` type of the
+    posted message (e.g. ``new-reg``, ``new-authz``, ``new-cert``),
+    while all GET requests (mostly polling) fall into `POLL`. Requests
+    of classes without a bucket are not limited.
+
+    :ivar dict buckets: Mapping from endpoint class to `TokenBucket`.
+    :ivar str path: Path to the file where state is persisted between
+        runs, or ``None``.
+
+    """
+    POLL = 'poll'
+    """Endpoint class of GET requests."""
+
+    DEFAULT_LIMITS = {
+        'new-reg': (10 / 10800.0, 10),
+        'new-authz': (300 / 3600.0, 300),
+        'new-cert': (300 / 10800.0, 100),
+        POLL: (20, 20),
+    }
+    """Default ``(rate, capacity)`` of buckets, per endpoint class."""
+
+    def __init__(self, limits=None, path=None):
+        limits = self.DEFAULT_LIMITS if limits is None else limits
+        self.buckets = dict((endpoint, TokenBucket(rate, capacity))
+                            for endpoint, (rate, capacity)
+                            in limits.items())
+        self.path = path
+        self.stats = dict((endpoint, {'requests': 0, 'throttled': 0,
+                                      'waited': 0})
+                          for endpoint in self.buckets)
+        self._lock = threading.Lock()
+        if path is not None:
+            self.load()
+
+    @classmethod
+    def endpoint_class(cls, method, obj=None):
+        """Determine endpoint class of the request.
+
+        :param str method: HTTP method.
+        :param obj: Posted object, if any.
+
+        :rtype: str
+
+        """
+        if method == 'POST':
+            return getattr(obj, 'resource', None)
+        return cls.POLL
+
+    def limits(self, endpoint):
+        """Are requests of the endpoint class limited?"""
+        return endpoint in self.buckets
+
+    def acquire(self, endpoint):
+        """Reserve capacity for a request.
+
+        :returns: Time (in seconds) the caller has to wait before
+            sending the request.
+        :rtype: float
+
+        """
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            return 0
+        with self._lock:
+            delay = bucket.acquire()
+            self.stats[endpoint]['requests'] += 1
+            self.stats[endpoint]['waited'] += delay
+        return delay
+
+    def wait(self, endpoint):
+        """Block until a request of the endpoint class may be sent."""
+        delay = self.acquire(endpoint)
+        if delay > 0:
+            logger.debug('Rate limiting %s request for %.2f seconds',
+                         endpoint, delay)
+            time.sleep(delay)
+
+    def throttled(self, endpoint, retry_after=None):
+        """Learn from a request throttled by the server.
+
+        State is persisted immediately, so that the next run does not
+        hit the limit again.
+
+        """
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            return
+        with self._lock:
+            bucket.throttled(retry_after)
+            self.stats[endpoint]['throttled'] += 1
+        logger.debug('%s requests throttled by the server, rate lowered '
+                     'to %f/s', endpoint, bucket.rate)
+        self.save()
+
+    def succeeded(self, endpoint):
+        """Learn from a successful request."""
+        bucket = self.buckets.get(endpoint)
+        if bucket is not None:
+            with self._lock:
+                bucket.succeeded()
+
+    def load(self):
+        """Load state from `path`."""
+        try:
+            with open(self.path) as state_file:
+                state = json.load(state_file)
+            with self._lock:
+                for endpoint, jobj in state.items():
+                    if endpoint in self.buckets:
+                        self.buckets[endpoint].update_from_json(jobj)
+        except (IOError, OSError, ValueError, KeyError, TypeError,
+                AttributeError) as error:
+            logger.debug('Could not load rate limiter state from %s: %s',
+                         self.path, error)
+
+    def save(self):
+        """Persist state to `path` (if set)."""
+        if self.path is None:
+            return
+        with self._lock:
+            state = dict((endpoint, bucket.to_json())
+                         for endpoint, bucket in self.buckets.items())
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'w') as tmp_file:
+                json.dump(state, tmp_file)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError) as error:
+            logger.debug('Could not save rate limiter state to %s: %s',
+                         self.path, error)
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,142 @@
+"""Tests for acme.ratelimit."""
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from acme import messages
+
+
+class TokenBucketTest(unittest.TestCase):
+    """Tests for acme.ratelimit.TokenBucket."""
+
+    def setUp(self):
+        self.time_patch = mock.patch('acme.ratelimit.time')
+        self.time = self.time_patch.start()
+        self.time.time.return_value = 1000
+        from acme.ratelimit import TokenBucket
+        self.bucket = TokenBucket(rate=2, capacity=2)
+
+    def tearDown(self):
+        self.time_patch.stop()
+
+    def test_acquire(self):
+        self.assertEqual(0, self.bucket.acquire())
+        self.assertEqual(0, self.bucket.acquire())
+        self.assertEqual(0.5, self.bucket.acquire())
+        self.assertEqual(1, self.bucket.acquire())
+
+    def test_refill(self):
+        self.bucket.acquire()
+        self.bucket.acquire()
+        self.time.time.return_value = 1100
+        self.assertEqual(0, self.bucket.acquire())
+        self.assertEqual(0, self.bucket.acquire())
+        self.assertEqual(0.5, self.bucket.acquire())
+
+    def test_throttled_retry_after(self):
+        self.bucket.throttled(retry_after=30)
+        self.assertEqual(1, self.bucket.rate)
+        self.assertEqual(30, self.bucket.acquire())
+
+    def test_throttled_no_retry_after(self):
+        self.bucket.throttled()
+        self.assertEqual(1, self.bucket.acquire())
+
+    def test_throttled_min_rate(self):
+        for _ in range(10):
+            self.bucket.throttled()
+        self.assertEqual(self.bucket.min_rate, self.bucket.rate)
+
+    def test_succeeded_recovers(self):
+        self.bucket.throttled()
+        for _ in range(100):
+            self.bucket.succeeded()
+        self.assertEqual(2, self.bucket.rate)
+
+    def test_json(self):
+        from acme.ratelimit import TokenBucket
+        self.bucket.acquire()
+        self.bucket.throttled(10)
+        bucket = TokenBucket(rate=2, capacity=2)
+        bucket.update_from_json(self.bucket.to_json())
+        self.assertEqual(self.bucket.to_json(), bucket.to_json())
+
+
+class RateLimiterTest(unittest.TestCase):
+    """Tests for acme.ratelimit.RateLimiter."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'state.json')
+        from acme.ratelimit import RateLimiter
+        self.limiter = RateLimiter({'new-cert': (1, 1)}, path=self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_endpoint_class(self):
+        from acme.ratelimit import RateLimiter
+        self.assertEqual('poll', RateLimiter.endpoint_class('GET'))
+        self.assertEqual('new-cert', RateLimiter.endpoint_class(
+            'POST', messages.CertificateRequest(csr=None)))
+        self.assertEqual('new-reg', RateLimiter.endpoint_class(
+            'POST', messages.NewRegistration()))
+        self.assertTrue(RateLimiter.endpoint_class('POST', object()) is None)
+
+    def test_default_limits(self):
+        from acme.ratelimit import RateLimiter
+        self.assertEqual(
+            set(['new-reg', 'new-authz', 'new-cert', 'poll']),
+            set(RateLimiter().buckets))
+
+    def test_unlimited_endpoint(self):
+        self.assertTrue(self.limiter.limits('new-cert'))
+        self.assertFalse(self.limiter.limits('new-reg'))
+        for _ in range(10):
+            self.assertEqual(0, self.limiter.acquire('new-reg'))
+        self.limiter.throttled('new-reg')
+        self.limiter.succeeded('new-reg')
+        self.assertFalse(os.path.exists(self.path))
+
+    @mock.patch('acme.ratelimit.time.sleep')
+    def test_wait(self, sleep_mock):
+        self.limiter.wait('new-cert')
+        self.assertFalse(sleep_mock.called)
+        self.limiter.wait('new-cert')
+        self.assertEqual(1, sleep_mock.call_count)
+        self.assertEqual(2, self.limiter.stats['new-cert']['requests'])
+
+    def test_throttled_persists(self):
+        self.limiter.throttled('new-cert', retry_after=3600)
+        self.assertEqual(1, self.limiter.stats['new-cert']['throttled'])
+        from acme.ratelimit import RateLimiter
+        limiter = RateLimiter({'new-cert': (1, 1)}, path=self.path)
+        self.assertTrue(limiter.acquire('new-cert') > 3500)
+
+    def test_load_corrupted(self):
+        with open(self.path, 'w') as state_file:
+            state_file.write('[')
+        from acme.ratelimit import RateLimiter
+        limiter = RateLimiter({'new-cert': (1, 1)}, path=self.path)
+        self.assertEqual(0, limiter.acquire('new-cert'))
+
+    def test_save_error(self):
+        self.limiter.path = os.path.join(self.tmp_dir, 'missing', 'state')
+        self.limiter.save()  # does not raise
+
+    @mock.patch('acme.ratelimit.os.rename')
+    def test_save_error_cleans_up(self, mock_rename):
+        mock_rename.side_effect = OSError
+        self.limiter.save()
+        self.assertEqual([], os.listdir(self.tmp_dir))
+
+    def test_save_no_path(self):
+        from acme.ratelimit import RateLimiter
+        RateLimiter().save()
+
+
+if __name__ == '__main__':
+    unittest.main()  # pragma: no cover
@@ -0,0 +1,55 @@
+"""Benchmark JOSE Base64 encoding and decoding.
+
+Usage: python b64_benchmark.py [NUMBER]
+
+Compares `acme.jose.b64` against the previous implementation based on
+`base64.urlsafe_b64encode` (with stripping of the padding) and
+`base64.urlsafe_b64decode` (with re-added padding), for a nonce-sized
+input, a DER certificate and a certificate chain.
+"""
+import base64
+import pkg_resources
+import sys
+import timeit
+
+from acme.jose import b64
+
+
+def old_b64encode(data):
+    """Previous implementation of `acme.jose.b64.b64encode`."""
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def old_b64decode(data):
+    """Previous implementation of `acme.jose.b64.b64decode`."""
+    return base64.urlsafe_b64decode(data + b'=' * (4 - (len(data) % 4)))
+
+
+def inputs():
+    """Sample inputs."""
+    cert = pkg_resources.resource_string('acme', 'testdata/cert.der')
+    return [
+        ('32 bytes', b'\xfb' * 32),
+        ('certificate ({0} bytes)'.format(len(cert)), cert),
+        ('chain ({0} bytes)'.format(4 * len(cert)), 4 * cert),
+    ]
+
+
+def bench(number):
+    """Run the benchmark."""
+    for name, data in inputs():
+        encoded = b64.b64encode(data)
+        assert encoded == old_b64encode(data)
+        assert b64.b64decode(encoded) == old_b64decode(encoded) == data
+        for operation, old, new, arg in (
+                ('encode', old_b64encode, b64.b64encode, data),
+                ('decode', old_b64decode, b64.b64decode, encoded)):
+            old_time = timeit.timeit(lambda: old(arg), number=number)
+            new_time = timeit.timeit(lambda: new(arg), number=number)
+            print('{0} {1}: old {2:.2f}us, new {3:.2f}us ({4:.2f}x)'.format(
+                name, operation, old_time / number * 1e6,
+                new_time / number * 1e6, old_time / new_time))
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,42 @@
+"""Compare GET throughput of HTTP/1.1 keep-alive and HTTP/2 transports.
+
+Usage: python http2_benchmark.py URL [REQUESTS] [CONCURRENCY]
+
+URL should point to an HTTPS endpoint of an ACME server (e.g. an
+authorization or the directory). HTTP/2 needs ``pip install acme[http2]``.
+"""
+import multiprocessing.pool
+import sys
+import time
+
+from acme import client
+
+
+def benchmark(url, requests, concurrency, http2):
+    """Send `requests` GETs to `url`, return requests per second."""
+    with client.ClientNetwork(key=None, http2=http2,
+                              pool_maxsize=concurrency) as net:
+        net.get(url, content_type=None)  # warm up the connection(s)
+        pool = multiprocessing.pool.ThreadPool(concurrency)
+        start = time.time()
+        try:
+            pool.map(lambda _: net.get(url, content_type=None),
+                     range(requests))
+        finally:
+            pool.terminate()
+        return requests / (time.time() - start)
+
+
+def main():
+    """Run the benchmark."""
+    url = sys.argv[1]
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    for http2 in False, True:
+        print('{0}: {1:.1f} requests/s'.format(
+            'HTTP/2' if http2 else 'HTTP/1.1 keep-alive',
+            benchmark(url, requests, concurrency, http2)))
+
+
+if __name__ == '__main__':
+    main()
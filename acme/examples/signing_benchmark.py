@@ -0,0 +1,48 @@
+"""Compare JWS signing throughput of RS256 and ES256 account keys.
+
+Usage: python signing_benchmark.py [NUMBER]
+
+Signs a typical ACME request (`.NewAuthorization`) using
+`acme.jws.SigningContext`, i.e. the same code path as
+`acme.client.ClientNetwork`, and verifies the result once.
+"""
+import sys
+import timeit
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from acme import jose
+from acme import jws
+from acme import messages
+
+
+def keys():
+    """Fresh account keys for each algorithm."""
+    return [
+        (jose.RS256, jose.JWKRSA(key=rsa.generate_private_key(
+            public_exponent=65537, key_size=2048,
+            backend=default_backend()))),
+        (jose.ES256, jose.JWKEC(key=ec.generate_private_key(
+            ec.SECP256R1(), default_backend()))),
+    ]
+
+
+def bench(number):
+    """Run the benchmark."""
+    payload = messages.NewAuthorization(
+        identifier=messages.Identifier(
+            typ=messages.IDENTIFIER_FQDN, value='example.com')).json_dumps()
+    payload = payload.encode('utf-8')
+    for alg, key in keys():
+        context = jws.SigningContext(key, alg)
+        assert jws.JWS.json_loads(context.sign(payload, b'nonce')).verify()
+        seconds = timeit.timeit(
+            lambda: context.sign(payload, b'nonce'), number=number)
+        print('{0}: {1:.1f} signatures/s ({2:.1f}us each)'.format(
+            alg.name, number / seconds, seconds / number * 1e6))
+
+
+if __name__ == '__main__':
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -42,6 +42,10 @@ docs_extras = [
     'sphinxcontrib-programoutput',
 ]
 
+http2_extras = [
+    'hyper',
+]
+
 testing_extras = [
     'nose',
     'tox',
@@ -77,6 +81,7 @@ setup(
     install_requires=install_requires,
     extras_require={
         'docs': docs_extras,
+        'http2': http2_extras,
         'testing': testing_extras,
     },
     entry_points={
@@ -0,0 +1,41 @@
+"""Compare cost of generating certificate keys and CSRs.
+
+Usage: python key_generation_benchmark.py [NUMBER]
+
+Measures `letsencrypt.crypto_util.make_key` followed by
+`letsencrypt.crypto_util.make_csr`, i.e. the work done for each lineage
+on every issuance and renewal, for the supported key types.
+"""
+import sys
+import time
+
+from letsencrypt import crypto_util
+
+
+KEYS = [
+    ("RSA 2048", dict(bits=2048)),
+    ("RSA 4096", dict(bits=4096)),
+    ("ECDSA secp256r1", dict(bits=None, key_type="ecdsa",
+                             elliptic_curve="secp256r1")),
+    ("ECDSA secp384r1", dict(bits=None, key_type="ecdsa",
+                             elliptic_curve="secp384r1")),
+]
+
+
+def bench(number):
+    """Run the benchmark."""
+    for name, kwargs in KEYS:
+        key_time = csr_time = 0
+        for _ in range(number):
+            start = time.time()
+            key = crypto_util.make_key(**kwargs)
+            key_time += time.time() - start
+            start = time.time()
+            crypto_util.make_csr(key, ["example.com", "www.example.com"])
+            csr_time += time.time() - start
+        print("{0}: key {1:.2f}ms, CSR {2:.2f}ms".format(
+            name, key_time / number * 1e3, csr_time / number * 1e3))
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,100 @@
+"""Count file system calls made to evaluate a lineage for renewal.
+
+Usage: python renewal_syscall_benchmark.py [NUMBER]
+
+Creates a lineage with a few versions in a temporary directory and
+evaluates it the way `letsencrypt.renewer` does (`should_autorenew`,
+`latest_common_version`, `should_autodeploy`, `names`), with and
+without `letsencrypt.storage.RenewableCert.metadata_cache`. Calls of
+``stat``, ``lstat``, ``readlink``, ``listdir`` and ``open`` are counted
+by wrapping the corresponding Python functions.
+"""
+import __builtin__
+import argparse
+import collections
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pkg_resources
+
+from letsencrypt import configuration
+from letsencrypt import storage
+
+
+OS_CALLS = ("stat", "lstat", "readlink", "listdir")
+
+
+def make_lineage(config_dir, versions=5):
+    """Create a lineage with ``versions`` versions."""
+    cert = pkg_resources.resource_string(
+        "letsencrypt.tests", os.path.join("testdata", "cert.pem"))
+    cli_config = configuration.RenewerConfiguration(
+        argparse.Namespace(config_dir=config_dir))
+    lineage = storage.RenewableCert.new_lineage(
+        "example.com", cert, "privkey", "chain", cli_config=cli_config)
+    for version in range(1, versions):
+        lineage.save_successor(version, cert, None, "chain")
+    return lineage
+
+
+def evaluate(lineage):
+    """Evaluate the lineage like the renewer does."""
+    lineage.should_autorenew()
+    lineage.latest_common_version()
+    lineage.should_autodeploy()
+    lineage.names()
+
+
+def evaluate_cached(lineage):
+    """Evaluate the lineage within its metadata cache."""
+    with lineage.metadata_cache():
+        evaluate(lineage)
+
+
+def count_calls(func, lineage):
+    """Count file system calls made by ``func(lineage)``."""
+    counts = collections.Counter()
+
+    def counting(name, real):  # pylint: disable=missing-docstring
+        def wrapper(*args, **kwargs):  # pylint: disable=missing-docstring
+            counts[name] += 1
+            return real(*args, **kwargs)
+        return wrapper
+
+    originals = [(module, name, getattr(module, name)) for module, name in
+                 [(os, name) for name in OS_CALLS] + [(__builtin__, "open")]]
+    for module, name, real in originals:
+        setattr(module, name, counting(name, real))
+    try:
+        func(lineage)
+    finally:
+        for module, name, real in originals:
+            setattr(module, name, real)
+    return counts
+
+
+def bench(number):
+    """Run the benchmark."""
+    config_dir = tempfile.mkdtemp()
+    try:
+        lineage = make_lineage(config_dir)
+        for name, func in (("uncached", evaluate),
+                           ("cached", evaluate_cached)):
+            counts = count_calls(func, lineage)
+            start = time.time()
+            for _ in range(number):
+                func(lineage)
+            print("{0}: {1} calls ({2}), {3:.2f}ms".format(
+                name, sum(counts.values()), ", ".join(
+                    "{0} {1}".format(call, counts[call])
+                    for call in OS_CALLS + ("open",)),
+                (time.time() - start) / number * 1e3))
+    finally:
+        shutil.rmtree(config_dir)
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
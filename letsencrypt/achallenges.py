@@ -46,7 +46,16 @@ class AnnotatedChallenge(jose.ImmutableMap):
 
 
 class KeyAuthorizationAnnotatedChallenge(AnnotatedChallenge):
-    """Client annotated `KeyAuthorizationChallenge` challenge."""
+    """Client annotated `KeyAuthorizationChallenge` challenge.
+
+    :ivar str domain: Domain the challenge is for.
+    :ivar account_key: Authorized account key: a private `.JWK`, or its
+        `acme.jws.SigningContext` (as set by `.AuthHandler`, so that the
+        key thumbprint is computed only once). Plugins may only rely on
+        the methods common to both, i.e. ``thumbprint()`` and
+        ``public_key()``.
+
+    """
     __slots__ = ('challb', 'domain', 'account_key')
 
     def response_and_validation(self, *args, **kwargs):
@@ -212,7 +212,9 @@ class AuthHandler(object):
         completed = []
         failed = []
 
-        self.authzr[domain], _ = self.acme.poll(self.authzr[domain])
+        # challenges are decoded only if authorization is not valid yet
+        self.authzr[domain], _ = self.acme.poll(
+            self.authzr[domain], lazy=True)
         if self.authzr[domain].body.status == messages.STATUS_VALID:
             return achalls, []
 
@@ -315,12 +317,15 @@ class AuthHandler(object):
         """
         dv_chall = []
         cont_chall = []
+        # signing context of the account key caches its thumbprint for
+        # the key authorizations of all challenges
+        account_key = self.acme.net.signing_context
 
         for index in path:
             challb = self.authzr[domain].body.challenges[index]
             chall = challb.chall
 
-            achall = challb_to_achall(challb, self.account.key, domain)
+            achall = challb_to_achall(challb, account_key, domain)
 
             if isinstance(chall, challenges.ContinuityChallenge):
                 cont_chall.append(achall)
@@ -334,7 +339,8 @@ def challb_to_achall(challb, account_key, domain):
     """Converts a ChallengeBody object to an AnnotatedChallenge.
 
     :param .ChallengeBody challb: ChallengeBody
-    :param .JWK account_key: Authorized Account Key
+    :param account_key: Authorized Account Key (`.JWK`), or its
+        `acme.jws.SigningContext`
     :param str domain: Domain of the challb
 
     :returns: Appropriate AnnotatedChallenge
@@ -186,35 +186,17 @@ def _init_le_client(args, config, authenticator, installer):
 def _find_duplicative_certs(config, domains):
     """Find existing certs that duplicate the request."""
 
-    identical_names_cert, subset_names_cert = None, None
-
     cli_config = configuration.RenewerConfiguration(config)
     configs_dir = cli_config.renewal_configs_dir
     # Verify the directory is there
     le_util.make_or_verify_dir(configs_dir, mode=0o755, uid=os.geteuid())
 
-    for renewal_file in os.listdir(configs_dir):
-        try:
-            full_path = os.path.join(configs_dir, renewal_file)
-            candidate_lineage = storage.RenewableCert(full_path, cli_config)
-        except (errors.CertStorageError, IOError):
-            logger.warning("Renewal configuration file %s is broken. "
-                           "Skipping.", full_path)
-            continue
-        # TODO: Handle these differently depending on whether they are
-        #       expired or still valid?
-        candidate_names = set(candidate_lineage.names())
-        if candidate_names == set(domains):
-            identical_names_cert = candidate_lineage
-        elif candidate_names.issubset(set(domains)):
-            # This logic finds and returns the largest subset-names cert
-            # in the case where there are several available.
-            if subset_names_cert is None:
-                subset_names_cert = candidate_lineage
-            elif len(candidate_names) > len(subset_names_cert.names()):
-                subset_names_cert = candidate_lineage
-
-    return identical_names_cert, subset_names_cert
+    # TODO: Handle these differently depending on whether they are
+    #       expired or still valid?
+    return tuple(
+        None if name is None else storage.RenewableCert(
+            os.path.join(configs_dir, name + ".conf"), cli_config)
+        for name in storage.lineage_index(cli_config).find(domains))
 
 
 def _treat_as_renewal(config, domains):
@@ -1027,6 +1009,26 @@ def prepare_and_parse_args(plugins, args):
     helpful.add(
         "security", "--rsa-key-size", type=int, metavar="N",
         default=flag_default("rsa_key_size"), help=config_help("rsa_key_size"))
+    helpful.add(
+        "security", "--key-type", choices=("rsa", "ecdsa"),
+        default=flag_default("key_type"), help=config_help("key_type"))
+    helpful.add(
+        "security", "--elliptic-curve", metavar="CURVE",
+        choices=sorted(crypto_util.ELLIPTIC_CURVES),
+        default=flag_default("elliptic_curve"),
+        help=config_help("elliptic_curve"))
+    helpful.add(
+        "security", "--key-pool-high", type=int, metavar="N",
+        default=flag_default("key_pool_high"),
+        help=config_help("key_pool_high"))
+    helpful.add(
+        "security", "--key-pool-low", type=int, metavar="N",
+        default=flag_default("key_pool_low"),
+        help=config_help("key_pool_low"))
+    helpful.add(
+        "security", "--account-key-type", choices=("rsa", "ecdsa"),
+        default=flag_default("account_key_type"),
+        help=config_help("account_key_type"))
     helpful.add(
         "security", "--redirect", action="store_true",
         help="Automatically redirect all HTTP traffic to HTTPS for the newly "
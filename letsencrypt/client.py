@@ -1,12 +1,15 @@
 """Let's Encrypt client API."""
 import logging
 import os
+import threading
 
 from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.asymmetric import rsa
 import OpenSSL
 import zope.component
 
+from acme import cache as acme_cache
 from acme import client as acme_client
 from acme import jose
 from acme import messages
@@ -22,6 +25,7 @@ from letsencrypt import crypto_util
 from letsencrypt import errors
 from letsencrypt import error_handler
 from letsencrypt import interfaces
+from letsencrypt import keypool
 from letsencrypt import le_util
 from letsencrypt import reverter
 from letsencrypt import storage
@@ -32,13 +36,84 @@ from letsencrypt.display import enhancements
 
 logger = logging.getLogger(__name__)
 
+_ACME_CACHES = {}
+"""Process-wide ACME resource caches, keyed by `.IConfig.cache_dir`."""
+_ACME_CACHES_LOCK = threading.Lock()
+"""Lock guarding `_ACME_CACHES` (clients are created in parallel renewer
+threads)."""
+
+
+_EC_ALGS = {
+    "P-256": jose.ES256,
+    "P-384": jose.ES384,
+    "P-521": jose.ES512,
+}
+"""JWS algorithms used for EC account keys, keyed by JWK ``crv``."""
+
 
 def acme_from_config_key(config, key):
     "Wrangle ACME client construction"
-    # TODO: Allow for other alg types besides RS256
-    net = acme_client.ClientNetwork(key, verify_ssl=(not config.no_verify_ssl),
-                                    user_agent=_determine_user_agent(config))
-    return acme_client.Client(config.server, key=key, net=net)
+    net = acme_client.ClientNetwork(key, alg=_account_key_alg(key),
+                                    verify_ssl=(not config.no_verify_ssl),
+                                    user_agent=_determine_user_agent(config),
+                                    session=acme_client.shared_session())
+    return acme_client.Client(config.server, key=key, net=net,
+                              cache=_acme_cache(config))
+
+
+def _account_key_alg(key):
+    """JWS signature algorithm for the account key.
+
+    :param .JWK key: Account key.
+
+    :rtype: `acme.jose.JWASignature`
+
+    """
+    if isinstance(key, jose.JWKEC):
+        return _EC_ALGS[key.crv]
+    return jose.RS256
+
+
+def _generate_account_key(config):
+    """Generate a fresh account key of `.IConfig.account_key_type`.
+
+    :rtype: `acme.jose.JWK`
+
+    """
+    if config.account_key_type == "ecdsa":
+        return jose.JWKEC(key=jose.ComparableECKey(
+            ec.generate_private_key(ec.SECP256R1(), default_backend())))
+    return jose.JWKRSA(key=jose.ComparableRSAKey(
+        rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=config.rsa_key_size,
+            backend=default_backend())))
+
+
+def _acme_cache(config):
+    """Get ACME resource cache for the config.
+
+    The cache is shared by all clients created in this process for
+    the same `.IConfig.cache_dir`, so that e.g. the Directory is not
+    downloaded again for every renewed lineage. If the cache directory
+    cannot be used, resources are cached in memory only.
+
+    :rtype: `acme.cache.ResourceCache`
+
+    """
+    cache_dir = config.cache_dir
+    with _ACME_CACHES_LOCK:
+        if cache_dir not in _ACME_CACHES:
+            try:
+                le_util.make_or_verify_dir(cache_dir, 0o700, os.geteuid(),
+                                           config.strict_permissions)
+            except (OSError, errors.Error) as error:
+                logger.debug("Not persisting ACME resources in %s: %s",
+                             cache_dir, error)
+                _ACME_CACHES[cache_dir] = acme_cache.ResourceCache()
+            else:
+                _ACME_CACHES[cache_dir] = acme_cache.ResourceCache(cache_dir)
+        return _ACME_CACHES[cache_dir]
 
 
 def _determine_user_agent(config):
@@ -108,11 +183,7 @@ def register(config, account_storage, tos_cb=None):
         logger.warn("Registering without email!")
 
     # Each new registration shall use a fresh new key
-    key = jose.JWKRSA(key=jose.ComparableRSAKey(
-        rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=config.rsa_key_size,
-            backend=default_backend())))
+    key = _generate_account_key(config)
     acme = acme_from_config_key(config, key)
     # TODO: add phone?
     regr = perform_registration(acme, config)
@@ -260,8 +331,12 @@ class Client(object):
         """
         # Create CSR from names
         key = crypto_util.init_save_key(
-            self.config.rsa_key_size, self.config.key_dir)
-        csr = crypto_util.init_save_csr(key, domains, self.config.csr_dir)
+            self.config.rsa_key_size, self.config.key_dir,
+            key_type=self.config.key_type,
+            elliptic_curve=self.config.elliptic_curve,
+            pool=keypool.from_config(self.config), config=self.config)
+        csr = crypto_util.init_save_csr(
+            key, domains, self.config.csr_dir, config=self.config)
 
         return self._obtain_certificate(domains, csr) + (key, csr)
 
@@ -20,9 +20,11 @@ class NamespaceConfig(object):
     paths defined in :py:mod:`letsencrypt.constants`:
 
       - `accounts_dir`
+      - `cache_dir`
       - `csr_dir`
       - `in_progress_dir`
       - `key_dir`
+      - `key_pool_dir`
       - `renewer_config_file`
       - `temp_checkpoint_dir`
 
@@ -61,6 +63,11 @@ class NamespaceConfig(object):
     def backup_dir(self):  # pylint: disable=missing-docstring
         return os.path.join(self.namespace.work_dir, constants.BACKUP_DIR)
 
+    @property
+    def cache_dir(self):  # pylint: disable=missing-docstring
+        return os.path.join(
+            self.namespace.work_dir, constants.CACHE_DIR, self.server_path)
+
     @property
     def csr_dir(self):  # pylint: disable=missing-docstring
         return os.path.join(self.namespace.config_dir, constants.CSR_DIR)
@@ -73,6 +80,10 @@ class NamespaceConfig(object):
     def key_dir(self):  # pylint: disable=missing-docstring
         return os.path.join(self.namespace.config_dir, constants.KEY_DIR)
 
+    @property
+    def key_pool_dir(self):  # pylint: disable=missing-docstring
+        return os.path.join(self.namespace.config_dir, constants.KEY_POOL_DIR)
+
     @property
     def temp_checkpoint_dir(self):  # pylint: disable=missing-docstring
         return os.path.join(
@@ -96,6 +107,10 @@ class RenewerConfiguration(object):
     def live_dir(self):  # pylint: disable=missing-docstring
         return os.path.join(self.namespace.config_dir, constants.LIVE_DIR)
 
+    @property
+    def lock_dir(self):  # pylint: disable=missing-docstring
+        return os.path.join(self.namespace.work_dir, constants.LOCK_DIR)
+
     @property
     def renewal_configs_dir(self):  # pylint: disable=missing-docstring
         return os.path.join(
@@ -106,6 +121,16 @@ class RenewerConfiguration(object):
         return os.path.join(
             self.namespace.config_dir, constants.RENEWER_CONFIG_FILENAME)
 
+    @property
+    def lineage_index_file(self):  # pylint: disable=missing-docstring
+        return os.path.join(
+            self.namespace.config_dir, constants.LINEAGE_INDEX_FILENAME)
+
+    @property
+    def renewal_schedule_file(self):  # pylint: disable=missing-docstring
+        return os.path.join(
+            self.namespace.config_dir, constants.RENEWAL_SCHEDULE_FILENAME)
+
 
 def check_config_sanity(config):
     """Validate command line options and display error message if
@@ -18,6 +18,11 @@ CLI_DEFAULTS = dict(
     verbose_count=-(logging.WARNING / 10),
     server="https://acme-v01.api.letsencrypt.org/directory",
     rsa_key_size=2048,
+    account_key_type="rsa",
+    key_type="rsa",
+    elliptic_curve="secp256r1",
+    key_pool_high=0,
+    key_pool_low=2,
     rollback_checkpoints=1,
     config_dir="/etc/letsencrypt",
     work_dir="/var/lib/letsencrypt",
@@ -62,6 +67,10 @@ List of expected options parameters:
 ARCHIVE_DIR = "archive"
 """Archive directory, relative to `IConfig.config_dir`."""
 
+CACHE_DIR = "acme_cache"
+"""Directory (relative to `IConfig.work_dir`) where ACME resources
+(Directory, issuer certificates, registrations) are cached."""
+
 CONFIG_DIRS_MODE = 0o755
 """Directory mode for ``.IConfig.config_dir`` et al."""
 
@@ -81,9 +90,17 @@ IN_PROGRESS_DIR = "IN_PROGRESS"
 KEY_DIR = "keys"
 """Directory (relative to `IConfig.config_dir`) where keys are saved."""
 
+KEY_POOL_DIR = "key-pool"
+"""Directory (relative to `IConfig.config_dir`) where pre-generated keys
+are kept."""
+
 LIVE_DIR = "live"
 """Live directory, relative to `IConfig.config_dir`."""
 
+LOCK_DIR = "locks"
+"""Directory (relative to `IConfig.work_dir`) where the renewer keeps
+lineage lock files."""
+
 TEMP_CHECKPOINT_DIR = "temp_checkpoint"
 """Temporary checkpoint directory (relative to `IConfig.work_dir`)."""
 
@@ -92,3 +109,9 @@ RENEWAL_CONFIGS_DIR = "renewal"
 
 RENEWER_CONFIG_FILENAME = "renewer.conf"
 """Renewer config file name (relative to `IConfig.config_dir`)."""
+
+LINEAGE_INDEX_FILENAME = "lineage-index.json"
+"""Lineage index file name (relative to `IConfig.config_dir`)."""
+
+RENEWAL_SCHEDULE_FILENAME = "renewal-schedule.json"
+"""Renewal schedule file name (relative to `IConfig.config_dir`)."""
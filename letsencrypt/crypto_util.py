@@ -4,11 +4,20 @@
     is capable of handling the signatures.
 
 """
+import collections
+import hashlib
 import logging
 import os
 
+from cryptography import exceptions as crypto_exceptions
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 import OpenSSL
 import pyrfc3339
+import pytz
 import zope.component
 
 from acme import crypto_util as acme_crypto_util
@@ -21,12 +30,22 @@ from letsencrypt import le_util
 
 logger = logging.getLogger(__name__)
 
+ELLIPTIC_CURVES = {
+    "secp256r1": ec.SECP256R1,
+    "secp384r1": ec.SECP384R1,
+    "secp521r1": ec.SECP521R1,
+}
+"""Elliptic curves supported for ECDSA certificate keys, by name."""
+
 
 # High level functions
-def init_save_key(key_size, key_dir, keyname="key-letsencrypt.pem"):
+def init_save_key(key_size, key_dir, keyname="key-letsencrypt.pem",
+                  key_type="rsa", elliptic_curve="secp256r1", pool=None,
+                  config=None):
     """Initializes and saves a privkey.
 
-    Inits key and saves it in PEM format on the filesystem.
+    Inits key (or takes a pre-generated one from the `pool`) and saves
+    it in PEM format on the filesystem.
 
     .. note:: keyname is the attempted filename, it may be different if a file
         already exists at the path.
@@ -34,6 +53,14 @@ def init_save_key(key_size, key_dir, keyname="key-letsencrypt.pem"):
     :param int key_size: RSA key size in bits
     :param str key_dir: Key save directory.
     :param str keyname: Filename of key
+    :param str key_type: ``"rsa"`` or ``"ecdsa"``.
+    :param str elliptic_curve: Curve name (one of `ELLIPTIC_CURVES`),
+        used if `key_type` is ``"ecdsa"``.
+    :param pool: Pool of pre-generated keys, if any. The key is
+        generated inline if the pool is empty.
+    :type pool: :class:`letsencrypt.keypool.KeyPool`
+    :param .IConfig config: Configuration, defaults to the registered
+        `.IConfig` utility.
 
     :returns: Key
     :rtype: :class:`letsencrypt.le_util.Key`
@@ -41,13 +68,20 @@ def init_save_key(key_size, key_dir, keyname="key-letsencrypt.pem"):
     :raises ValueError: If unable to generate the key given key_size.
 
     """
-    try:
-        key_pem = make_key(key_size)
-    except ValueError as err:
-        logger.exception(err)
-        raise err
-
-    config = zope.component.getUtility(interfaces.IConfig)
+    key_pem = None
+    if pool is not None:
+        key_pem = pool.take(key_type, key_size, elliptic_curve)
+    if key_pem is None:
+        try:
+            key_pem = make_key(key_size, key_type, elliptic_curve)
+        except ValueError as err:
+            logger.exception(err)
+            raise err
+    else:
+        logger.debug("Using pre-generated key from %s", pool.path)
+
+    if config is None:
+        config = zope.component.getUtility(interfaces.IConfig)
     # Save file
     le_util.make_or_verify_dir(key_dir, 0o700, os.geteuid(),
                                config.strict_permissions)
@@ -56,12 +90,16 @@ def init_save_key(key_size, key_dir, keyname="key-letsencrypt.pem"):
     key_f.write(key_pem)
     key_f.close()
 
-    logger.info("Generating key (%d bits): %s", key_size, key_path)
+    if key_type == "ecdsa":
+        logger.info("Generating key (%s): %s", elliptic_curve, key_path)
+    else:
+        logger.info("Generating key (%d bits): %s", key_size, key_path)
 
     return le_util.Key(key_path, key_pem)
 
 
-def init_save_csr(privkey, names, path, csrname="csr-letsencrypt.pem"):
+def init_save_csr(privkey, names, path, csrname="csr-letsencrypt.pem",
+                  config=None):
     """Initialize a CSR with the given private key.
 
     :param privkey: Key to include in the CSR
@@ -70,6 +108,8 @@ def init_save_csr(privkey, names, path, csrname="csr-letsencrypt.pem"):
     :param set names: `str` names to include in the CSR
 
     :param str path: Certificate save directory.
+    :param .IConfig config: Configuration, defaults to the registered
+        `.IConfig` utility.
 
     :returns: CSR
     :rtype: :class:`letsencrypt.le_util.CSR`
@@ -77,7 +117,8 @@ def init_save_csr(privkey, names, path, csrname="csr-letsencrypt.pem"):
     """
     csr_pem, csr_der = make_csr(privkey.pem, names)
 
-    config = zope.component.getUtility(interfaces.IConfig)
+    if config is None:
+        config = zope.component.getUtility(interfaces.IConfig)
     # Save CSR
     le_util.make_or_verify_dir(path, 0o755, os.geteuid(),
                                config.strict_permissions)
@@ -95,7 +136,7 @@ def init_save_csr(privkey, names, path, csrname="csr-letsencrypt.pem"):
 def make_csr(key_str, domains):
     """Generate a CSR.
 
-    :param str key_str: PEM-encoded RSA key.
+    :param str key_str: PEM-encoded RSA or EC key.
     :param list domains: Domains included in the certificate.
 
     .. todo:: Detect duplicates in `domains`? Using a set doesn't
@@ -164,21 +205,41 @@ def csr_matches_pubkey(csr, privkey):
         OpenSSL.crypto.FILETYPE_PEM, csr)
     pkey = OpenSSL.crypto.load_privatekey(OpenSSL.crypto.FILETYPE_PEM, privkey)
     try:
+        # verifies RSA as well as ECDSA signatures
         return req.verify(pkey)
     except OpenSSL.crypto.Error as error:
         logger.debug(error, exc_info=True)
         return False
 
 
-def make_key(bits):
-    """Generate PEM encoded RSA key.
+def make_key(bits, key_type="rsa", elliptic_curve="secp256r1"):
+    """Generate PEM encoded RSA or EC key.
 
-    :param int bits: Number of bits, at least 1024.
+    :param int bits: Number of bits, at least 1024 (RSA only).
+    :param str key_type: ``"rsa"`` or ``"ecdsa"``.
+    :param str elliptic_curve: Curve name (one of `ELLIPTIC_CURVES`),
+        used if `key_type` is ``"ecdsa"``.
 
-    :returns: new RSA key in PEM form with specified number of bits
+    :returns: new key in PEM form
     :rtype: str
 
+    :raises ValueError: If `key_type` or `elliptic_curve` is not
+        supported.
+
     """
+    if key_type == "ecdsa":
+        try:
+            curve = ELLIPTIC_CURVES[elliptic_curve]
+        except KeyError:
+            raise ValueError(
+                "Unsupported elliptic curve: {0}".format(elliptic_curve))
+        key = ec.generate_private_key(curve(), default_backend())
+        return key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            encryption_algorithm=serialization.NoEncryption())
+    elif key_type != "rsa":
+        raise ValueError("Unsupported key type: {0}".format(key_type))
     assert bits >= 1024  # XXX
     key = OpenSSL.crypto.PKey()
     key.generate_key(OpenSSL.crypto.TYPE_RSA, bits)
@@ -186,7 +247,7 @@ def make_key(bits):
 
 
 def valid_privkey(privkey):
-    """Is valid RSA private key?
+    """Is valid RSA or EC private key?
 
     :param str privkey: Private key file contents in PEM
 
@@ -195,10 +256,39 @@ def valid_privkey(privkey):
 
     """
     try:
-        return OpenSSL.crypto.load_privatekey(
-            OpenSSL.crypto.FILETYPE_PEM, privkey).check()
+        pkey = OpenSSL.crypto.load_privatekey(
+            OpenSSL.crypto.FILETYPE_PEM, privkey)
+        if pkey.type() == OpenSSL.crypto.TYPE_RSA:
+            return pkey.check()
     except (TypeError, OpenSSL.crypto.Error):
         return False
+    return _valid_ec_privkey(privkey)
+
+
+def _valid_ec_privkey(privkey):
+    """Is valid EC private key?
+
+    `OpenSSL.crypto.PKey.check` supports RSA keys only, so the key is
+    checked by signing and verifying a test message instead.
+
+    """
+    try:
+        key = serialization.load_pem_private_key(
+            privkey, password=None, backend=default_backend())
+    except (TypeError, ValueError, crypto_exceptions.UnsupportedAlgorithm):
+        return False
+    if not isinstance(key, ec.EllipticCurvePrivateKey):
+        return False
+    signer = key.signer(ec.ECDSA(hashes.SHA256()))
+    signer.update(b"letsencrypt")
+    signature = signer.finalize()
+    verifier = key.public_key().verifier(signature, ec.ECDSA(hashes.SHA256()))
+    verifier.update(b"letsencrypt")
+    try:
+        verifier.verify()
+    except crypto_exceptions.InvalidSignature:
+        return False
+    return True
 
 
 def pyopenssl_load_certificate(data):
@@ -322,3 +412,90 @@ def _notAfterBefore(cert_path, method):
                              timestamp[6:8], "T", timestamp[8:10], ":",
                              timestamp[10:12], ":", timestamp[12:]]
     return pyrfc3339.parse("".join(reformatted_timestamp))
+
+
+CertMetadata = collections.namedtuple(
+    "CertMetadata", "sans not_before not_after serial issuer spki_sha256")
+"""Certificate metadata, as returned by `cert_metadata`.
+
+- ``sans``: `list` of DNS Subject Alternative Names
+- ``not_before``, ``not_after``: validity period, as timezone-aware
+  `datetime.datetime` in UTC
+- ``serial``: serial number (`int`)
+- ``issuer``: `tuple` of ``(oid, value)`` pairs of issuer's
+  Distinguished Name, with dotted string OIDs
+- ``spki_sha256``: hex encoded SHA-256 hash of the DER encoded
+  SubjectPublicKeyInfo
+
+"""
+
+
+def cert_metadata(cert, typ=OpenSSL.crypto.FILETYPE_PEM, backend=None):
+    """Get metadata of a certificate.
+
+    Unlike `get_sans_from_cert`, `notBefore` and `notAfter`, the
+    certificate is parsed only once, and the Subject Alternative Name
+    extension is accessed directly instead of scanning text dump of the
+    certificate.
+
+    :param str cert: Certificate (encoded).
+    :param typ: `OpenSSL.crypto.FILETYPE_PEM` or `OpenSSL.crypto.FILETYPE_ASN1`
+    :param backend: `cryptography` backend, defaults to
+        ``default_backend()``.
+
+    :rtype: `CertMetadata`
+
+    :raises ValueError: if certificate cannot be parsed.
+
+    """
+    backend = default_backend() if backend is None else backend
+    if typ == OpenSSL.crypto.FILETYPE_PEM:
+        x509_cert = x509.load_pem_x509_certificate(cert, backend)
+    else:
+        x509_cert = x509.load_der_x509_certificate(cert, backend)
+    try:
+        sans = x509_cert.extensions.get_extension_for_oid(
+            x509.oid.ExtensionOID.SUBJECT_ALTERNATIVE_NAME
+        ).value.get_values_for_type(x509.DNSName)
+    except x509.ExtensionNotFound:
+        sans = []
+    spki = x509_cert.public_key().public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo)
+    return CertMetadata(
+        sans=sans,
+        not_before=pytz.UTC.localize(x509_cert.not_valid_before),
+        not_after=pytz.UTC.localize(x509_cert.not_valid_after),
+        serial=x509_cert.serial_number,
+        issuer=tuple((attribute.oid.dotted_string, attribute.value)
+                     for attribute in x509_cert.issuer),
+        spki_sha256=hashlib.sha256(spki).hexdigest())
+
+
+def inspect_certs(cert_paths):
+    """Get metadata of many certificates.
+
+    All certificates are parsed with the same `cryptography` backend,
+    each of them exactly once.
+
+    :param cert_paths: Paths to certificates in PEM format.
+    :type cert_paths: `collections.Iterable` of `str`
+
+    :returns: Mapping from path to `CertMetadata`. Files that cannot be
+        read or parsed are logged and left out.
+    :rtype: dict
+
+    """
+    backend = default_backend()
+    metadata = {}
+    for cert_path in cert_paths:
+        if cert_path in metadata:
+            continue
+        try:
+            with open(cert_path, "rb") as cert_file:
+                metadata[cert_path] = cert_metadata(
+                    cert_file.read(), backend=backend)
+        except (IOError, ValueError) as error:
+            logger.warning("Could not inspect certificate %s: %s",
+                           cert_path, error)
+    return metadata
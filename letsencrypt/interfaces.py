@@ -198,6 +198,22 @@ class IConfig(zope.interface.Interface):
     email = zope.interface.Attribute(
         "Email used for registration and recovery contact.")
     rsa_key_size = zope.interface.Attribute("Size of the RSA key.")
+    key_type = zope.interface.Attribute(
+        "Type of the certificate private key: \"rsa\" (of --rsa-key-size "
+        "bits) or \"ecdsa\" (on --elliptic-curve).")
+    elliptic_curve = zope.interface.Attribute(
+        "Elliptic curve of ECDSA certificate private keys.")
+    key_pool_high = zope.interface.Attribute(
+        "Number of pre-generated certificate keys to keep ready in the "
+        "key pool, so that issuance does not wait for key generation "
+        "(0 disables the key pool).")
+    key_pool_low = zope.interface.Attribute(
+        "Refill the key pool in the background once it holds fewer "
+        "keys than this.")
+    account_key_type = zope.interface.Attribute(
+        "Type of the key generated for new accounts: \"rsa\" (of "
+        "--rsa-key-size bits, signed with RS256) or \"ecdsa\" (P-256, "
+        "signed with ES256).")
 
     config_dir = zope.interface.Attribute("Configuration directory.")
     work_dir = zope.interface.Attribute("Working directory.")
@@ -205,12 +221,16 @@ class IConfig(zope.interface.Interface):
     accounts_dir = zope.interface.Attribute(
         "Directory where all account information is stored.")
     backup_dir = zope.interface.Attribute("Configuration backups directory.")
+    cache_dir = zope.interface.Attribute(
+        "Directory where ACME resources are cached.")
     csr_dir = zope.interface.Attribute(
         "Directory where newly generated Certificate Signing Requests "
         "(CSRs) are saved.")
     in_progress_dir = zope.interface.Attribute(
         "Directory used before a permanent checkpoint is finalized.")
     key_dir = zope.interface.Attribute("Keys storage.")
+    key_pool_dir = zope.interface.Attribute(
+        "Directory where pre-generated keys are kept.")
     temp_checkpoint_dir = zope.interface.Attribute(
         "Temporary checkpoint directory.")
 
@@ -0,0 +1,260 @@
+"""Pool of pre-generated private keys."""
+import atexit
+import binascii
+import logging
+import os
+import threading
+import time
+
+from letsencrypt import crypto_util
+from letsencrypt import errors
+from letsencrypt import le_util
+
+
+logger = logging.getLogger(__name__)
+
+_POOLS = {}
+"""Process-wide key pools, keyed by `.IConfig.key_pool_dir`, pool
+settings and kind of keys (see `from_config`)."""
+_POOLS_LOCK = threading.Lock()
+"""Lock guarding `_POOLS`."""
+
+
+class KeyPool(object):
+    """Pool of pre-generated private keys.
+
+    Keys are kept in `path`, in a separate subdirectory (see
+    `spec_name`) for each key type and size, one PEM file per key.
+    Keys are consumed atomically (by renaming the file before it is
+    read), so that several processes can share the pool without ever
+    using the same key twice.
+
+    Once a pool holds fewer than `low` keys of a kind, it is refilled up
+    to `high` keys in a background thread. Keys are written atomically,
+    and `stop` waits for the key being generated, so that no broken
+    keys are left behind.
+
+    :ivar str path: Pool directory.
+    :ivar int low: Low water mark.
+    :ivar int high: High water mark.
+    :ivar bool strict_permissions: Require strict permissions of the
+        pool directories (see `.le_util.make_or_verify_dir`).
+
+    """
+    SUFFIX = ".pem"
+    """Suffix of files holding ready keys."""
+
+    STALE = 3600
+    """Age (in seconds) after which partially written or claimed
+    (but not removed) keys are considered abandoned and removed."""
+
+    def __init__(self, path, low, high, strict_permissions=False):
+        self.path = path
+        self.low = low
+        self.high = high
+        self.strict_permissions = strict_permissions
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._spec_dirs = set()
+
+    @classmethod
+    def spec_name(cls, key_type, key_size, elliptic_curve):
+        """Name of the pool subdirectory for keys of the given kind.
+
+        :rtype: str
+
+        """
+        if key_type == "ecdsa":
+            return "ecdsa-{0}".format(elliptic_curve)
+        return "{0}-{1}".format(key_type, key_size)
+
+    def _spec_dir(self, key_type, key_size, elliptic_curve):
+        spec_dir = os.path.join(
+            self.path, self.spec_name(key_type, key_size, elliptic_curve))
+        if spec_dir not in self._spec_dirs:
+            for path in self.path, spec_dir:
+                le_util.make_or_verify_dir(
+                    path, 0o700, os.geteuid(), self.strict_permissions)
+            self._spec_dirs.add(spec_dir)
+        return spec_dir
+
+    @classmethod
+    def _temp_name(cls, prefix):
+        return "{0}{1}".format(prefix, binascii.hexlify(os.urandom(8)))
+
+    def _ready(self, spec_dir):
+        return [name for name in os.listdir(spec_dir)
+                if name.endswith(self.SUFFIX)]
+
+    def count(self, key_type, key_size, elliptic_curve):
+        """Number of ready keys of the given kind.
+
+        :rtype: int
+
+        """
+        return len(self._ready(
+            self._spec_dir(key_type, key_size, elliptic_curve)))
+
+    def take(self, key_type, key_size, elliptic_curve):
+        """Take a key out of the pool.
+
+        Triggers a background refill, if the number of remaining keys
+        drops below `low`.
+
+        :returns: Key in PEM form, or ``None`` if the pool is empty.
+        :rtype: str
+
+        """
+        try:
+            spec_dir = self._spec_dir(key_type, key_size, elliptic_curve)
+            ready = self._ready(spec_dir)
+        except (OSError, errors.Error) as error:
+            logger.debug("Key pool %s cannot be used: %s", self.path, error)
+            return None
+
+        key_pem = None
+        for name in sorted(ready):
+            ready.remove(name)
+            claimed = os.path.join(spec_dir, self._temp_name(".taken-"))
+            try:
+                # only one of the concurrent consumers succeeds
+                os.rename(os.path.join(spec_dir, name), claimed)
+            except OSError:
+                continue
+            try:
+                with open(claimed) as key_file:
+                    key_pem = key_file.read()
+            finally:
+                os.remove(claimed)
+            break
+
+        if len(ready) < self.low:
+            self.refill_async(key_type, key_size, elliptic_curve)
+        return key_pem
+
+    def put(self, key_type, key_size, elliptic_curve, key_pem):
+        """Add a key to the pool."""
+        spec_dir = self._spec_dir(key_type, key_size, elliptic_curve)
+        temp_path = os.path.join(spec_dir, self._temp_name(".new-"))
+        key_f = os.fdopen(os.open(
+            temp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600), "w")
+        with key_f:
+            key_f.write(key_pem)
+        os.rename(temp_path, os.path.join(
+            spec_dir, self._temp_name("") + self.SUFFIX))
+
+    def _remove_stale(self, spec_dir):
+        now = time.time()
+        for name in os.listdir(spec_dir):
+            path = os.path.join(spec_dir, name)
+            if name.startswith(".") and now - os.path.getmtime(
+                    path) > self.STALE:
+                logger.debug("Removing abandoned key pool entry %s", path)
+                os.remove(path)
+
+    def refill(self, key_type, key_size, elliptic_curve):
+        """Generate keys until the pool holds `high` keys of the kind.
+
+        Returns early if the pool is stopped.
+
+        :returns: Number of generated keys.
+        :rtype: int
+
+        """
+        spec_dir = self._spec_dir(key_type, key_size, elliptic_curve)
+        self._remove_stale(spec_dir)
+        generated = 0
+        while not self._stopped.is_set() and (
+                len(self._ready(spec_dir)) < self.high):
+            self.put(key_type, key_size, elliptic_curve, crypto_util.make_key(
+                key_size, key_type, elliptic_curve))
+            generated += 1
+        logger.debug("Generated %d keys for the key pool %s",
+                     generated, spec_dir)
+        return generated
+
+    def _refill_quietly(self, key_type, key_size, elliptic_curve):
+        try:
+            self.refill(key_type, key_size, elliptic_curve)
+        except (OSError, IOError, ValueError, errors.Error) as error:
+            logger.warning("Failed to refill key pool %s: %s",
+                           self.path, error)
+
+    def refill_async(self, key_type, key_size, elliptic_curve):
+        """Refill the pool in a background thread.
+
+        Does nothing if a refill of the kind is already in progress, or
+        if the pool is stopped.
+
+        :returns: Refill thread, or ``None`` if the pool is stopped.
+        :rtype: threading.Thread
+
+        """
+        spec = self.spec_name(key_type, key_size, elliptic_curve)
+        with self._lock:
+            if self._stopped.is_set():
+                return None
+            thread = self._threads.get(spec)
+            if thread is None or not thread.is_alive():
+                thread = self._threads[spec] = threading.Thread(
+                    target=self._refill_quietly,
+                    args=(key_type, key_size, elliptic_curve))
+                # exit is delayed by `stop` only, and only until the
+                # key being generated is written
+                thread.daemon = True
+                thread.start()
+        return thread
+
+    def stop(self):
+        """Stop background refills.
+
+        Waits for the refill threads to write the keys being generated,
+        so that no temporary files are left behind.
+
+        """
+        with self._lock:
+            self._stopped.set()
+            threads = list(self._threads.values())
+        for thread in threads:
+            thread.join()
+
+
+def from_config(config):
+    """Get key pool for the config.
+
+    Pools are shared by all users in this process (e.g. renewal of
+    several lineages) with the same pool directory, water marks,
+    permission checks and kind of keys, so that lineages with different
+    settings do not silently get a pool set up for another one. Keys
+    are generated only once some are taken (see `KeyPool.take`), and
+    refills are stopped at exit.
+
+    :param .IConfig config: Configuration.
+
+    :returns: Key pool or ``None`` if disabled (`.IConfig.key_pool_high`
+        is zero).
+    :rtype: KeyPool
+
+    """
+    if not config.key_pool_high:
+        return None
+    key = (config.key_pool_dir, config.key_pool_low, config.key_pool_high,
+           config.strict_permissions, KeyPool.spec_name(
+               config.key_type, config.rsa_key_size, config.elliptic_curve))
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            pool = _POOLS[key] = KeyPool(
+                config.key_pool_dir, config.key_pool_low,
+                config.key_pool_high, config.strict_permissions)
+            try:
+                count = pool.count(config.key_type, config.rsa_key_size,
+                                   config.elliptic_curve)
+            except (OSError, errors.Error) as error:
+                logger.warning("Key pool %s cannot be used: %s",
+                               config.key_pool_dir, error)
+                _POOLS[key] = None
+            else:
+                logger.debug("Key pool %s holds %d keys", pool.path, count)
+                atexit.register(pool.stop)
+        return _POOLS[key]
@@ -9,6 +9,7 @@ import re
 import stat
 import subprocess
 import sys
+import threading
 
 import configargparse
 
@@ -207,6 +208,33 @@ def safely_remove(path):
             raise
 
 
+def atomic_write(path, data):
+    """Atomically replace the contents of a file.
+
+    Data is written to a temporary file in the same directory, flushed
+    to disk and renamed over `path`, so that readers (and a crash) never
+    see partially written contents.
+
+    :param str path: Path to the file.
+    :param str data: New contents.
+
+    :raises IOError, OSError: If the file cannot be written, in which
+        case `path` is left untouched.
+
+    """
+    temp_path = "{0}.{1}-{2}.tmp".format(
+        path, os.getpid(), threading.current_thread().ident)
+    try:
+        with open(temp_path, "w") as temp_file:
+            temp_file.write(data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.rename(temp_path, path)
+    except (IOError, OSError):
+        safely_remove(temp_path)
+        raise
+
+
 def get_os_info():
     """
     Get Operating System type/distribution and major version
@@ -88,7 +88,6 @@ class ProofOfPossession(object):  # pylint: disable=too-few-public-methods
         if os.path.isfile(key_path):
             with open(key_path, 'rb') as key:
                 try:
-                    # Needs to be changed if JWKES doesn't have a key attribute
                     jwk = achall.alg.kty.load(key.read())
                     sig = other.Signature.from_msg(achall.nonce, jwk.key,
                                                    alg=achall.alg)
@@ -4,15 +4,19 @@ Renewer tool handles autorenewal and autodeployment of renewed certs
 within lineages of successor certificates, according to configuration.
 
 .. todo:: Sanity checking consistency, validity, freshness?
-.. todo:: Call new installer API to restart servers after deployment
 
 """
 from __future__ import print_function
 
 import argparse
+import collections
+import fcntl
 import logging
+import multiprocessing.pool
 import os
 import sys
+import threading
+import time
 
 import OpenSSL
 import zope.component
@@ -27,6 +31,7 @@ from letsencrypt import crypto_util
 from letsencrypt import errors
 from letsencrypt import le_util
 from letsencrypt import notify
+from letsencrypt import schedule
 from letsencrypt import storage
 
 from letsencrypt.display import util as display_util
@@ -73,28 +78,20 @@ def renew(cert, old_version):
         return False
     # Instantiate the appropriate authenticator
     plugins = plugins_disco.PluginsRegistry.find_all()
-    config = configuration.NamespaceConfig(_AttrDict(renewalparams))
-    # XXX: this loses type data (for example, the fact that key_size
-    #      was an int, not a str)
-    config.rsa_key_size = int(config.rsa_key_size)
-    config.tls_sni_01_port = int(config.tls_sni_01_port)
-    config.namespace.http01_port = int(config.namespace.http01_port)
-    zope.component.provideUtility(config)
+    config = _renewal_config(renewalparams)
     try:
         authenticator = plugins[renewalparams["authenticator"]]
     except KeyError:
         # TODO: Notify user? (authenticator could not be found)
         return False
     authenticator = authenticator.init(config)
-
     authenticator.prepare()
     acc = account.AccountFileStorage(config).load(
         account_id=renewalparams["account"])
 
     le_client = client.Client(config, acc, authenticator, None)
-    with open(cert.version("cert", old_version)) as f:
-        sans = crypto_util.get_sans_from_cert(f.read())
-    new_certr, new_chain, new_key, _ = le_client.obtain_certificate(sans)
+    new_certr, new_chain, new_key, _ = le_client.obtain_certificate(
+        cert.names(old_version))
     if new_chain:
         # XXX: Assumes that there was a key change.  We need logic
         #      for figuring out whether there was or not.  Probably
@@ -113,6 +110,201 @@ def renew(cert, old_version):
     #       (where fewer than all names were renewed)
 
 
+def _renewal_config(renewalparams):
+    """Configuration (`.NamespaceConfig`) recorded for a lineage."""
+    config = configuration.NamespaceConfig(_AttrDict(renewalparams))
+    # XXX: this loses type data (for example, the fact that key_size
+    #      was an int, not a str)
+    config.rsa_key_size = int(config.rsa_key_size)
+    config.tls_sni_01_port = int(config.tls_sni_01_port)
+    config.namespace.http01_port = int(config.namespace.http01_port)
+    # options added after the lineage was enrolled
+    for name in ("key_type", "elliptic_curve", "key_pool_high",
+                 "key_pool_low"):
+        config.namespace.setdefault(name, cli.flag_default(name))
+    config.namespace.key_pool_high = int(config.namespace.key_pool_high)
+    config.namespace.key_pool_low = int(config.namespace.key_pool_low)
+    # config is passed explicitly, not registered as the (process-wide)
+    # IConfig utility, as lineages may be renewed in parallel threads
+    return config
+
+
+def restart_installer(cert):
+    """Restart the installer of the lineage, if any.
+
+    Makes the server pick up the certificate deployed by
+    `.RenewableCert.update_all_links_to`.
+
+    :param letsencrypt.storage.RenewableCert cert: The certificate
+        lineage.
+
+    :returns: ``True`` if an installer was restarted.
+    :rtype: bool
+
+    :raises .PluginError: if the server cannot be restarted.
+
+    """
+    renewalparams = (cert.configfile["renewalparams"]
+                     if "renewalparams" in cert.configfile else {})
+    installer = plugins_disco.PluginsRegistry.find_all().get(
+        renewalparams.get("installer"))
+    if installer is None:
+        return False
+    installer = installer.init(_renewal_config(renewalparams))
+    installer.prepare()
+    installer.restart()
+    return True
+
+
+def _lineage_lock(cli_config, lineagename):
+    """Lock a lineage against concurrent renewal or deployment.
+
+    The lock (`fcntl.flock`) is held on a file in the lock directory
+    (``cli_config.lock_dir``, created by `main`) until the returned file
+    object is closed. It is effective between threads as well as between
+    processes, e.g. overlapping renewer runs.
+
+    :returns: Lock file object, or ``None`` if the lineage is already
+        locked.
+
+    """
+    lock_file = open(
+        os.path.join(cli_config.lock_dir, lineagename + ".lock"), "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except IOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def _process_lineage(cli_config, lineagename, cert, deploy_lock):
+    """Autorenew and/or autodeploy a lineage, if needed.
+
+    :param threading.Lock deploy_lock: Lock serializing deployments
+        (and restarts of installers) across lineages.
+
+    :returns: Tuple of the lineage name, the outcome (`list` of `str`)
+        and the processing time in seconds.
+    :rtype: tuple
+
+    """
+    print("Processing " + lineagename + ".conf")
+    start = time.time()
+    outcome = []
+    try:
+        lock_file = _lineage_lock(cli_config, lineagename)
+    except IOError as error:
+        logger.warning("Cannot lock lineage %s: %s", lineagename, error)
+        return lineagename, ["failed"], time.time() - start
+    if lock_file is None:
+        logger.warning("Lineage %s is locked, skipping", lineagename)
+        return lineagename, ["locked"], time.time() - start
+    try:
+        # the lineage lock keeps other processes from changing the
+        # lineage while its metadata is cached
+        with cert.metadata_cache():
+            if cert.should_autorenew():
+                # Note: not cert.current_version() because the basis for
+                # the renewal is the latest version, even if it hasn't been
+                # deployed yet!
+                old_version = cert.latest_common_version()
+                outcome.append("renewed" if renew(cert, old_version)
+                               else "renewal failed")
+                notify.notify("Autorenewed a cert!!!", "root", "It worked!")
+                # TODO: explain what happened
+            if cert.should_autodeploy():
+                with deploy_lock:
+                    cert.update_all_links_to(cert.latest_common_version())
+                    outcome.append("deployed")
+                    try:
+                        restart_installer(cert)
+                    except errors.Error as error:
+                        logger.warning("Cannot restart installer of %s: %s",
+                                       lineagename, error)
+                        outcome.append("restart failed")
+                notify.notify("Autodeployed a cert!!!", "root", "It worked!")
+                # TODO: explain what happened
+    except Exception as error:  # pylint: disable=broad-except
+        logger.exception(error)
+        outcome.append("failed")
+    finally:
+        lock_file.close()
+    return lineagename, outcome, time.time() - start
+
+
+_CONCURRENT_AUTHENTICATORS = frozenset(["webroot"])
+"""Authenticators that can be used concurrently (with different
+accounts). Others bind ports (e.g. ``standalone``), change server
+configuration or interact with the user, and are never used by more than
+one lineage at a time."""
+
+
+def _group_lineages(lineages):
+    """Group lineages by authenticator and account.
+
+    Lineages using an authenticator not in `_CONCURRENT_AUTHENTICATORS`
+    are grouped by the authenticator only.
+
+    :param list lineages: `list` of ``(lineagename, cert)`` tuples.
+
+    :returns: Groups (`list` of lineages), in order of their first
+        lineage.
+    :rtype: list
+
+    """
+    groups = collections.OrderedDict()
+    for lineagename, cert in lineages:
+        renewalparams = (cert.configfile["renewalparams"]
+                         if "renewalparams" in cert.configfile else {})
+        authenticator = renewalparams.get("authenticator")
+        key = (authenticator, renewalparams.get("account")
+               if authenticator in _CONCURRENT_AUTHENTICATORS else None)
+        groups.setdefault(key, []).append((lineagename, cert))
+    return list(groups.itervalues())
+
+
+def _process_groups(cli_config, groups, parallel):
+    """Process groups of lineages using ``parallel`` workers.
+
+    Lineages within a group are processed one after another, so that
+    e.g. an authenticator binding a port is never used concurrently.
+
+    :returns: Results of `_process_lineage`, ordered by groups.
+    :rtype: list
+
+    """
+    deploy_lock = threading.Lock()
+
+    def process_group(group):  # pylint: disable=missing-docstring
+        return [_process_lineage(cli_config, lineagename, cert, deploy_lock)
+                for lineagename, cert in group]
+
+    if parallel > 1 and len(groups) > 1:
+        pool = multiprocessing.pool.ThreadPool(min(parallel, len(groups)))
+        try:
+            results = pool.map(process_group, groups)
+        finally:
+            pool.terminate()
+    else:
+        results = [process_group(group) for group in groups]
+    return [result for group_results in results for result in group_results]
+
+
+def _print_summary(results, seconds):
+    """Print a summary of the renewal run."""
+    counts = collections.Counter(
+        step for _, outcome, _ in results for step in outcome)
+    print("Processed {0} lineages in {1:.1f}s".format(len(results), seconds))
+    for lineagename, outcome, lineage_seconds in results:
+        print("  {0}: {1} ({2:.1f}s)".format(
+            lineagename, ", ".join(outcome) or "nothing to do",
+            lineage_seconds))
+    if counts:
+        print(", ".join("{0}: {1}".format(step, count)
+                        for step, count in sorted(counts.iteritems())))
+
+
 def _cli_log_handler(args, level, fmt):  # pylint: disable=unused-argument
     handler = colored_logging.StreamHandler()
     handler.setFormatter(logging.Formatter(fmt))
@@ -140,6 +332,15 @@ def _create_parser():
         default=cli.flag_default("verbose_count"), help="This flag can be used "
         "multiple times to incrementally increase the verbosity of output, "
         "e.g. -vvv.")
+    parser.add_argument(
+        "--parallel", type=int, default=1, metavar="N", help="Number of "
+        "lineages processed in parallel. Lineages using the same "
+        "authenticator (and, for webroot, the same account) are always "
+        "processed one after another.")
+    parser.add_argument(
+        "--ignore-schedule", action="store_true", help="Check all lineages, "
+        "including those that are not due according to the renewal "
+        "schedule.")
 
     return _paths_parser(parser)
 
@@ -170,21 +371,35 @@ def main(cli_args=sys.argv[1:]):
     # Ensure that all of the needed folders have been created before continuing
     le_util.make_or_verify_dir(cli_config.work_dir,
                                constants.CONFIG_DIRS_MODE, uid)
+    le_util.make_or_verify_dir(cli_config.lock_dir,
+                               constants.CONFIG_DIRS_MODE, uid)
 
-    for renewal_file in os.listdir(cli_config.renewal_configs_dir):
-        print("Processing " + renewal_file)
+    # broken renewal configuration files are already skipped (and
+    # logged) by the index
+    index = storage.lineage_index(cli_config)
+    renewal_schedule = schedule.RenewalSchedule(
+        cli_config.renewal_schedule_file)
+    if args.ignore_schedule:
+        due = sorted(index.lineages)
+    else:
+        due = renewal_schedule.due(index, time.time())
+    logger.debug("%d of %d lineages are due", len(due), len(index.lineages))
+    lineages = []
+    for lineagename in due:
+        # the index records (and revalidates) whether autorenewal and
+        # autodeployment are enabled, so lineages with both disabled
+        # are skipped without parsing their renewal configuration file
+        entry = index.lineages[lineagename]
+        if not (entry["autorenew"] or entry["autodeploy"]):
+            logger.debug("Autorenewal and autodeployment of %s are "
+                         "disabled, skipping", lineagename)
+            renewal_schedule.skip(index, lineagename)
+            continue
+        renewal_file = lineagename + ".conf"
         try:
-            # TODO: Before trying to initialize the RenewableCert object,
-            #       we could check here whether the combination of the config
-            #       and the rc_config together disables all autorenewal and
-            #       autodeployment applicable to this cert.  In that case, we
-            #       can simply continue and don't need to instantiate a
-            #       RenewableCert object for this cert at all, which could
-            #       dramatically improve performance for large deployments
-            #       where autorenewal is widely turned off.
             cert = storage.RenewableCert(
-                            os.path.join(cli_config.renewal_configs_dir, renewal_file),
-                            cli_config)
+                os.path.join(cli_config.renewal_configs_dir, renewal_file),
+                cli_config)
         except errors.CertStorageError:
             # This indicates an invalid renewal configuration file, such
             # as one missing a required parameter (in the future, perhaps
@@ -193,16 +408,18 @@ def main(cli_args=sys.argv[1:]):
             # user about the existence of an invalid or corrupt renewal
             # config rather than simply ignoring it.
             continue
-        if cert.should_autorenew():
-            # Note: not cert.current_version() because the basis for
-            # the renewal is the latest version, even if it hasn't been
-            # deployed yet!
-            old_version = cert.latest_common_version()
-            renew(cert, old_version)
-            notify.notify("Autorenewed a cert!!!", "root", "It worked!")
-            # TODO: explain what happened
-        if cert.should_autodeploy():
-            cert.update_all_links_to(cert.latest_common_version())
-            # TODO: restart web server (invoke IInstaller.restart() method)
-            notify.notify("Autodeployed a cert!!!", "root", "It worked!")
-            # TODO: explain what happened
+        lineages.append((lineagename, cert))
+
+    start = time.time()
+    results = _process_groups(
+        cli_config, _group_lineages(lineages), args.parallel)
+    _print_summary(results, time.time() - start)
+
+    certs = dict(lineages)
+    for lineagename, outcome, _ in results:
+        if "failed" in outcome or "locked" in outcome:
+            renewal_schedule.discard(lineagename)
+        else:
+            renewal_schedule.reschedule(
+                index, lineagename, certs[lineagename], time.time())
+    renewal_schedule.save()
@@ -0,0 +1,203 @@
+"""Persistent renewal schedule."""
+import calendar
+import datetime
+import heapq
+import json
+import logging
+import time
+
+import pytz
+
+from letsencrypt import constants
+from letsencrypt import le_util
+from letsencrypt import storage
+
+
+logger = logging.getLogger(__name__)
+
+
+class RenewalSchedule(object):
+    """Persistent schedule of lineage checks.
+
+    For each lineage, the schedule records the time (``next_check``) at
+    which `.RenewableCert.should_autorenew` or
+    `.RenewableCert.should_autodeploy` first becomes true, computed from
+    the certificate expiry and the ``renew_before_expiry`` and
+    ``deploy_before_expiry`` intervals. Pending checks are kept in a
+    min-heap, so that `due` yields the lineages to be processed without
+    parsing any certificates.
+
+    Entries are invalidated (i.e. the lineage is due) if the stamps of
+    the corresponding `.LineageIndex` entry changed, e.g. because the
+    renewal config file was edited or a new version was saved by another
+    process. The whole schedule is discarded if the renewer defaults
+    changed or the clock went back since the schedule was saved.
+
+    .. note:: Revocation of certificates (`.RenewableCert.ocsp_revoked`)
+       is only checked for lineages that are due.
+
+    :ivar str path: Path to the schedule file.
+    :ivar dict entries: Mapping from lineage name to entry, a `dict`
+        with ``next_check`` (POSIX timestamp, or ``None`` if neither
+        autorenewal nor autodeployment will be needed) and ``stamps``
+        (stamps of the lineage index entry it was computed from).
+
+    """
+    VERSION = 1
+    """Version of the schedule file format."""
+
+    MIN_RECHECK = 3600
+    """Delay (in seconds) before a lineage that still needs renewal or
+    deployment after processing (e.g. because renewal failed) is due
+    again."""
+
+    CLOCK_SKEW = 300
+    """Tolerated backward clock adjustment (in seconds) since the
+    schedule was saved."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._heap = []
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as schedule_file:
+                data = json.load(schedule_file)
+            if data["version"] != self.VERSION:
+                raise ValueError("unsupported version")
+            saved_at, defaults = data["saved_at"], data["defaults"]
+            entries = data["entries"]
+        except (IOError, ValueError, KeyError, TypeError) as error:
+            logger.debug("Renewal schedule %s cannot be used, all lineages "
+                         "are due: %s", self.path, error)
+            return
+        if defaults != constants.RENEWER_DEFAULTS:
+            logger.info("Renewer defaults changed, all lineages are due")
+        elif time.time() < saved_at - self.CLOCK_SKEW:
+            logger.warning("Clock went back since the renewal schedule was "
+                           "saved, all lineages are due")
+        else:
+            self.entries = entries
+            self._heap = [(entry["next_check"], name)
+                          for name, entry in entries.iteritems()
+                          if entry["next_check"] is not None]
+            heapq.heapify(self._heap)
+
+    def save(self):
+        """Atomically write the schedule to `path`.
+
+        Failures are only logged: lineages missing from the schedule are
+        simply due.
+
+        """
+        try:
+            le_util.atomic_write(self.path, json.dumps({
+                "version": self.VERSION,
+                "saved_at": time.time(),
+                "defaults": constants.RENEWER_DEFAULTS,
+                "entries": self.entries,
+            }))
+        except (IOError, OSError) as error:
+            logger.warning("Failed to save renewal schedule %s: %s",
+                           self.path, error)
+
+    def due(self, index, now):
+        """Lineages that need to be checked.
+
+        :param .LineageIndex index: Up to date lineage index.
+        :param float now: Current POSIX timestamp.
+
+        :returns: Names of lineages that are not scheduled, whose entry
+            is invalid, or whose ``next_check`` has been reached.
+        :rtype: `list` of `str`
+
+        """
+        for name in set(self.entries).difference(index.lineages):
+            del self.entries[name]
+        due = set(name for name, entry in index.lineages.iteritems()
+                  if name not in self.entries or
+                  self.entries[name]["stamps"] != entry["stamps"])
+        while self._heap and self._heap[0][0] <= now:
+            next_check, name = heapq.heappop(self._heap)
+            # skip outdated heap items of rescheduled or removed lineages
+            if name in self.entries and (
+                    self.entries[name]["next_check"] == next_check):
+                due.add(name)
+        return sorted(due)
+
+    def discard(self, name):
+        """Remove a lineage from the schedule, making it due."""
+        self.entries.pop(name, None)
+
+    def skip(self, index, name):
+        """Do not check a lineage until its index entry changes.
+
+        :param .LineageIndex index: Up to date lineage index.
+        :param str name: Lineage name.
+
+        """
+        self.entries[name] = {"next_check": None,
+                              "stamps": index.lineages[name]["stamps"]}
+
+    @classmethod
+    def _timestamp(cls, when):
+        return calendar.timegm(when.utctimetuple())
+
+    @classmethod
+    def _before(cls, expiry, interval):
+        """POSIX timestamp of ``interval`` before ``expiry``."""
+        expiry_dt = datetime.datetime.fromtimestamp(expiry, pytz.UTC)
+        return expiry - (cls._timestamp(
+            storage.add_time_interval(expiry_dt, interval)) - expiry)
+
+    def _next_check(self, entry, cert):
+        checks = []
+        if cert.autorenewal_is_enabled():
+            latest_version = cert.latest_common_version()
+            if latest_version == entry["current_version"]:
+                expiry = entry["not_after"]
+            else:
+                expiry = self._timestamp(cert.not_after(latest_version))
+            checks.append(self._before(expiry, cert.configuration.get(
+                "renew_before_expiry", "10 days")))
+        if cert.autodeployment_is_enabled() and cert.has_pending_deployment():
+            checks.append(self._before(
+                entry["not_after"],
+                cert.configuration.get("deploy_before_expiry", "5 days")))
+        return min(checks) if checks else None
+
+    def reschedule(self, index, name, cert, now):
+        """Compute the next check of a processed lineage.
+
+        If the next check cannot be computed, the lineage is discarded
+        and thus stays due.
+
+        :param .LineageIndex index: Up to date lineage index.
+        :param str name: Lineage name.
+        :param .RenewableCert cert: Lineage.
+        :param float now: Current POSIX timestamp.
+
+        :returns: POSIX timestamp of the next check, or ``None``.
+        :rtype: float
+
+        """
+        entry = index.lineages.get(name)
+        if entry is None:
+            self.discard(name)
+            return None
+        try:
+            with cert.metadata_cache():
+                next_check = self._next_check(entry, cert)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning("Cannot schedule lineage %s: %s", name, error)
+            self.discard(name)
+            return None
+        if next_check is not None:
+            if next_check <= now:
+                next_check = now + self.MIN_RECHECK
+            heapq.heappush(self._heap, (next_check, name))
+        self.entries[name] = {"next_check": next_check,
+                              "stamps": entry["stamps"]}
+        return next_check
@@ -1,8 +1,13 @@
 """Renewable certificates storage."""
+import calendar
+import collections
+import contextlib
 import datetime
+import json
 import logging
 import os
 import re
+import threading
 
 import configobj
 import parsedatetime
@@ -84,6 +89,11 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         options associated with this lineage, obtained from parsing the
         renewal configuration file and/or systemwide defaults.
 
+    Within `metadata_cache`, link targets, available versions and
+    parsed certificates are memoized, so that a sequence of queries
+    (e.g. `should_autorenew` followed by `should_autodeploy`) reads
+    each of them from disk only once.
+
     """
     def __init__(self, config_filename, cli_config):
         """Instantiate a RenewableCert object from an existing lineage.
@@ -127,8 +137,40 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         self.chain = self.configuration["chain"]
         self.fullchain = self.configuration["fullchain"]
 
+        self._cache = None
         self._fix_symlinks()
 
+    @contextlib.contextmanager
+    def metadata_cache(self):
+        """Memoize metadata of this lineage read from disk.
+
+        The cache is emptied whenever this object changes the lineage
+        (`update_all_links_to`, `save_successor`), but changes made by
+        other processes or objects are not noticed, so the cache should
+        only be used for a sequence of related queries. Nested uses share
+        the cache of the outermost one.
+
+        """
+        if self._cache is not None:
+            yield
+            return
+        self._cache = {}
+        try:
+            yield
+        finally:
+            self._cache = None
+
+    def _cached(self, key, compute):
+        if self._cache is None:
+            return compute()
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _invalidate_cache(self):
+        if self._cache is not None:
+            self._cache.clear()
+
     def _consistent(self):
         """Are the files associated with this lineage self-consistent?
 
@@ -251,6 +293,7 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         for _, link in previous_symlinks:
             if os.path.exists(link):
                 os.unlink(link)
+        self._invalidate_cache()
 
     def current_target(self, kind):
         """Returns full path to which the specified item currently points.
@@ -265,6 +308,9 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         """
         if kind not in ALL_FOUR:
             raise errors.CertStorageError("unknown kind of item")
+        return self._cached(("target", kind), lambda: self._read_link(kind))
+
+    def _read_link(self, kind):
         link = getattr(self, kind)
         if not os.path.exists(link):
             logger.debug("Expected symlink %s for %s does not exist.",
@@ -290,6 +336,10 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         """
         if kind not in ALL_FOUR:
             raise errors.CertStorageError("unknown kind of item")
+        return self._cached(("current_version", kind),
+                            lambda: self._current_version(kind))
+
+    def _current_version(self, kind):
         pattern = re.compile(r"^{0}([0-9]+)\.pem$".format(kind))
         target = self.current_target(kind)
         if target is None or not os.path.exists(target):
@@ -338,6 +388,10 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         """
         if kind not in ALL_FOUR:
             raise errors.CertStorageError("unknown kind of item")
+        return list(self._cached(("versions", kind),
+                                 lambda: self._available_versions(kind)))
+
+    def _available_versions(self, kind):
         where = os.path.dirname(self.current_target(kind))
         files = os.listdir(where)
         pattern = re.compile(r"^{0}([0-9]+)\.pem$".format(kind))
@@ -368,7 +422,8 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         #       (it should probably return None instead)
         # TODO: this can raise a spurious AttributeError if the current
         #       link for any kind is missing (it should probably return None)
-        versions = [self.available_versions(x) for x in ALL_FOUR]
+        with self.metadata_cache():
+            versions = [self.available_versions(x) for x in ALL_FOUR]
         return max(n for n in versions[0] if all(n in v for v in versions[1:]))
 
     def next_free_version(self):
@@ -383,7 +438,9 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         # This isn't self.latest_common_version() + 1 because we don't want
         # collide with a version that might exist for one file type but not
         # for the others.
-        return max(self.newest_available_version(x) for x in ALL_FOUR) + 1
+        with self.metadata_cache():
+            return max(
+                self.newest_available_version(x) for x in ALL_FOUR) + 1
 
     def has_pending_deployment(self):
         """Is there a later version of all of the managed items?
@@ -396,8 +453,9 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         """
         # TODO: consider whether to assume consistency or treat
         #       inconsistent/consistent versions differently
-        smallest_current = min(self.current_version(x) for x in ALL_FOUR)
-        return smallest_current < self.latest_common_version()
+        with self.metadata_cache():
+            smallest_current = min(self.current_version(x) for x in ALL_FOUR)
+            return smallest_current < self.latest_common_version()
 
     def _update_link_to(self, kind, version):
         """Make the specified item point at the specified version.
@@ -424,6 +482,7 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         #       for the other corresponding items
         os.unlink(link)
         os.symlink(os.path.join(target_directory, filename), link)
+        self._invalidate_cache()
 
     def update_all_links_to(self, version):
         """Change all member objects to point to the specified version.
@@ -441,6 +500,17 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
 
             for _, link in previous_links:
                 os.unlink(link)
+        self._update_index()
+
+    def _update_index(self):
+        """Update the lineage index, if loaded in this process.
+
+        Otherwise, the change is picked up by `LineageIndex.refresh`.
+
+        """
+        index = _INDEXES.get(self.cli_config.lineage_index_file)
+        if index is not None:
+            index.update(self)
 
     def names(self, version=None):
         """What are the subject names of this certificate?
@@ -453,14 +523,38 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         :raises .CertStorageError: if could not find cert file.
 
         """
+        return list(self._metadata(self._cert_target(version)).sans)
+
+    def not_after(self, version=None):
+        """When does this certificate expire?
+
+        (If no version is specified, use the current version.)
+
+        :param int version: the desired version number
+        :returns: the notAfter value of the certificate
+        :rtype: :class:`datetime.datetime`
+        :raises .CertStorageError: if could not find cert file.
+
+        """
+        return self._metadata(self._cert_target(version)).not_after
+
+    def _cert_target(self, version):
         if version is None:
             target = self.current_target("cert")
         else:
             target = self.version("cert", version)
         if target is None:
             raise errors.CertStorageError("could not find cert file")
-        with open(target) as f:
-            return crypto_util.get_sans_from_cert(f.read())
+        return target
+
+    def _metadata(self, target):
+        return self._cached(("metadata", target),
+                            lambda: self._read_metadata(target))
+
+    @classmethod
+    def _read_metadata(cls, target):
+        with open(target, "rb") as f:
+            return crypto_util.cert_metadata(f.read())
 
     def autodeployment_is_enabled(self):
         """Is automatic deployment enabled for this cert?
@@ -493,13 +587,14 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
 
         """
         if interactive or self.autodeployment_is_enabled():
-            if self.has_pending_deployment():
-                interval = self.configuration.get("deploy_before_expiry",
-                                                  "5 days")
-                expiry = crypto_util.notAfter(self.current_target("cert"))
-                now = pytz.UTC.fromutc(datetime.datetime.utcnow())
-                if expiry < add_time_interval(now, interval):
-                    return True
+            with self.metadata_cache():
+                if self.has_pending_deployment():
+                    interval = self.configuration.get("deploy_before_expiry",
+                                                      "5 days")
+                    expiry = self.not_after()
+                    now = pytz.UTC.fromutc(datetime.datetime.utcnow())
+                    if expiry < add_time_interval(now, interval):
+                        return True
         return False
 
     def ocsp_revoked(self, version=None):
@@ -558,16 +653,16 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         """
         if interactive or self.autorenewal_is_enabled():
             # Consider whether to attempt to autorenew this cert now
+            with self.metadata_cache():
+                latest_version = self.latest_common_version()
+                # Renewals on the basis of revocation
+                if self.ocsp_revoked(latest_version):
+                    logger.debug("Should renew, certificate is revoked.")
+                    return True
 
-            # Renewals on the basis of revocation
-            if self.ocsp_revoked(self.latest_common_version()):
-                logger.debug("Should renew, certificate is revoked.")
-                return True
-
-            # Renewals on the basis of expiry time
+                # Renewals on the basis of expiry time
+                expiry = self.not_after(latest_version)
             interval = self.configuration.get("renew_before_expiry", "10 days")
-            expiry = crypto_util.notAfter(self.version(
-                "cert", self.latest_common_version()))
             now = pytz.UTC.fromutc(datetime.datetime.utcnow())
             if expiry < add_time_interval(now, interval):
                 logger.debug("Should renew, less than %s before certificate "
@@ -685,7 +780,9 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         #       parameters
         logger.debug("Writing new config %s.", config_filename)
         new_config.write()
-        return cls(new_config.filename, cli_config)
+        lineage = cls(new_config.filename, cli_config)
+        lineage._update_index()  # pylint: disable=protected-access
+        return lineage
 
     def save_successor(self, prior_version, new_cert, new_privkey, new_chain):
         """Save new cert and chain as a successor of a prior version.
@@ -751,4 +848,246 @@ class RenewableCert(object):  # pylint: disable=too-many-instance-attributes
         with open(target["fullchain"], "w") as f:
             logger.debug("Writing full chain to %s.", target["fullchain"])
             f.write(new_cert + new_chain)
+        self._invalidate_cache()
+        self._update_index()
         return target_version
+
+
+_INDEXES = {}
+"""Process-wide lineage indexes, keyed by index file path."""
+
+
+class LineageIndex(object):
+    """Persistent index of certificate lineages.
+
+    Holds metadata of all valid lineages in
+    `.RenewerConfiguration.renewal_configs_dir`, so that they can be
+    enumerated and searched by names without instantiating (and parsing
+    certificates of) a `RenewableCert` for each of them.
+
+    Each entry records modification times and inode numbers ("stamps")
+    of the files it was computed from: the renewal config file, the live
+    ``cert`` symlink, the current certificate and the archive directory.
+    `refresh` recomputes only entries whose stamps changed, so the index
+    heals itself after changes made by other processes or interrupted
+    by a crash. The index file is written atomically, and an index that
+    cannot be read is simply rebuilt.
+
+    :ivar str path: Path to the index file.
+    :ivar dict lineages: Mapping from lineage name to entry, a `dict`
+        with ``sans`` (`list` of `str`), ``not_after`` (POSIX timestamp
+        of the current certificate expiry), ``current_version`` and
+        ``latest_version`` (`int` or ``None``), ``autorenew`` and
+        ``autodeploy`` (`bool`, see `RenewableCert.autorenewal_is_enabled`
+        and `RenewableCert.autodeployment_is_enabled`), ``config`` (path
+        to the renewal config file) and ``stamps`` (`list` of path and
+        stamp pairs).
+
+    """
+    VERSION = 2
+    """Version of the index file format."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lineages = {}
+        self._domains = collections.defaultdict(set)
+        # lineages without any names are a subset of every request
+        self._sanless = set()
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as index_file:
+                data = json.load(index_file)
+            if data["version"] != self.VERSION:
+                raise ValueError("unsupported version")
+            lineages = data["lineages"]
+        except (IOError, ValueError, KeyError, TypeError) as error:
+            logger.debug("Lineage index %s cannot be used, rebuilding: %s",
+                         self.path, error)
+            return
+        for name, entry in lineages.iteritems():
+            self._set(name, entry)
+
+    def _set(self, name, entry):
+        self._discard(name)
+        self.lineages[name] = entry
+        if not entry["sans"]:
+            self._sanless.add(name)
+        for domain in entry["sans"]:
+            self._domains[domain].add(name)
+
+    def _discard(self, name):
+        entry = self.lineages.pop(name, None)
+        if entry is not None:
+            self._sanless.discard(name)
+            for domain in entry["sans"]:
+                self._domains[domain].discard(name)
+                if not self._domains[domain]:
+                    del self._domains[domain]
+        return entry is not None
+
+    @classmethod
+    def _stamp(cls, path):
+        try:
+            stat = os.lstat(path)
+        except OSError:
+            return None
+        # inode catches files replaced by ones with preserved mtime
+        return [stat.st_mtime, stat.st_ino]
+
+    @classmethod
+    def _enabled(cls, is_enabled):
+        try:
+            return is_enabled()
+        except ValueError:  # not a boolean, let the renewer complain
+            return True
+
+    @classmethod
+    def _entry(cls, lineage, metadata):
+        with lineage.metadata_cache():
+            cert = lineage.current_target("cert")
+            current_version = lineage.current_version("cert")
+            try:
+                latest_version = lineage.latest_common_version()
+            except ValueError:  # no complete version
+                latest_version = None
+        return {
+            "sans": metadata.sans,
+            "not_after": calendar.timegm(metadata.not_after.utctimetuple()),
+            "current_version": current_version,
+            "latest_version": latest_version,
+            "autorenew": cls._enabled(lineage.autorenewal_is_enabled),
+            "autodeploy": cls._enabled(lineage.autodeployment_is_enabled),
+            "config": lineage.configfile.filename,
+            "stamps": [[path, cls._stamp(path)] for path in (
+                lineage.configfile.filename, lineage.cert, cert,
+                os.path.dirname(cert))],
+        }
+
+    def save(self):
+        """Atomically write the index to `path`.
+
+        Failures are only logged: an outdated index is revalidated by
+        the next `refresh`.
+
+        """
+        with self._lock:
+            try:
+                le_util.atomic_write(self.path, json.dumps(
+                    {"version": self.VERSION, "lineages": self.lineages}))
+            except (IOError, OSError) as error:
+                logger.warning("Failed to save lineage index %s: %s",
+                               self.path, error)
+
+    def _update(self, lineages):
+        cert_paths = dict((lineage.lineagename, lineage.current_target("cert"))
+                          for lineage in lineages)
+        # parse all current certs in one go, each of them once
+        metadata = crypto_util.inspect_certs(
+            path for path in cert_paths.itervalues() if path is not None)
+        for lineage in lineages:
+            cert_path = cert_paths[lineage.lineagename]
+            if cert_path in metadata:
+                self._set(lineage.lineagename,
+                          self._entry(lineage, metadata[cert_path]))
+            else:
+                self._discard(lineage.lineagename)
+
+    def update(self, lineage):
+        """Update (and save) the entry of a lineage.
+
+        :param RenewableCert lineage: New or updated lineage.
+
+        """
+        with self._lock:
+            self._update([lineage])
+            self.save()
+
+    def refresh(self, cli_config):
+        """Revalidate the index against the renewal config directory.
+
+        Lineages are (re)loaded only if their renewal config file is new
+        or any of the stamps changed. Lineages whose renewal config file
+        is gone, or that are broken, are removed. The index is saved if
+        anything changed.
+
+        :param .RenewerConfiguration cli_config: Configuration.
+
+        """
+        configs_dir = cli_config.renewal_configs_dir
+        with self._lock:
+            changed = False
+            present = set()
+            lineages = []
+            for renewal_file in os.listdir(configs_dir):
+                if not renewal_file.endswith(".conf"):
+                    continue
+                name = renewal_file[:-len(".conf")]
+                present.add(name)
+                entry = self.lineages.get(name)
+                if entry is not None and all(
+                        self._stamp(path) == stamp
+                        for path, stamp in entry["stamps"]):
+                    continue
+                full_path = os.path.join(configs_dir, renewal_file)
+                changed = True
+                try:
+                    lineages.append(RenewableCert(full_path, cli_config))
+                except (errors.CertStorageError, IOError, OSError):
+                    logger.warning("Renewal configuration file %s is broken. "
+                                   "Skipping.", full_path)
+                    self._discard(name)
+            self._update(lineages)
+            for name in set(self.lineages) - present:
+                changed = self._discard(name) or changed
+            if changed:
+                self.save()
+
+    def find(self, domains):
+        """Find lineages with the same names or a subset of names.
+
+        :param domains: Domain names.
+        :type domains: `list` of `str`
+
+        :returns: Tuple of the name of the lineage whose certificate is
+            valid for exactly ``domains`` and the name of the lineage
+            whose certificate is valid for the largest proper subset of
+            ``domains``, either of them ``None`` if not found.
+        :rtype: tuple
+
+        """
+        domains = set(domains)
+        identical, subset, subset_len = None, None, 0
+        with self._lock:
+            candidates = set(self._sanless)
+            for domain in domains:
+                candidates.update(self._domains.get(domain, ()))
+            for name in sorted(candidates):
+                names = set(self.lineages[name]["sans"])
+                if names == domains:
+                    identical = name
+                elif names.issubset(domains) and (
+                        subset is None or len(names) > subset_len):
+                    subset, subset_len = name, len(names)
+        return identical, subset
+
+
+def lineage_index(cli_config):
+    """Get the up to date lineage index.
+
+    Indexes are shared by all users in this process, and kept up to
+    date by `RenewableCert` on changes to lineages.
+
+    :param .RenewerConfiguration cli_config: Configuration.
+
+    :rtype: LineageIndex
+
+    """
+    path = cli_config.lineage_index_file
+    if path not in _INDEXES:
+        _INDEXES[path] = LineageIndex(path)
+    index = _INDEXES[path]
+    index.refresh(cli_config)
+    return index
@@ -22,9 +22,10 @@ class ChallengeFactoryTest(unittest.TestCase):
     def setUp(self):
         from letsencrypt.auth_handler import AuthHandler
 
-        # Account is mocked...
+        # Account and network are mocked...
+        self.mock_net = mock.MagicMock()
         self.handler = AuthHandler(
-            None, None, None, mock.Mock(key="mock_key"))
+            None, None, self.mock_net, mock.Mock(key="mock_key"))
 
         self.dom = "test"
         self.handler.authzr[self.dom] = acme_util.gen_authzr(
@@ -47,6 +48,12 @@ class ChallengeFactoryTest(unittest.TestCase):
             [achall.chall for achall in cont_c], [acme_util.RECOVERY_CONTACT])
         self.assertEqual([achall.chall for achall in dv_c], [acme_util.TLSSNI01])
 
+    def test_signing_context_account_key(self):
+        dv_c = self.handler._challenge_factory(self.dom, [0, 1])[1]
+        for achall in dv_c:
+            self.assertTrue(
+                achall.account_key is self.mock_net.net.signing_context)
+
     def test_unrecognized(self):
         self.handler.authzr["failure.com"] = acme_util.gen_authzr(
             messages.STATUS_PENDING, "failure.com",
@@ -79,6 +86,7 @@ class GetAuthorizationsTest(unittest.TestCase):
 
         self.mock_account = mock.Mock(key=le_util.Key("file_path", "PEM"))
         self.mock_net = mock.MagicMock(spec=acme_client.Client)
+        self.mock_net.net = mock.MagicMock(spec=acme_client.ClientNetwork)
 
         self.handler = AuthHandler(
             self.mock_dv_auth, self.mock_cont_auth,
@@ -229,14 +237,16 @@ class PollChallengesTest(unittest.TestCase):
         self.assertRaises(
             errors.AuthorizationError, self.handler.verify_authzr_complete)
 
-    def _mock_poll_solve_one_valid(self, authzr):
+    def _mock_poll_solve_one_valid(self, authzr, lazy):
         # Pending here because my dummy script won't change the full status.
         # Basically it didn't raise an error and it stopped earlier than
         # Making all challenges invalid which would make mock_poll_solve_one
         # change authzr to invalid
+        self.assertTrue(lazy)
         return self._mock_poll_solve_one_chall(authzr, messages.STATUS_VALID)
 
-    def _mock_poll_solve_one_invalid(self, authzr):
+    def _mock_poll_solve_one_invalid(self, authzr, lazy):
+        self.assertTrue(lazy)
         return self._mock_poll_solve_one_chall(authzr, messages.STATUS_INVALID)
 
     def _mock_poll_solve_one_chall(self, authzr, desired_status):
@@ -154,7 +154,9 @@ class CLITest(unittest.TestCase):  # pylint: disable=too-many-public-methods
             ua = "bandersnatch"
             args += ["--user-agent", ua]
             self._call_no_clientmock(args)
-            acme_net.assert_called_once_with(mock.ANY, verify_ssl=True, user_agent=ua)
+            acme_net.assert_called_once_with(
+                mock.ANY, alg=mock.ANY, verify_ssl=True, user_agent=ua,
+                session=mock.ANY)
 
     def test_install_abspath(self):
         cert = 'cert'
@@ -472,7 +474,8 @@ class CLITest(unittest.TestCase):  # pylint: disable=too-many-public-methods
                                  '--server', server, 'revoke'])
         with open(KEY) as f:
             mock_acme_client.Client.assert_called_once_with(
-                server, key=jose.JWK.load(f.read()), net=mock.ANY)
+                server, key=jose.JWK.load(f.read()), net=mock.ANY,
+                cache=mock.ANY)
         with open(CERT) as f:
             cert = crypto_util.pyopenssl_load_certificate(f.read())[0]
             mock_revoke = mock_acme_client.Client().revoke
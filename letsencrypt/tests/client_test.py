@@ -2,6 +2,8 @@
 import os
 import shutil
 import tempfile
+import threading
+import time
 import unittest
 
 import OpenSSL
@@ -33,10 +35,16 @@ class RegisterTest(unittest.TestCase):
     """Tests for letsencrypt.client.register."""
 
     def setUp(self):
-        self.config = mock.MagicMock(rsa_key_size=1024, register_unsafely_without_email=False)
+        self.cache_dir = tempfile.mkdtemp()
+        self.config = mock.MagicMock(rsa_key_size=1024, register_unsafely_without_email=False,
+                                     cache_dir=self.cache_dir, strict_permissions=False,
+                                     account_key_type="rsa")
         self.account_storage = account.AccountMemoryStorage()
         self.tos_cb = mock.MagicMock()
 
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
     def _call(self):
         from letsencrypt.client import register
         return register(self.config, self.account_storage, self.tos_cb)
@@ -59,6 +67,24 @@ class RegisterTest(unittest.TestCase):
             with mock.patch("letsencrypt.account.report_new_account"):
                 self._call()
 
+    def test_ecdsa_account_key(self):
+        self.config.account_key_type = "ecdsa"
+        with mock.patch("letsencrypt.client.acme_client.Client"):
+            with mock.patch("letsencrypt.client.acme_client.ClientNetwork") as net:
+                with mock.patch("letsencrypt.account.report_new_account"):
+                    acc, _ = self._call()
+        self.assertTrue(isinstance(acc.key, jose.JWKEC))
+        self.assertEqual("P-256", acc.key.crv)
+        self.assertEqual(jose.ES256, net.call_args[1]["alg"])
+
+    def test_rsa_account_key_alg(self):
+        with mock.patch("letsencrypt.client.acme_client.Client"):
+            with mock.patch("letsencrypt.client.acme_client.ClientNetwork") as net:
+                with mock.patch("letsencrypt.account.report_new_account"):
+                    acc, _ = self._call()
+        self.assertTrue(isinstance(acc.key, jose.JWKRSA))
+        self.assertEqual(jose.RS256, net.call_args[1]["alg"])
+
     @mock.patch("letsencrypt.account.report_new_account")
     @mock.patch("letsencrypt.client.display_ops.get_email")
     def test_email_retry(self, _rep, mock_get_email):
@@ -74,12 +100,53 @@ class RegisterTest(unittest.TestCase):
         self.config.email = None
         self.assertRaises(errors.Error, self._call)
 
+class AcmeCacheTest(unittest.TestCase):
+    """Tests for letsencrypt.client._acme_cache."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = mock.MagicMock(
+            cache_dir=os.path.join(self.tmp_dir, "cache"),
+            strict_permissions=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _call(self):
+        from letsencrypt.client import _acme_cache
+        return _acme_cache(self.config)
+
+    def test_creates_dir(self):
+        self.assertEqual(self.config.cache_dir, self._call().path)
+        self.assertTrue(os.path.isdir(self.config.cache_dir))
+
+    @mock.patch("letsencrypt.client.le_util.make_or_verify_dir")
+    def test_memory_only_on_error(self, mock_make_dir):
+        mock_make_dir.side_effect = errors.Error
+        self.assertTrue(self._call().path is None)
+
+    @mock.patch("letsencrypt.client.le_util.make_or_verify_dir")
+    def test_concurrent(self, mock_make_dir):
+        mock_make_dir.side_effect = lambda *args: time.sleep(0.01)
+        caches = []
+        threads = [threading.Thread(target=lambda: caches.append(self._call()))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, mock_make_dir.call_count)
+        self.assertEqual(1, len(set(id(cache) for cache in caches)))
+
+
 class ClientTest(unittest.TestCase):
     """Tests for letsencrypt.client.Client."""
 
     def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
         self.config = mock.MagicMock(
-            no_verify_ssl=False, config_dir="/etc/letsencrypt")
+            no_verify_ssl=False, config_dir="/etc/letsencrypt",
+            cache_dir=self.cache_dir, strict_permissions=False)
         # pylint: disable=star-args
         self.account = mock.MagicMock(**{"key.pem": KEY})
 
@@ -91,10 +158,20 @@ class ClientTest(unittest.TestCase):
                 config=self.config, account_=self.account,
                 dv_auth=None, installer=None)
 
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
     def test_init_acme_verify_ssl(self):
         net = self.acme_client.call_args[1]["net"]
         self.assertTrue(net.verify_ssl)
 
+    def test_init_acme_cache(self):
+        cache = self.acme_client.call_args[1]["cache"]
+        self.assertEqual(self.cache_dir, cache.path)
+
+        from letsencrypt.client import _acme_cache
+        self.assertTrue(cache is _acme_cache(self.config))
+
     def _mock_obtain_certificate(self):
         self.client.auth_handler = mock.MagicMock()
         self.acme.request_issuance.return_value = mock.sentinel.certr
@@ -117,8 +194,9 @@ class ClientTest(unittest.TestCase):
                 form="der", file=None, data=CSR_SAN)))
         self._check_obtain_certificate()
 
+    @mock.patch("letsencrypt.client.keypool.from_config")
     @mock.patch("letsencrypt.client.crypto_util")
-    def test_obtain_certificate(self, mock_crypto_util):
+    def test_obtain_certificate(self, mock_crypto_util, mock_pool):
         self._mock_obtain_certificate()
 
         csr = le_util.CSR(form="der", file=None, data=CSR_SAN)
@@ -131,9 +209,14 @@ class ClientTest(unittest.TestCase):
             (mock.sentinel.certr, mock.sentinel.chain, mock.sentinel.key, csr))
 
         mock_crypto_util.init_save_key.assert_called_once_with(
-            self.config.rsa_key_size, self.config.key_dir)
+            self.config.rsa_key_size, self.config.key_dir,
+            key_type=self.config.key_type,
+            elliptic_curve=self.config.elliptic_curve,
+            pool=mock_pool.return_value, config=self.config)
+        mock_pool.assert_called_once_with(self.config)
         mock_crypto_util.init_save_csr.assert_called_once_with(
-            mock.sentinel.key, domains, self.config.csr_dir)
+            mock.sentinel.key, domains, self.config.csr_dir,
+            config=self.config)
         self._check_obtain_certificate()
 
     def test_save_certificate(self):
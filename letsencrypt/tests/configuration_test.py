@@ -40,18 +40,23 @@ class NamespaceConfigTest(unittest.TestCase):
     def test_dynamic_dirs(self, constants):
         constants.ACCOUNTS_DIR = 'acc'
         constants.BACKUP_DIR = 'backups'
+        constants.CACHE_DIR = 'cache'
         constants.CSR_DIR = 'csr'
 
         constants.IN_PROGRESS_DIR = '../p'
         constants.KEY_DIR = 'keys'
+        constants.KEY_POOL_DIR = 'key-pool'
         constants.TEMP_CHECKPOINT_DIR = 't'
 
         self.assertEqual(
             self.config.accounts_dir, '/tmp/config/acc/acme-server.org:443/new')
         self.assertEqual(self.config.backup_dir, '/tmp/foo/backups')
+        self.assertEqual(
+            self.config.cache_dir, '/tmp/foo/cache/acme-server.org:443/new')
         self.assertEqual(self.config.csr_dir, '/tmp/config/csr')
         self.assertEqual(self.config.in_progress_dir, '/tmp/foo/../p')
         self.assertEqual(self.config.key_dir, '/tmp/config/keys')
+        self.assertEqual(self.config.key_pool_dir, '/tmp/config/key-pool')
         self.assertEqual(self.config.temp_checkpoint_dir, '/tmp/foo/t')
 
     def test_absolute_paths(self):
@@ -81,6 +86,7 @@ class NamespaceConfigTest(unittest.TestCase):
                          os.path.join(os.getcwd(), logs_base))
         self.assertTrue(os.path.isabs(config.accounts_dir))
         self.assertTrue(os.path.isabs(config.backup_dir))
+        self.assertTrue(os.path.isabs(config.cache_dir))
         self.assertTrue(os.path.isabs(config.csr_dir))
         self.assertTrue(os.path.isabs(config.in_progress_dir))
         self.assertTrue(os.path.isabs(config.key_dir))
@@ -91,7 +97,8 @@ class RenewerConfigurationTest(unittest.TestCase):
     """Test for letsencrypt.configuration.RenewerConfiguration."""
 
     def setUp(self):
-        self.namespace = mock.MagicMock(config_dir='/tmp/config')
+        self.namespace = mock.MagicMock(
+            config_dir='/tmp/config', work_dir='/tmp/work')
         from letsencrypt.configuration import RenewerConfiguration
         self.config = RenewerConfiguration(self.namespace)
 
@@ -99,14 +106,21 @@ class RenewerConfigurationTest(unittest.TestCase):
     def test_dynamic_dirs(self, constants):
         constants.ARCHIVE_DIR = 'a'
         constants.LIVE_DIR = 'l'
+        constants.LOCK_DIR = 'locks'
         constants.RENEWAL_CONFIGS_DIR = 'renewal_configs'
         constants.RENEWER_CONFIG_FILENAME = 'r.conf'
+        constants.LINEAGE_INDEX_FILENAME = 'i.json'
+        constants.RENEWAL_SCHEDULE_FILENAME = 's.json'
 
         self.assertEqual(self.config.archive_dir, '/tmp/config/a')
         self.assertEqual(self.config.live_dir, '/tmp/config/l')
+        self.assertEqual(self.config.lock_dir, '/tmp/work/locks')
         self.assertEqual(
             self.config.renewal_configs_dir, '/tmp/config/renewal_configs')
         self.assertEqual(self.config.renewer_config_file, '/tmp/config/r.conf')
+        self.assertEqual(self.config.lineage_index_file, '/tmp/config/i.json')
+        self.assertEqual(
+            self.config.renewal_schedule_file, '/tmp/config/s.json')
 
     def test_absolute_paths(self):
         from letsencrypt.configuration import NamespaceConfig
@@ -127,6 +141,7 @@ class RenewerConfigurationTest(unittest.TestCase):
 
         self.assertTrue(os.path.isabs(config.archive_dir))
         self.assertTrue(os.path.isabs(config.live_dir))
+        self.assertTrue(os.path.isabs(config.lock_dir))
         self.assertTrue(os.path.isabs(config.renewal_configs_dir))
         self.assertTrue(os.path.isabs(config.renewer_config_file))
 
@@ -1,5 +1,6 @@
 """Tests for letsencrypt.crypto_util."""
 import logging
+import os
 import shutil
 import tempfile
 import unittest
@@ -15,6 +16,7 @@ from letsencrypt.tests import test_util
 
 RSA256_KEY = test_util.load_vector('rsa256_key.pem')
 RSA512_KEY = test_util.load_vector('rsa512_key.pem')
+EC_KEY = test_util.load_vector('ec_p256_key.pem')
 CERT_PATH = test_util.vector_path('cert.pem')
 CERT = test_util.load_vector('cert.pem')
 SAN_CERT = test_util.load_vector('cert-san.pem')
@@ -44,6 +46,43 @@ class InitSaveKeyTest(unittest.TestCase):
         self.assertEqual(key.pem, 'key_pem')
         self.assertTrue('key-letsencrypt.pem' in key.file)
 
+    @mock.patch('letsencrypt.crypto_util.make_key')
+    def test_ecdsa(self, mock_make):
+        from letsencrypt.crypto_util import init_save_key
+        mock_make.return_value = 'key_pem'
+        init_save_key(2048, self.key_dir, key_type='ecdsa',
+                      elliptic_curve='secp384r1')
+        mock_make.assert_called_once_with(2048, 'ecdsa', 'secp384r1')
+
+    @mock.patch('letsencrypt.crypto_util.make_key')
+    def test_pool(self, mock_make):
+        from letsencrypt.crypto_util import init_save_key
+        pool = mock.MagicMock()
+        pool.take.return_value = 'pooled_pem'
+        key = init_save_key(2048, self.key_dir, pool=pool)
+        self.assertEqual('pooled_pem', key.pem)
+        self.assertFalse(mock_make.called)
+        pool.take.assert_called_once_with('rsa', 2048, 'secp256r1')
+
+    @mock.patch('letsencrypt.crypto_util.make_key')
+    def test_pool_empty(self, mock_make):
+        from letsencrypt.crypto_util import init_save_key
+        mock_make.return_value = 'key_pem'
+        pool = mock.MagicMock()
+        pool.take.return_value = None
+        self.assertEqual(
+            'key_pem', init_save_key(2048, self.key_dir, pool=pool).pem)
+
+    @mock.patch('letsencrypt.crypto_util.le_util.make_or_verify_dir')
+    @mock.patch('letsencrypt.crypto_util.make_key')
+    def test_explicit_config(self, mock_make, mock_verify):
+        from letsencrypt.crypto_util import init_save_key
+        mock_make.return_value = 'key_pem'
+        init_save_key(2048, self.key_dir, config=mock.Mock(
+            strict_permissions=False))
+        mock_verify.assert_called_once_with(
+            self.key_dir, 0o700, os.geteuid(), False)
+
     @mock.patch('letsencrypt.crypto_util.make_key')
     def test_key_failure(self, mock_make):
         mock_make.side_effect = ValueError
@@ -75,6 +114,16 @@ class InitSaveCSRTest(unittest.TestCase):
         self.assertEqual(csr.data, 'csr_der')
         self.assertTrue('csr-letsencrypt.pem' in csr.file)
 
+    @mock.patch('letsencrypt.crypto_util.make_csr')
+    @mock.patch('letsencrypt.crypto_util.le_util.make_or_verify_dir')
+    def test_explicit_config(self, mock_verify, mock_csr):
+        from letsencrypt.crypto_util import init_save_csr
+        mock_csr.return_value = ('csr_pem', 'csr_der')
+        init_save_csr(mock.Mock(pem='dummy_key'), 'example.com', self.csr_dir,
+                      config=mock.Mock(strict_permissions=False))
+        mock_verify.assert_called_once_with(
+            self.csr_dir, 0o755, os.geteuid(), False)
+
 
 class MakeCSRTest(unittest.TestCase):
     """Tests for letsencrypt.crypto_util.make_csr."""
@@ -95,6 +144,13 @@ class MakeCSRTest(unittest.TestCase):
             ['example.com', 'www.example.com'], get_sans_from_csr(
                 csr_der, OpenSSL.crypto.FILETYPE_ASN1))
 
+    def test_ecdsa(self):
+        from letsencrypt.crypto_util import csr_matches_pubkey
+        from letsencrypt.crypto_util import valid_csr
+        csr_pem, _ = self._call(EC_KEY, ['example.com'])
+        self.assertTrue(valid_csr(csr_pem))
+        self.assertTrue(csr_matches_pubkey(csr_pem, EC_KEY))
+
 
 class ValidCSRTest(unittest.TestCase):
     """Tests for letsencrypt.crypto_util.valid_csr."""
@@ -139,8 +195,12 @@ class CSRMatchesPubkeyTest(unittest.TestCase):
         self.assertFalse(self._call(
             test_util.load_vector('csr.pem'), RSA256_KEY))
 
+    def test_ecdsa_key_rsa_csr_false(self):
+        self.assertFalse(self._call(
+            test_util.load_vector('csr.pem'), EC_KEY))
+
 
-class MakeKeyTest(unittest.TestCase):  # pylint: disable=too-few-public-methods
+class MakeKeyTest(unittest.TestCase):
     """Tests for letsencrypt.crypto_util.make_key."""
 
     def test_it(self):  # pylint: disable=no-self-use
@@ -149,6 +209,22 @@ class MakeKeyTest(unittest.TestCase):  # pylint: disable=too-few-public-methods
         OpenSSL.crypto.load_privatekey(
             OpenSSL.crypto.FILETYPE_PEM, make_key(1024))
 
+    def test_ecdsa(self):
+        from letsencrypt.crypto_util import make_key
+        from letsencrypt.crypto_util import valid_privkey
+        for curve in 'secp256r1', 'secp384r1', 'secp521r1':
+            key = make_key(1024, key_type='ecdsa', elliptic_curve=curve)
+            self.assertTrue(valid_privkey(key))
+            self.assertTrue(curve in OpenSSL.crypto.load_privatekey(
+                OpenSSL.crypto.FILETYPE_PEM, key).to_cryptography_key(
+                    ).curve.name)
+
+    def test_unsupported(self):
+        from letsencrypt.crypto_util import make_key
+        self.assertRaises(ValueError, make_key, 1024, key_type='dsa')
+        self.assertRaises(ValueError, make_key, 1024, key_type='ecdsa',
+                          elliptic_curve='secp192r1')
+
 
 class ValidPrivkeyTest(unittest.TestCase):
     """Tests for letsencrypt.crypto_util.valid_privkey."""
@@ -161,6 +237,12 @@ class ValidPrivkeyTest(unittest.TestCase):
     def test_valid_true(self):
         self.assertTrue(self._call(RSA256_KEY))
 
+    def test_valid_ecdsa_true(self):
+        self.assertTrue(self._call(EC_KEY))
+
+    def test_dsa_false(self):
+        self.assertFalse(self._call(test_util.load_vector('dsa512_key.pem')))
+
     def test_empty_false(self):
         self.assertFalse(self._call(''))
 
@@ -250,5 +332,71 @@ class NotAfterTest(unittest.TestCase):
                          '2014-12-18T22:34:45+00:00')
 
 
+class CertMetadataTest(unittest.TestCase):
+    """Tests for letsencrypt.crypto_util.cert_metadata."""
+
+    @classmethod
+    def _call(cls, *args, **kwargs):
+        from letsencrypt.crypto_util import cert_metadata
+        return cert_metadata(*args, **kwargs)
+
+    def test_san(self):
+        metadata = self._call(SAN_CERT)
+        self.assertEqual(['example.com', 'www.example.com'], metadata.sans)
+        self.assertEqual(
+            '2014-12-11T22:34:45+00:00', metadata.not_before.isoformat())
+        self.assertEqual(
+            '2014-12-18T22:34:45+00:00', metadata.not_after.isoformat())
+        self.assertEqual(1337, metadata.serial)
+        self.assertEqual(('2.5.4.3', 'example.com'), metadata.issuer[-1])
+        self.assertEqual('9cbd65e7390da7e40bc6f4ce86d76bb7de24320def1b65eb05b'
+                         '949efc06659d5', metadata.spki_sha256)
+
+    def test_consistent_with_pyopenssl_helpers(self):
+        from letsencrypt.crypto_util import get_sans_from_cert
+        from letsencrypt.crypto_util import notAfter
+        from letsencrypt.crypto_util import notBefore
+        metadata = self._call(CERT)
+        self.assertEqual(get_sans_from_cert(CERT), metadata.sans)
+        self.assertEqual(notBefore(CERT_PATH), metadata.not_before)
+        self.assertEqual(notAfter(CERT_PATH), metadata.not_after)
+
+    def test_der(self):
+        self.assertEqual([], self._call(
+            test_util.load_vector('cert.der'),
+            OpenSSL.crypto.FILETYPE_ASN1).sans)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, self._call, 'hello there')
+
+
+class InspectCertsTest(unittest.TestCase):
+    """Tests for letsencrypt.crypto_util.inspect_certs."""
+
+    @classmethod
+    def _call(cls, *args, **kwargs):
+        from letsencrypt.crypto_util import inspect_certs
+        return inspect_certs(*args, **kwargs)
+
+    def test_it(self):
+        san_cert_path = test_util.vector_path('cert-san.pem')
+        metadata = self._call(iter([CERT_PATH, san_cert_path, CERT_PATH]))
+        self.assertEqual(set([CERT_PATH, san_cert_path]), set(metadata))
+        self.assertEqual(['example.com', 'www.example.com'],
+                         metadata[san_cert_path].sans)
+
+    @mock.patch('letsencrypt.crypto_util.cert_metadata')
+    def test_parsed_once(self, mock_cert_metadata):
+        self._call([CERT_PATH, CERT_PATH])
+        self.assertEqual(1, mock_cert_metadata.call_count)
+
+    @mock.patch('letsencrypt.crypto_util.logger')
+    def test_broken_skipped(self, mock_logger):
+        metadata = self._call([
+            test_util.vector_path('csr.pem'), CERT_PATH, '/does/not/exist'])
+        self.assertEqual([CERT_PATH], list(metadata))
+        self.assertEqual(2, mock_logger.warning.call_count)
+
+
 if __name__ == '__main__':
     unittest.main()  # pragma: no cover
@@ -0,0 +1,201 @@
+"""Tests for letsencrypt.keypool."""
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from letsencrypt import errors
+from letsencrypt import le_util
+
+
+class KeyPoolTest(unittest.TestCase):
+    """Tests for letsencrypt.keypool.KeyPool."""
+
+    def setUp(self):
+        from letsencrypt.keypool import KeyPool
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "pool")
+        self.pool = KeyPool(self.path, low=1, high=3)
+        self.spec = ("rsa", 2048, "secp256r1")
+        self.make_key_patch = mock.patch(
+            "letsencrypt.keypool.crypto_util.make_key")
+        self.make_key = self.make_key_patch.start()
+        self.make_key.side_effect = ["key{0}".format(i) for i in range(100)]
+
+    def tearDown(self):
+        self.make_key_patch.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_spec_name(self):
+        from letsencrypt.keypool import KeyPool
+        self.assertEqual("rsa-4096", KeyPool.spec_name("rsa", 4096, "foo"))
+        self.assertEqual(
+            "ecdsa-secp384r1", KeyPool.spec_name("ecdsa", 2048, "secp384r1"))
+
+    def test_refill(self):
+        self.assertEqual(3, self.pool.refill(*self.spec))
+        self.assertEqual(3, self.pool.count(*self.spec))
+        self.assertEqual(0, self.pool.refill(*self.spec))
+        self.make_key.assert_called_with(2048, "rsa", "secp256r1")
+        spec_dir = os.path.join(self.path, "rsa-2048")
+        self.assertEqual(0o700, os.stat(spec_dir).st_mode & 0o777)
+        for name in os.listdir(spec_dir):
+            self.assertEqual(0o600, os.stat(
+                os.path.join(spec_dir, name)).st_mode & 0o777)
+
+    def test_take_empty(self):
+        with mock.patch.object(self.pool, "refill_async") as refill_async:
+            self.assertTrue(self.pool.take(*self.spec) is None)
+        refill_async.assert_called_once_with(*self.spec)
+
+    def test_take(self):
+        self.pool.refill(*self.spec)
+        with mock.patch.object(self.pool, "refill_async") as refill_async:
+            keys = set([self.pool.take(*self.spec),
+                        self.pool.take(*self.spec)])
+            self.assertFalse(refill_async.called)
+            keys.add(self.pool.take(*self.spec))
+            refill_async.assert_called_once_with(*self.spec)
+        self.assertEqual(set(["key0", "key1", "key2"]), keys)
+        self.assertEqual([], os.listdir(os.path.join(self.path, "rsa-2048")))
+
+    def test_take_lost_race(self):
+        self.pool.refill(*self.spec)
+        rename = os.rename
+
+        def _rename(src, dst):
+            if src.endswith("pem") and not self.raced:
+                self.raced = True
+                raise OSError("taken by another process")
+            return rename(src, dst)
+
+        self.raced = False
+        with mock.patch("letsencrypt.keypool.os.rename", side_effect=_rename):
+            self.assertTrue(self.pool.take(*self.spec) is not None)
+        # the key "taken by another process" is still there in this test
+        self.assertEqual(2, self.pool.count(*self.spec))
+
+    def test_take_unusable_dir(self):
+        with open(self.path, "w"):
+            pass
+        self.assertTrue(self.pool.take(*self.spec) is None)
+
+    @mock.patch("letsencrypt.keypool.time")
+    def test_refill_removes_stale(self, mock_time):
+        spec_dir = os.path.join(self.path, "rsa-2048")
+        self.pool.refill(*self.spec)
+        stale = os.path.join(spec_dir, ".new-foo")
+        open(stale, "w").close()
+        mock_time.time.return_value = os.path.getmtime(stale) + 10
+        self.pool.refill(*self.spec)
+        self.assertTrue(os.path.exists(stale))
+        mock_time.time.return_value += self.pool.STALE
+        self.pool.refill(*self.spec)
+        self.assertFalse(os.path.exists(stale))
+
+    def test_refill_async(self):
+        thread = self.pool.refill_async(*self.spec)
+        thread.join()
+        self.assertEqual(3, self.pool.count(*self.spec))
+        self.assertTrue(thread.daemon)
+
+    def test_refill_async_single_thread(self):
+        with mock.patch("letsencrypt.keypool.threading.Thread") as thread:
+            thread().is_alive.return_value = True
+            self.pool.refill_async(*self.spec)
+            self.pool.refill_async(*self.spec)
+        self.assertEqual(1, thread().start.call_count)
+
+    def test_spec_dir_verified_once(self):
+        with mock.patch("letsencrypt.keypool.le_util.make_or_verify_dir",
+                        wraps=le_util.make_or_verify_dir) as verify:
+            self.pool.refill(*self.spec)
+            self.pool.take(*self.spec)
+            self.pool.count(*self.spec)
+        self.assertEqual(2, verify.call_count)
+
+    def test_stop(self):
+        def make_key(*unused_args):  # pylint: disable=missing-docstring
+            self.pool._stopped.set()  # pylint: disable=protected-access
+            return "key"
+        self.make_key.side_effect = make_key
+        self.assertEqual(1, self.pool.refill(*self.spec))
+        self.assertTrue(self.pool.refill_async(*self.spec) is None)
+        self.assertEqual(["key"], [
+            open(os.path.join(self.path, "rsa-2048", name)).read()
+            for name in os.listdir(os.path.join(self.path, "rsa-2048"))])
+
+    def test_stop_joins_refills(self):
+        with mock.patch("letsencrypt.keypool.threading.Thread") as thread:
+            thread().is_alive.return_value = True
+            self.pool.refill_async(*self.spec)
+            self.pool.stop()
+        thread().join.assert_called_once_with()
+
+    @mock.patch("letsencrypt.keypool.logger")
+    def test_refill_async_error(self, mock_logger):
+        self.make_key.side_effect = ValueError
+        self.pool.refill_async(*self.spec).join()
+        self.assertTrue(mock_logger.warning.called)
+
+
+class FromConfigTest(unittest.TestCase):
+    """Tests for letsencrypt.keypool.from_config."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config = mock.MagicMock(
+            key_pool_dir=os.path.join(self.tmp_dir, "pool"),
+            key_pool_low=1, key_pool_high=2, strict_permissions=False,
+            key_type="ecdsa", rsa_key_size=2048, elliptic_curve="secp256r1")
+
+    def tearDown(self):
+        from letsencrypt import keypool
+        keypool._POOLS.clear()  # pylint: disable=protected-access
+        shutil.rmtree(self.tmp_dir)
+
+    def _call(self):
+        from letsencrypt.keypool import from_config
+        return from_config(self.config)
+
+    def test_disabled(self):
+        self.config.key_pool_high = 0
+        self.assertTrue(self._call() is None)
+
+    @mock.patch("letsencrypt.keypool.atexit")
+    @mock.patch("letsencrypt.keypool.KeyPool.refill_async")
+    def test_shared_and_stopped_at_exit(self, refill_async, mock_atexit):
+        pool = self._call()
+        self.assertEqual(self.config.key_pool_dir, pool.path)
+        self.assertTrue(self._call() is pool)
+        # no keys are generated until some are taken
+        self.assertFalse(refill_async.called)
+        mock_atexit.register.assert_called_once_with(pool.stop)
+
+    @mock.patch("letsencrypt.keypool.KeyPool.count")
+    def test_unusable(self, count):
+        count.side_effect = errors.Error
+        self.assertTrue(self._call() is None)
+        self.assertTrue(self._call() is None)
+        self.assertEqual(1, count.call_count)
+
+    @mock.patch("letsencrypt.keypool.atexit")
+    def test_keyed_on_settings(self, unused_mock_atexit):
+        pool = self._call()
+        self.config.elliptic_curve = "secp384r1"
+        ec384_pool = self._call()
+        self.assertFalse(ec384_pool is pool)
+        # key size does not matter for ECDSA keys
+        self.config.rsa_key_size = 4096
+        self.assertTrue(self._call() is ec384_pool)
+        self.config.key_pool_high = 5
+        high_pool = self._call()
+        self.assertFalse(high_pool is ec384_pool)
+        self.assertEqual(5, high_pool.high)
+        self.assertEqual(self.config.key_pool_dir, high_pool.path)
+
+
+if __name__ == "__main__":
+    unittest.main()  # pragma: no cover
@@ -260,6 +260,34 @@ class SafelyRemoveTest(unittest.TestCase):
         self.assertRaises(OSError, self._call)
 
 
+class AtomicWriteTest(unittest.TestCase):
+    """Tests for letsencrypt.le_util.atomic_write."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "foo")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _call(self, data):
+        from letsencrypt.le_util import atomic_write
+        return atomic_write(self.path, data)
+
+    def test_write_and_replace(self):
+        self._call("foo")
+        self._call("bar")
+        with open(self.path) as f:
+            self.assertEqual("bar", f.read())
+        self.assertEqual(["foo"], os.listdir(self.tmp))
+
+    @mock.patch("letsencrypt.le_util.os.rename")
+    def test_failure_cleans_up(self, mock_rename):
+        mock_rename.side_effect = OSError
+        self.assertRaises(OSError, self._call, "foo")
+        self.assertEqual([], os.listdir(self.tmp))
+
+
 class SafeEmailTest(unittest.TestCase):
     """Test safe_email."""
     @classmethod
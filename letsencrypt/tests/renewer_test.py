@@ -4,6 +4,7 @@ import pytz
 import os
 import tempfile
 import shutil
+import threading
 import unittest
 
 import configobj
@@ -20,6 +21,9 @@ from letsencrypt.tests import test_util
 
 CERT = test_util.load_cert('cert.pem')
 
+ENABLED = {"autorenew": True, "autodeploy": True}
+"""Lineage index entry with autorenewal and autodeployment enabled."""
+
 
 def unlink_all(rc_object):
     """Unlink all four items associated with this RenewableCert."""
@@ -58,6 +62,7 @@ class BaseRenewableCertTest(unittest.TestCase):
         os.makedirs(os.path.join(self.tempdir, "live", "example.org"))
         os.makedirs(os.path.join(self.tempdir, "archive", "example.org"))
         os.makedirs(os.path.join(self.tempdir, "renewal"))
+        os.makedirs(os.path.join(self.tempdir, "locks"))
 
         config = configobj.ConfigObj()
         for kind in ALL_FOUR:
@@ -361,6 +366,48 @@ class RenewableCertTests(BaseRenewableCertTest):
             else:
                 self.assertFalse(self.test_rc.has_pending_deployment())
 
+    def test_metadata_cache(self):
+        self._write_out_ex_kinds()
+        with mock.patch("letsencrypt.storage.os.listdir",
+                        wraps=os.listdir) as mock_listdir:
+            with mock.patch("letsencrypt.storage.os.readlink",
+                            wraps=os.readlink) as mock_readlink:
+                with self.test_rc.metadata_cache():
+                    with self.test_rc.metadata_cache():
+                        self.assertTrue(self.test_rc.has_pending_deployment())
+                    self.assertEqual(12, self.test_rc.latest_common_version())
+                    self.assertEqual(13, self.test_rc.next_free_version())
+                self.assertEqual(4, mock_listdir.call_count)
+                self.assertEqual(4, mock_readlink.call_count)
+                # not cached outside of metadata_cache
+                self.test_rc.latest_common_version()
+                self.assertEqual(8, mock_listdir.call_count)
+
+    def test_metadata_cache_invalidation(self):
+        self._write_out_ex_kinds()
+        with self.test_rc.metadata_cache():
+            self.assertEqual(11, self.test_rc.current_version("cert"))
+            self.test_rc.update_all_links_to(12)
+            self.assertEqual(12, self.test_rc.current_version("cert"))
+            self.assertFalse(self.test_rc.has_pending_deployment())
+            self.assertEqual(13, self.test_rc.save_successor(
+                12, "cert", None, "chain"))
+            self.assertEqual(13, self.test_rc.latest_common_version())
+            self.assertTrue(self.test_rc.has_pending_deployment())
+
+    @mock.patch("letsencrypt.storage.crypto_util")
+    def test_metadata_cache_certs(self, mock_crypto_util):
+        self._write_out_ex_kinds()
+        mock_crypto_util.cert_metadata.return_value = mock.MagicMock(
+            sans=["example.com"],
+            not_after=datetime.datetime(2100, 1, 1, tzinfo=pytz.UTC))
+        with self.test_rc.metadata_cache():
+            for _ in range(2):
+                self.assertEqual(["example.com"], self.test_rc.names())
+                self.assertFalse(self.test_rc.should_autorenew())
+        # current (names) and latest (expiry) version, parsed once each
+        self.assertEqual(2, mock_crypto_util.cert_metadata.call_count)
+
     def test_names(self):
         # Trying the current version
         test_cert = test_util.load_vector("cert-san.pem")
@@ -381,6 +428,15 @@ class RenewableCertTests(BaseRenewableCertTest):
         self.assertEqual(self.test_rc.names(12),
                          ["example.com", "www.example.com"])
 
+    def test_not_after(self):
+        self._write_out_ex_kinds()
+        self.test_rc.update_all_links_to(12)
+        with open(self.test_rc.cert, "w") as f:
+            f.write(test_util.load_vector("cert.pem"))
+        self.assertEqual(
+            datetime.datetime(2014, 12, 18, 22, 34, 45, tzinfo=pytz.UTC),
+            self.test_rc.not_after(12))
+
     @mock.patch("letsencrypt.storage.datetime")
     def test_time_interval_judgments(self, mock_datetime):
         """Test should_autodeploy() and should_autorenew() on the basis
@@ -713,11 +769,43 @@ class RenewableCertTests(BaseRenewableCertTest):
         # TODO: We could also make several assertions about calls that should
         #       have been made to the mock functions here.
         mock_acc_storage().load.assert_called_once_with(account_id="abcde")
+        # key type of lineages enrolled before ECDSA support
+        config = mock_c.call_args[0][0]
+        self.assertEqual("rsa", config.key_type)
+        self.assertEqual("secp256r1", config.elliptic_curve)
+        self.test_rc.configfile["renewalparams"]["key_type"] = "ecdsa"
+        self.test_rc.configfile["renewalparams"]["elliptic_curve"] = "secp384r1"
+        renewer.renew(self.test_rc, 1)
+        config = mock_c.call_args[0][0]
+        self.assertEqual("ecdsa", config.key_type)
+        self.assertEqual("secp384r1", config.elliptic_curve)
         mock_client.obtain_certificate.return_value = (
             mock.sentinel.certr, [], mock.sentinel.key, mock.sentinel.csr)
         # This should fail because the renewal itself appears to fail
         self.assertFalse(renewer.renew(self.test_rc, 1))
 
+    @mock.patch("letsencrypt.renewer.plugins_disco")
+    def test_restart_installer(self, mock_pd):
+        from letsencrypt import renewer
+        mock_installer = mock.MagicMock()
+        mock_pd.PluginsRegistry.find_all.return_value = {
+            "apache": mock_installer}
+        # no renewalparams, no installer
+        self.assertFalse(renewer.restart_installer(self.test_rc))
+        self.test_rc.configfile["renewalparams"] = {
+            "rsa_key_size": "2048", "tls_sni_01_port": "4430",
+            "http01_port": "1234", "installer": "fake",
+            "config_dir": "config", "work_dir": "work", "logs_dir": "logs",
+            "domains": ["example.com"]}
+        # "fake" != "apache"
+        self.assertFalse(renewer.restart_installer(self.test_rc))
+        self.test_rc.configfile["renewalparams"]["installer"] = "apache"
+        self.assertTrue(renewer.restart_installer(self.test_rc))
+        config = mock_installer.init.call_args[0][0]
+        self.assertEqual(2048, config.rsa_key_size)
+        mock_installer.init().prepare.assert_called_once_with()
+        mock_installer.init().restart.assert_called_once_with()
+
     def _common_cli_args(self):
         return [
             "--config-dir", self.cli_config.config_dir,
@@ -725,11 +813,17 @@ class RenewableCertTests(BaseRenewableCertTest):
             "--logs-dir", self.cli_config.logs_dir,
         ]
 
+    @mock.patch("letsencrypt.renewer.schedule.RenewalSchedule")
     @mock.patch("letsencrypt.renewer.notify")
+    @mock.patch("letsencrypt.storage.lineage_index")
     @mock.patch("letsencrypt.storage.RenewableCert")
     @mock.patch("letsencrypt.renewer.renew")
-    def test_main(self, mock_renew, mock_rc, mock_notify):
+    def test_main(self, mock_renew, mock_rc, mock_index, mock_notify,
+                  mock_schedule):
         from letsencrypt import renewer
+        mock_index().lineages = {
+            "example.org": ENABLED, "example.com": ENABLED}
+        mock_schedule().due.return_value = ["example.com", "example.org"]
         mock_rc_instance = mock.MagicMock()
         mock_rc_instance.should_autodeploy.return_value = True
         mock_rc_instance.should_autorenew.return_value = True
@@ -764,6 +858,165 @@ class RenewableCertTests(BaseRenewableCertTest):
         self.assertEqual(mock_happy_instance.update_all_links_to.call_count, 0)
         self.assertEqual(mock_notify.notify.call_count, 4)
         self.assertEqual(mock_renew.call_count, 2)
+        self.assertEqual(4, mock_schedule().reschedule.call_count)
+        self.assertEqual(2, mock_schedule().save.call_count)
+
+    @mock.patch("letsencrypt.renewer.schedule.RenewalSchedule")
+    @mock.patch("letsencrypt.storage.lineage_index")
+    @mock.patch("letsencrypt.storage.RenewableCert")
+    def test_main_schedule(self, mock_rc, mock_index, mock_schedule):
+        from letsencrypt import renewer
+        mock_index().lineages = {"a.com": ENABLED, "b.com": ENABLED,
+                                 "c.com": ENABLED, "d.com": {
+                                     "autorenew": False, "autodeploy": False}}
+        mock_schedule().due.return_value = ["b.com", "c.com", "d.com"]
+        certs = {}
+
+        def new_cert(path, unused_config):  # pylint: disable=missing-docstring
+            cert = certs[os.path.basename(path)] = mock.MagicMock(
+                configfile={})
+            cert.should_autorenew.return_value = False
+            cert.should_autodeploy.side_effect = (
+                None if path.endswith("b.com.conf") else ValueError)
+            return cert
+        mock_rc.side_effect = new_cert
+
+        renewer.main(cli_args=self._common_cli_args())
+        self.assertEqual(set(["b.com.conf", "c.com.conf"]), set(certs))
+        mock_schedule().reschedule.assert_called_once_with(
+            mock_index(), "b.com", certs["b.com.conf"], mock.ANY)
+        mock_schedule().discard.assert_called_once_with("c.com")
+        mock_schedule().skip.assert_called_once_with(mock_index(), "d.com")
+        self.assertTrue(mock_schedule().save.called)
+
+        certs.clear()
+        renewer.main(cli_args=self._common_cli_args() + ["--ignore-schedule"])
+        self.assertEqual(
+            set(["a.com.conf", "b.com.conf", "c.com.conf"]), set(certs))
+
+    @mock.patch("letsencrypt.renewer.schedule.RenewalSchedule")
+    @mock.patch("letsencrypt.renewer.notify")
+    @mock.patch("letsencrypt.storage.lineage_index")
+    @mock.patch("letsencrypt.storage.RenewableCert")
+    @mock.patch("letsencrypt.renewer.renew")
+    def test_main_parallel(self, mock_renew, mock_rc, mock_index, mock_notify,
+                           mock_schedule):
+        from letsencrypt import renewer
+        names = ["a.com", "b.com", "c.com"]
+        mock_index().lineages = dict((name, ENABLED) for name in names)
+        mock_schedule().due.return_value = names
+        certs = {}
+
+        def new_cert(path, unused_config):  # pylint: disable=missing-docstring
+            cert = certs[os.path.basename(path)] = mock.MagicMock(
+                configfile={"renewalparams": {"authenticator": path}})
+            cert.should_autorenew.return_value = True
+            cert.should_autodeploy.return_value = False
+            return cert
+        mock_rc.side_effect = new_cert
+        # mock call counts are not updated atomically, record calls
+        # from the worker threads in lists instead
+        renewed, notified = [], []
+        mock_renew.side_effect = lambda cert, _: renewed.append(cert) or (
+            cert is not certs["b.com.conf"])
+        mock_notify.notify.side_effect = lambda *args: notified.append(args)
+
+        with mock.patch("sys.stdout") as mock_stdout:
+            renewer.main(
+                cli_args=self._common_cli_args() + ["--parallel", "2"])
+        output = "".join(
+            call[0][0] for call in mock_stdout.write.call_args_list)
+        self.assertEqual(3, len(renewed))
+        self.assertEqual(3, len(notified))
+        self.assertTrue("Processed 3 lineages" in output)
+        self.assertTrue("renewal failed: 1, renewed: 2" in output)
+        for name in names:
+            self.assertTrue("  {0}: ".format(name) in output)
+
+    def test_group_lineages(self):
+        from letsencrypt import renewer
+        lineages = [(name, mock.MagicMock(configfile=configfile))
+                    for name, configfile in [
+                        ("a", {"renewalparams": {"authenticator": "standalone",
+                                                 "account": "1"}}),
+                        ("b", {}),
+                        ("c", {"renewalparams": {"authenticator": "webroot",
+                                                 "account": "1"}}),
+                        ("d", {"renewalparams": {"authenticator": "standalone",
+                                                 "account": "1"}}),
+                        ("e", {}),
+                        ("f", {"renewalparams": {"authenticator": "webroot",
+                                                 "account": "2"}})]]
+        self.assertEqual(
+            [["a", "d"], ["b", "e"], ["c"], ["f"]],
+            [[name for name, _ in group]
+             for group in renewer._group_lineages(lineages)])
+
+    def test_group_lineages_standalone_accounts(self):
+        from letsencrypt import renewer
+        lineages = [(name, mock.MagicMock(configfile={"renewalparams": {
+            "authenticator": "standalone", "account": account}}))
+                    for name, account in [("a", "1"), ("b", "2")]]
+        self.assertEqual(
+            [["a", "b"]], [[name for name, _ in group]
+                           for group in renewer._group_lineages(lineages)])
+
+    def _process_lineage(self, cert, lineagename="example.org"):
+        from letsencrypt import renewer
+        return renewer._process_lineage(
+            self.cli_config, lineagename, cert, threading.Lock())
+
+    @mock.patch("letsencrypt.renewer.restart_installer")
+    @mock.patch("letsencrypt.renewer.notify")
+    def test_process_lineage_deploy(self, mock_notify, mock_restart):
+        cert = mock.MagicMock()
+        cert.should_autorenew.return_value = False
+        cert.should_autodeploy.return_value = True
+        cert.latest_common_version.return_value = 12
+        name, outcome, _ = self._process_lineage(cert)
+        self.assertEqual(("example.org", ["deployed"]), (name, outcome))
+        cert.update_all_links_to.assert_called_once_with(12)
+        mock_restart.assert_called_once_with(cert)
+        self.assertEqual(1, mock_notify.notify.call_count)
+
+    @mock.patch("letsencrypt.renewer.restart_installer")
+    @mock.patch("letsencrypt.renewer.notify")
+    def test_process_lineage_restart_error(self, mock_notify, mock_restart):
+        from letsencrypt import errors
+        mock_restart.side_effect = errors.PluginError
+        cert = mock.MagicMock()
+        cert.should_autorenew.return_value = False
+        cert.should_autodeploy.return_value = True
+        self.assertEqual(["deployed", "restart failed"],
+                         self._process_lineage(cert)[1])
+        self.assertEqual(1, mock_notify.notify.call_count)
+
+    def test_process_lineage_locked(self):
+        from letsencrypt import renewer
+        lock_file = renewer._lineage_lock(self.cli_config, "example.org")
+        self.assertEqual(
+            os.path.join(self.tempdir, "locks", "example.org.lock"),
+            lock_file.name)
+        try:
+            self.assertEqual(["locked"], self._process_lineage(
+                mock.MagicMock())[1])
+        finally:
+            lock_file.close()
+        cert = mock.MagicMock()
+        cert.should_autorenew.return_value = False
+        cert.should_autodeploy.return_value = False
+        self.assertEqual([], self._process_lineage(cert)[1])
+
+    def test_process_lineage_lock_error(self):
+        self.assertEqual(["failed"], self._process_lineage(
+            mock.MagicMock(), lineagename=os.path.join("foo", "bar"))[1])
+
+    @mock.patch("letsencrypt.renewer.logger")
+    def test_process_lineage_error(self, mock_logger):
+        cert = mock.MagicMock()
+        cert.should_autorenew.side_effect = errors.CertStorageError
+        self.assertEqual(["failed"], self._process_lineage(cert)[1])
+        self.assertTrue(mock_logger.exception.called)
 
     def test_bad_config_file(self):
         from letsencrypt import renewer
@@ -776,5 +1029,162 @@ class RenewableCertTests(BaseRenewableCertTest):
         # The errors.CertStorageError is caught inside and nothing happens.
 
 
+class LineageIndexTest(BaseRenewableCertTest):
+    """Tests for letsencrypt.storage.LineageIndex."""
+
+    def setUp(self):
+        super(LineageIndexTest, self).setUp()
+        self._write_out_ex_kinds()
+        with open(self.test_rc.cert, "w") as f:
+            f.write(test_util.load_vector("cert-san.pem"))
+
+    def tearDown(self):
+        from letsencrypt import storage
+        storage._INDEXES.clear()  # pylint: disable=protected-access
+        super(LineageIndexTest, self).tearDown()
+
+    def _index(self):
+        from letsencrypt import storage
+        return storage.lineage_index(self.cli_config)
+
+    def test_refresh(self):
+        from letsencrypt.storage import LineageIndex
+        index = self._index()
+        entry = index.lineages["example.org"]
+        self.assertEqual(["example.com", "www.example.com"], entry["sans"])
+        self.assertEqual(1418942085, entry["not_after"])
+        self.assertEqual(11, entry["current_version"])
+        self.assertEqual(12, entry["latest_version"])
+        self.assertTrue(entry["autorenew"])
+        self.assertTrue(entry["autodeploy"])
+        self.assertEqual(self.config.filename, entry["config"])
+        # saved
+        self.assertEqual(index.lineages, LineageIndex(index.path).lineages)
+
+    def test_refresh_unchanged(self):
+        index = self._index()
+        with mock.patch("letsencrypt.storage.RenewableCert") as mock_rc:
+            with mock.patch.object(index, "save") as mock_save:
+                self.assertTrue(self._index() is index)
+        self.assertFalse(mock_rc.called)
+        self.assertFalse(mock_save.called)
+
+    def test_refresh_changed_cert(self):
+        index = self._index()
+        with open(self.test_rc.cert, "w") as f:
+            f.write(test_util.load_vector("cert.pem"))
+        stat = os.stat(self.test_rc.cert)
+        os.utime(self.test_rc.cert, (stat.st_atime, stat.st_mtime + 10))
+        self._index()
+        self.assertEqual([], index.lineages["example.org"]["sans"])
+
+    def test_refresh_changed_config(self):
+        self._index()
+        self.config["autorenew"] = "False"
+        self.config["autodeploy"] = "maybe"
+        self.config.write()
+        stat = os.stat(self.config.filename)
+        os.utime(self.config.filename, (stat.st_atime, stat.st_mtime + 10))
+        entry = self._index().lineages["example.org"]
+        self.assertFalse(entry["autorenew"])
+        self.assertTrue(entry["autodeploy"])
+
+    def test_refresh_replaced_config(self):
+        from letsencrypt import storage
+        os.utime(self.config.filename, (1400000000, 1400000000))
+        self._index()
+        shutil.copy2(self.config.filename, self.config.filename + ".new")
+        os.rename(self.config.filename + ".new", self.config.filename)
+        self.assertEqual(1400000000, os.stat(self.config.filename).st_mtime)
+        with mock.patch("letsencrypt.storage.RenewableCert",
+                        wraps=storage.RenewableCert) as mock_rc:
+            self.assertTrue("example.org" in self._index().lineages)
+        self.assertEqual(1, mock_rc.call_count)
+
+    def test_refresh_removed_and_broken(self):
+        index = self._index()
+        os.unlink(self.config.filename)
+        with open(os.path.join(self.cli_config.renewal_configs_dir,
+                               "bad.conf"), "w") as f:
+            f.write("incomplete = configfile\n")
+        with open(os.path.join(self.cli_config.renewal_configs_dir,
+                               "README"), "w") as f:
+            f.write("not a renewal configuration file\n")
+        self._index()
+        self.assertEqual({}, index.lineages)
+        self.assertEqual((None, None), index.find(["example.com"]))
+
+    def test_load_corrupt(self):
+        from letsencrypt.storage import LineageIndex
+        with open(self.cli_config.lineage_index_file, "w") as f:
+            f.write("{")
+        self.assertEqual({}, LineageIndex(
+            self.cli_config.lineage_index_file).lineages)
+        self.assertTrue("example.org" in self._index().lineages)
+
+    def test_load_wrong_version(self):
+        from letsencrypt.storage import LineageIndex
+        with open(self.cli_config.lineage_index_file, "w") as f:
+            f.write('{"version": 0, "lineages": {}}')
+        self.assertEqual({}, LineageIndex(
+            self.cli_config.lineage_index_file).lineages)
+
+    @mock.patch("letsencrypt.storage.logger")
+    def test_save_failure(self, mock_logger):
+        from letsencrypt.storage import LineageIndex
+        index = LineageIndex(os.path.join(self.tempdir, "foo", "index.json"))
+        index.save()
+        self.assertTrue(mock_logger.warning.called)
+        self.assertFalse(os.path.exists(os.path.join(self.tempdir, "foo")))
+
+    def test_find(self):
+        index = self._index()
+        self.assertEqual((None, None), index.find(["foo.com"]))
+        self.assertEqual(("example.org", None),
+                         index.find(["www.example.com", "example.com"]))
+        self.assertEqual((None, "example.org"), index.find(
+            ["www.example.com", "example.com", "foo.com"]))
+        self.assertEqual((None, None), index.find(["example.com", "foo.com"]))
+
+    def test_find_sanless(self):
+        from letsencrypt import storage
+        index = self._index()
+        self.test_rc.save_successor(
+            12, test_util.load_vector("cert.pem"), None, "chain")
+        self.test_rc.update_all_links_to(13)
+        self.assertEqual((None, "example.org"), index.find(["foo.com"]))
+        self.assertEqual(("example.org", None), index.find([]))
+        storage.RenewableCert.new_lineage(
+            "the-lineage.com", test_util.load_vector("cert-san.pem"),
+            "privkey", "chain", None, self.defaults, self.cli_config)
+        self.assertEqual((None, "the-lineage.com"), index.find(
+            ["example.com", "www.example.com", "foo.com"]))
+        self.test_rc.update_all_links_to(12)
+        self.assertEqual((None, None), index.find(["foo.com"]))
+
+    def test_save_successor_and_update_all_links_to(self):
+        index = self._index()
+        self.assertEqual(13, self.test_rc.save_successor(
+            12, test_util.load_vector("cert.pem"), None, "chain"))
+        entry = index.lineages["example.org"]
+        self.assertEqual(11, entry["current_version"])
+        self.assertEqual(13, entry["latest_version"])
+        self.test_rc.update_all_links_to(13)
+        entry = index.lineages["example.org"]
+        self.assertEqual(13, entry["current_version"])
+        self.assertEqual([], entry["sans"])
+        self.assertEqual(entry, self._index().lineages["example.org"])
+
+    def test_new_lineage(self):
+        from letsencrypt import storage
+        index = self._index()
+        storage.RenewableCert.new_lineage(
+            "the-lineage.com", test_util.load_vector("cert-san.pem"),
+            "privkey", "chain", None, self.defaults, self.cli_config)
+        self.assertEqual(1, index.lineages["the-lineage.com"]["latest_version"])
+        self.assertEqual(("the-lineage.com", None), index.find(
+            ["example.com", "www.example.com"]))
+
+
 if __name__ == "__main__":
     unittest.main()  # pragma: no cover
@@ -0,0 +1,176 @@
+"""Tests for letsencrypt.schedule."""
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+import pytz
+
+
+DAY = 24 * 3600
+NOT_AFTER = 1418942085
+
+
+class RenewalScheduleTest(unittest.TestCase):
+    """Tests for letsencrypt.schedule.RenewalSchedule."""
+
+    def setUp(self):
+        from letsencrypt.schedule import RenewalSchedule
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "schedule.json")
+        self.schedule = RenewalSchedule(self.path)
+        self.index = mock.MagicMock(lineages={
+            "a.com": self._entry("a"), "b.com": self._entry("b")})
+        self.cert = mock.MagicMock(configuration={
+            "renew_before_expiry": "10 days",
+            "deploy_before_expiry": "2 days",
+        })
+        self.cert.latest_common_version.return_value = 1
+        self.cert.has_pending_deployment.return_value = False
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    @classmethod
+    def _entry(cls, stamp):
+        return {"not_after": NOT_AFTER, "current_version": 1,
+                "stamps": [["/foo", stamp]]}
+
+    def _reschedule(self, name="a.com", now=0):
+        return self.schedule.reschedule(self.index, name, self.cert, now)
+
+    def test_due_unscheduled(self):
+        self.assertEqual(["a.com", "b.com"], self.schedule.due(self.index, 0))
+
+    def test_due(self):
+        self._reschedule("a.com")
+        self._reschedule("b.com")
+        self.assertEqual([], self.schedule.due(self.index, 0))
+        self.assertEqual(["a.com", "b.com"], self.schedule.due(
+            self.index, NOT_AFTER - 10 * DAY))
+
+    def test_due_stale(self):
+        self._reschedule("a.com")
+        self._reschedule("b.com")
+        self.index.lineages["b.com"] = self._entry("changed")
+        self.assertEqual(["b.com"], self.schedule.due(self.index, 0))
+
+    def test_due_removed(self):
+        self._reschedule("a.com")
+        del self.index.lineages["a.com"]
+        self.assertEqual(["b.com"], self.schedule.due(
+            self.index, NOT_AFTER))
+        self.assertFalse("a.com" in self.schedule.entries)
+
+    def test_due_rescheduled(self):
+        self._reschedule("a.com")
+        self._reschedule("b.com")
+        self.cert.configuration["renew_before_expiry"] = "1 day"
+        self._reschedule("a.com")
+        self.assertEqual(["b.com"], self.schedule.due(
+            self.index, NOT_AFTER - 10 * DAY))
+        self.assertEqual(["a.com"], self.schedule.due(
+            self.index, NOT_AFTER - DAY))
+
+    def test_reschedule_renewal(self):
+        self.assertEqual(NOT_AFTER - 10 * DAY, self._reschedule())
+
+    def test_reschedule_renewal_latest_version(self):
+        self.cert.not_after.return_value = datetime.datetime.fromtimestamp(
+            NOT_AFTER + 90 * DAY, pytz.UTC)
+        self.cert.latest_common_version.return_value = 2
+        self.assertEqual(NOT_AFTER + 80 * DAY, self._reschedule())
+        self.cert.not_after.assert_called_once_with(2)
+
+    def test_reschedule_deployment(self):
+        self.cert.autorenewal_is_enabled.return_value = False
+        self.cert.has_pending_deployment.return_value = True
+        self.assertEqual(NOT_AFTER - 2 * DAY, self._reschedule())
+
+    def test_reschedule_disabled(self):
+        self.cert.autorenewal_is_enabled.return_value = False
+        self.cert.has_pending_deployment.return_value = True
+        self.cert.autodeployment_is_enabled.return_value = False
+        self.assertTrue(self._reschedule() is None)
+        self.assertEqual(["b.com"], self.schedule.due(self.index, NOT_AFTER))
+
+    def test_reschedule_overdue(self):
+        self.assertEqual(NOT_AFTER + self.schedule.MIN_RECHECK,
+                         self._reschedule(now=NOT_AFTER))
+
+    @mock.patch("letsencrypt.schedule.logger")
+    def test_reschedule_error(self, mock_logger):
+        self._reschedule()
+        self.cert.latest_common_version.side_effect = ValueError
+        self.assertTrue(self._reschedule() is None)
+        self.assertTrue(mock_logger.warning.called)
+        self.assertFalse("a.com" in self.schedule.entries)
+
+    def test_reschedule_not_indexed(self):
+        self.assertTrue(self._reschedule("c.com") is None)
+        self.assertFalse("c.com" in self.schedule.entries)
+
+    def test_skip(self):
+        self.schedule.skip(self.index, "a.com")
+        self.assertEqual(["b.com"], self.schedule.due(self.index, NOT_AFTER))
+        self.index.lineages["a.com"] = self._entry("changed")
+        self.assertEqual(["a.com", "b.com"], self.schedule.due(
+            self.index, NOT_AFTER))
+
+    def _load(self):
+        from letsencrypt.schedule import RenewalSchedule
+        self.schedule = RenewalSchedule(self.path)
+        return self.schedule
+
+    def test_save_and_load(self):
+        self._reschedule("a.com")
+        self.cert.autorenewal_is_enabled.return_value = False
+        self._reschedule("b.com")
+        entries = self.schedule.entries
+        self.schedule.save()
+        self.assertEqual(entries, self._load().entries)
+        self.assertEqual([], self.schedule.due(self.index, 0))
+        self.assertEqual(["a.com"], self.schedule.due(self.index, NOT_AFTER))
+
+    @mock.patch("letsencrypt.schedule.time")
+    def test_load_clock_went_back(self, mock_time):
+        mock_time.time.return_value = NOT_AFTER
+        self._reschedule()
+        self.schedule.save()
+        mock_time.time.return_value -= 2 * self.schedule.CLOCK_SKEW
+        self.assertEqual({}, self._load().entries)
+
+    @mock.patch("letsencrypt.schedule.time")
+    def test_load_small_clock_adjustment(self, mock_time):
+        mock_time.time.return_value = NOT_AFTER
+        self._reschedule()
+        self.schedule.save()
+        mock_time.time.return_value -= self.schedule.CLOCK_SKEW / 2
+        self.assertTrue("a.com" in self._load().entries)
+
+    def test_load_defaults_changed(self):
+        self._reschedule()
+        self.schedule.save()
+        with mock.patch("letsencrypt.schedule.constants") as mock_constants:
+            mock_constants.RENEWER_DEFAULTS = {"renew_before_expiry": "1"}
+            self.assertEqual({}, self._load().entries)
+
+    def test_load_bad_file(self):
+        from letsencrypt.schedule import RenewalSchedule
+        for data in "{", json.dumps({"version": 0}), "[]":
+            with open(self.path, "w") as f:
+                f.write(data)
+            self.assertEqual({}, RenewalSchedule(self.path).entries)
+
+    @mock.patch("letsencrypt.schedule.logger")
+    def test_save_failure(self, mock_logger):
+        from letsencrypt.schedule import RenewalSchedule
+        RenewalSchedule(os.path.join(self.tmp_dir, "foo", "bar")).save()
+        self.assertTrue(mock_logger.warning.called)
+
+
+if __name__ == "__main__":
+    unittest.main()  # pragma: no cover